@@ -0,0 +1,213 @@
+"""
+Bounded in-memory cache of live agents with LRU and idle-TTL eviction.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+# Rough fixed cost of an Agent beyond its message history (tool registry, hooks, etc.)
+AGENT_BASE_BYTES = 16 * 1024
+
+
+def estimate_agent_size(agent: Any) -> int:
+    """Approximate an agent's memory footprint from its message history."""
+    messages = getattr(agent, "messages", None) or []
+    try:
+        history_bytes = len(json.dumps(messages, default=str))
+    except (TypeError, ValueError):
+        history_bytes = sum(len(str(message)) for message in messages)
+    return AGENT_BASE_BYTES + history_bytes
+
+
+@dataclass
+class _CacheEntry:
+    """A cached agent with its bookkeeping."""
+
+    agent: Any
+    size: int
+    last_used: float
+    session_id: Optional[str] = None
+    version: int = 0
+
+
+class AgentCache:
+    """
+    Thread-safe LRU cache of live agents bounded by entry count, byte budget and idle time.
+
+    Entries are sized with ``estimate_agent_size``. Because an agent's history grows
+    with every turn, an entry is re-measured each time it is handed out. Entries can
+    be tagged with a session ID so all agents of one session can be invalidated together.
+
+    With ``versions`` (a ``SessionVersions``, when sessions are shared between
+    workers), a session's entries are only handed out while no other process
+    has written the session since they were built; stale entries are rebuilt.
+    """
+
+    def __init__(self,
+                 max_entries: int,
+                 max_bytes: int,
+                 ttl_seconds: float,
+                 size_fn: Callable[[Any], int] = estimate_agent_size,
+                 versions: Optional[Callable[[], Any]] = None):
+        """
+        Initialize the cache with its limits.
+
+        ``versions`` is a zero-argument callable returning the ``SessionVersions``
+        to check against, so the store is only opened once the cache is used.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._size_fn = size_fn
+        self._versions = versions
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = {"idle": 0, "capacity": 0, "invalidated": 0, "stale": 0}
+
+    def get_or_create(self, key: str, factory: Callable[[], Any], session_id: Optional[str] = None) -> Any:
+        """
+        Return the cached agent for a key, building it with ``factory`` on a miss.
+
+        Args:
+            key: Cache key
+            factory: Zero-argument callable that builds the agent
+            session_id: Optional session tag used by ``invalidate_session``
+
+        Returns:
+            The cached or newly built agent
+        """
+        versions = self._versions() if self._versions is not None and session_id else None
+        # Read before the lock: it is a database query
+        version = versions.current(session_id) if versions is not None else 0
+
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+
+            entry = self._entries.get(key)
+            if entry is not None and entry.version != version:
+                if versions.written_here(session_id, version):
+                    # This process made the newer writes, so the live agent already has them
+                    entry.version = version
+                else:
+                    self._evict(key, reason="stale")
+                    entry = None
+            if entry is not None:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                entry.last_used = now
+                self._resize(entry)
+                self._enforce_limits(keep=key)
+                return entry.agent
+            self._misses += 1
+
+        # Build outside the lock; agent construction can hit disk
+        agent = factory()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Another thread built it first; keep the existing agent
+                return entry.agent
+
+            entry = _CacheEntry(
+                agent=agent,
+                size=self._size_fn(agent),
+                last_used=time.monotonic(),
+                session_id=session_id,
+                version=version
+            )
+            self._entries[key] = entry
+            self._total_bytes += entry.size
+            self._enforce_limits(keep=key)
+            return agent
+
+    def invalidate_session(self, session_id: str) -> int:
+        """
+        Evict every agent tagged with a session.
+
+        Args:
+            session_id: Session whose agents should be dropped
+
+        Returns:
+            Number of evicted agents
+        """
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.session_id == session_id]
+            for key in keys:
+                self._evict(key, reason="invalidated")
+            return len(keys)
+
+    def clear(self):
+        """Drop every cached agent."""
+        with self._lock:
+            self._evictions["invalidated"] += len(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, budget and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": dict(self._evictions)
+            }
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """Approximate bytes held by cached agents."""
+        return self._total_bytes
+
+    def _resize(self, entry: _CacheEntry):
+        """Re-measure an entry whose history may have grown."""
+        size = self._size_fn(entry.agent)
+        self._total_bytes += size - entry.size
+        entry.size = size
+
+    def _expire(self, now: float):
+        """Evict entries idle for longer than the TTL."""
+        if self.ttl_seconds <= 0:
+            return
+        expired = [key for key, entry in self._entries.items() if now - entry.last_used > self.ttl_seconds]
+        for key in expired:
+            self._evict(key, reason="idle")
+
+    def _enforce_limits(self, keep: Optional[str] = None):
+        """Evict least recently used entries until within count and byte limits."""
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                # Never evict the entry being handed out, even if it alone exceeds the budget
+                break
+            self._evict(oldest, reason="capacity")
+
+    def _evict(self, key: str, reason: str):
+        """Remove an entry and log why."""
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+        self._evictions[reason] += 1
+        logger.debug(f"Evicted cached agent {key} ({reason}, ~{entry.size} bytes)")
@@ -0,0 +1,248 @@
+"""
+Token-budget conversation management with background incremental summarization.
+"""
+
+import asyncio
+import json
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from strands.agent.conversation_manager import ConversationManager
+from strands.agent.conversation_manager.compression.context_compression import (
+    adjust_split_point_for_tool_pairs,
+    generate_summary,
+)
+from strands.hooks import BeforeInvocationEvent, HookRegistry
+from strands.models import Model
+from strands.types.content import Message, _ensure_tracking_id
+from strands.types.exceptions import ContextWindowOverflowException
+
+from ..config import config
+from ..services.background_worker import BackgroundWorker
+
+# Rough characters per token for English prose and JSON tool payloads
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(messages: List[Message]) -> int:
+    """Approximate the prompt tokens a list of messages costs."""
+    if not messages:
+        return 0
+    return len(json.dumps(messages, default=str)) // CHARS_PER_TOKEN
+
+
+def _message_key(message: Message) -> Any:
+    return message.get("tracking_id") or id(message)
+
+
+class TokenBudgetConversationManager(ConversationManager):
+    """
+    Keeps an agent's history within a token budget using a running summary maintained off the hot path.
+
+    After each turn, once the unsummarized history grows past ``summary_tokens``
+    (or ``summary_messages``), the oldest messages are handed to a background
+    worker that folds them into the running summary: the previous summary plus
+    only the new chunk, so each job stays small however long the session runs.
+    The finished summary is swapped in before the next turn starts.
+
+    A turn never waits for summarization. If the history outgrows the hard
+    budget (``max_tokens`` / ``max_messages``) before a summary is ready, the
+    oldest messages are trimmed immediately and carried over into the next
+    summarization job, so they still end up in the summary.
+    """
+
+    def __init__(self,
+                 worker: BackgroundWorker,
+                 max_tokens: Optional[int] = None,
+                 summary_tokens: Optional[int] = None,
+                 max_messages: Optional[int] = None,
+                 summary_messages: Optional[int] = None,
+                 preserve_recent: Optional[int] = None,
+                 summarization_system_prompt: Optional[str] = None,
+                 summary_model: Optional[Model] = None):
+        """Initialize the manager from arguments or config defaults; summaries use ``summary_model`` or the agent's model."""
+        super().__init__()
+        self.worker = worker
+        self.summary_model = summary_model
+        self.max_tokens = max_tokens or config.CONVERSATION_TOKEN_BUDGET
+        self.summary_tokens = summary_tokens or config.CONVERSATION_SUMMARY_TOKENS
+        self.max_messages = max_messages or config.MAX_CONVERSATION_MESSAGES
+        self.summary_messages = summary_messages or config.SUMMARIZATION_THRESHOLD
+        self.preserve_recent = preserve_recent if preserve_recent is not None else config.CONVERSATION_PRESERVE_RECENT
+        self.summarization_system_prompt = summarization_system_prompt
+
+        self._summary_message: Optional[Message] = None
+        # Messages trimmed from the history that are not yet part of the summary
+        self._carryover: List[Message] = []
+        self._job: Optional[Future] = None
+        self._job_covered: List[Message] = []
+        self._job_carryover: List[Message] = []
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        """Swap in a finished summary before each invocation."""
+        super().register_hooks(registry, **kwargs)
+        registry.add_callback(BeforeInvocationEvent, self._on_before_invocation)
+
+    def restore_from_session(self, state: Dict[str, Any]) -> Optional[List[Message]]:
+        """Restore the running summary and carried-over messages."""
+        super().restore_from_session(state)
+        self._summary_message = state.get("summary_message")
+        self._carryover = state.get("carryover") or []
+        return [self._summary_message] if self._summary_message else None
+
+    def get_state(self) -> Dict[str, Any]:
+        """Serializable state, including messages still waiting to be summarized."""
+        return {
+            "summary_message": self._summary_message,
+            "carryover": self._job_carryover + self._carryover,
+            **super().get_state()
+        }
+
+    def apply_management(self, agent: Any, **kwargs: Any) -> None:
+        """After a turn: apply a finished summary, enforce the budget and schedule the next summary."""
+        self._fold(agent)
+        self._enforce_budget(agent)
+        self._schedule(agent)
+
+    def reduce_context(self, agent: Any, e: Optional[Exception] = None, **kwargs: Any) -> None:
+        """
+        Reduce the history without waiting for the model.
+
+        On a context overflow (``e`` set) the older half of the history is trimmed into
+        the carry-over; otherwise the regular budget is enforced.
+
+        Raises:
+            ContextWindowOverflowException: If the history cannot be reduced any further
+        """
+        self._fold(agent)
+        if e is None:
+            self._enforce_budget(agent)
+            return
+
+        history = self._history(agent)
+        count = adjust_split_point_for_tool_pairs(history, max(1, len(history) // 2))
+        if count >= len(history):
+            raise ContextWindowOverflowException("Cannot reduce context: history is a single exchange") from e
+        self._trim(agent, count)
+        logger.warning(f"Context overflow: trimmed {count} messages from {agent.agent_id}")
+
+    def _on_before_invocation(self, event: BeforeInvocationEvent):
+        self._fold(event.agent)
+        self._enforce_budget(event.agent)
+
+    def _history(self, agent: Any) -> List[Message]:
+        """The agent's messages without the leading summary."""
+        if self._summary_message is not None and agent.messages and agent.messages[0] == self._summary_message:
+            return agent.messages[1:]
+        return list(agent.messages)
+
+    def _set_history(self, agent: Any, history: List[Message]):
+        agent.messages[:] = ([self._summary_message] if self._summary_message else []) + history
+
+    def _trim(self, agent: Any, count: int):
+        """Drop the oldest ``count`` history messages, carrying over any the pending job does not cover."""
+        history = self._history(agent)
+        covered = {_message_key(message) for message in self._job_covered}
+        self._carryover.extend(message for message in history[:count] if _message_key(message) not in covered)
+        self.removed_message_count += count
+        self._set_history(agent, history[count:])
+
+    def _enforce_budget(self, agent: Any):
+        """Trim the oldest messages if the history exceeds the hard token or message budget."""
+        history = self._history(agent)
+        budget = self.max_tokens - estimate_tokens([self._summary_message] if self._summary_message else [])
+        if len(history) <= self.max_messages and estimate_tokens(history) <= budget:
+            return
+
+        count = self._split_point(history, budget, self.max_messages)
+        if count <= 0:
+            return
+        self._trim(agent, count)
+        logger.info(f"Trimmed {count} messages from {agent.agent_id} to stay within the context budget")
+
+    def _schedule(self, agent: Any):
+        """Start a background summarization job if enough history has accumulated."""
+        if self._job is not None:
+            return
+
+        history = self._history(agent)
+        if not self._carryover and len(history) <= self.summary_messages and estimate_tokens(history) <= self.summary_tokens:
+            return
+
+        # Summarize down to half the trigger so the next job is not due right away
+        count = self._split_point(history, self.summary_tokens // 2, self.summary_messages // 2)
+
+        # Bound each job's input; a backlog of carried-over messages is worked off over several jobs
+        carryover = self._carryover
+        taken = 0
+        tokens = 0
+        while taken < len(carryover) and (taken == 0 or tokens + estimate_tokens([carryover[taken]]) <= self.max_tokens):
+            tokens += estimate_tokens([carryover[taken]])
+            taken += 1
+        if taken < len(carryover) or tokens + estimate_tokens(history[:count]) > self.max_tokens:
+            count = 0
+
+        chunk = carryover[:taken] + history[:count]
+        if not chunk:
+            return
+
+        self._job_covered = history[:count]
+        self._job_carryover = carryover[:taken]
+        self._carryover = carryover[taken:]
+        self._job = self.worker.submit(self._summarize, self._summary_message, chunk, self.summary_model or agent.model)
+        logger.debug(f"Scheduled summarization of {len(chunk)} messages for {agent.agent_id}")
+
+    def _split_point(self, history: List[Message], max_tokens: int, max_messages: int) -> int:
+        """Smallest number of oldest messages to drop so the rest fits, keeping recent messages and tool pairs."""
+        limit = len(history) - self.preserve_recent
+        count = max(0, len(history) - max_messages)
+        remaining = estimate_tokens(history[count:])
+        while count < limit and remaining > max_tokens:
+            remaining -= estimate_tokens([history[count]])
+            count += 1
+        count = min(count, max(0, limit))
+        if count == 0:
+            return 0
+        try:
+            count = adjust_split_point_for_tool_pairs(history, count)
+        except ContextWindowOverflowException:
+            return 0
+        return count if count < len(history) else 0
+
+    def _summarize(self, previous: Optional[Message], chunk: List[Message], model: Model) -> Message:
+        """Fold a chunk of messages into the previous summary; runs on the background worker."""
+        messages = ([previous] if previous else []) + chunk
+        return asyncio.run(generate_summary(messages, model, self.summarization_system_prompt))
+
+    def _fold(self, agent: Any):
+        """Replace the messages a finished job covered with its summary."""
+        job = self._job
+        if job is None or not job.done():
+            return
+
+        covered = {_message_key(message) for message in self._job_covered}
+        folded = len(self._job_covered) + len(self._job_carryover)
+        carryover = self._job_carryover
+        self._job = None
+        self._job_covered = []
+        self._job_carryover = []
+
+        error = job.exception()
+        if error is not None:
+            # Keep the trimmed messages so the next job retries them
+            self._carryover = carryover + self._carryover
+            logger.warning(f"Summarization for {agent.agent_id} failed, will retry: {str(error)}")
+            return
+
+        history = self._history(agent)
+        count = 0
+        while count < len(history) and _message_key(history[count]) in covered:
+            count += 1
+
+        summary = job.result()
+        _ensure_tracking_id(summary)
+        self._summary_message = summary
+        self.removed_message_count += count
+        self._set_history(agent, history[count:])
+        logger.info(f"Applied background summary for {agent.agent_id} ({folded} messages folded)")
@@ -0,0 +1,436 @@
+"""
+Background answer evaluation, attached to the session it belongs to.
+
+Evaluation records are kept in process memory, or in a SQLite file when
+several workers serve the same sessions, so that feedback reaches the client
+whichever worker ran the evaluation.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .runtime import get_agent_factory, get_session_service
+from .specialized_agents import BEHAVIORAL_QUESTION_EVALUATOR_PROMPT, TECHNICAL_QUESTION_EVALUATOR_PROMPT
+from .structured_output import evaluation_text, structured_call, structured_call_async
+from ..config import config
+from ..models.response_models import AnswerEvaluation, EvaluationItem, EvaluationResult
+from ..services.background_worker import BackgroundWorker
+from ..services.scheduler import work_class
+
+# Evaluator agent type and prompt per question type; situational answers are graded like behavioral ones
+EVALUATORS = {
+    "behavioral": ("behavioral_evaluator", BEHAVIORAL_QUESTION_EVALUATOR_PROMPT),
+    "situational": ("behavioral_evaluator", BEHAVIORAL_QUESTION_EVALUATOR_PROMPT),
+    "technical": ("technical_evaluator", TECHNICAL_QUESTION_EVALUATOR_PROMPT),
+}
+
+
+def answer_prompt(question: Optional[str], answer: str, position: Optional[str] = None) -> str:
+    """Evaluator prompt for an answer to a question."""
+    return (
+        (f"Position: {position}\n" if position else "")
+        + (f"Question: {question}\n\n" if question else "")
+        + f"Candidate's answer: {answer}"
+    )
+
+
+@dataclass
+class EvaluationRecord:
+    """One answer evaluation and its outcome."""
+
+    evaluation_id: str
+    session_id: str
+    workflow: str
+    answer: str
+    question: Optional[str] = None
+    status: str = "pending"  # pending | completed | failed
+    feedback: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None  # AnswerEvaluation, with structured output enabled
+    error: Optional[str] = None
+    duration_ms: Optional[float] = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    completed_at: Optional[str] = None
+    delivered: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _deliver(records: List[EvaluationRecord],
+             only_undelivered: bool,
+             mark: bool) -> Tuple[List[Dict[str, Any]], List[EvaluationRecord]]:
+    """Snapshot of the records handed out, and the finished ones among them newly marked delivered."""
+    if only_undelivered:
+        records = [record for record in records if record.status != "pending" and not record.delivered]
+    snapshot = [record.to_dict() for record in records]
+    marked = [record for record in records if mark and record.status != "pending" and not record.delivered]
+    for record in marked:
+        record.delivered = True
+    return snapshot, marked
+
+
+class MemoryEvaluationStore:
+    """Evaluation records in process memory: the last ``history`` per session, for the ``max_sessions`` most recently active sessions."""
+
+    def __init__(self, history: int, max_sessions: int):
+        """Initialize an empty store."""
+        self.history = history
+        self.max_sessions = max_sessions
+        self._records: "OrderedDict[str, List[EvaluationRecord]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, record: EvaluationRecord):
+        """Keep a new record."""
+        with self._lock:
+            records = self._records.setdefault(record.session_id, [])
+            self._records.move_to_end(record.session_id)
+            records.append(record)
+            del records[:-self.history]
+            while len(self._records) > self.max_sessions:
+                self._records.popitem(last=False)
+
+    def save(self, record: EvaluationRecord):
+        """Store a record's outcome; records in memory are already up to date."""
+
+    def deliver(self, session_id: str, only_undelivered: bool, mark: bool = True) -> List[Dict[str, Any]]:
+        """
+        A session's records, oldest first, marking finished ones delivered.
+
+        Args:
+            session_id: Session to look up
+            only_undelivered: Only return finished records not delivered before
+            mark: Mark the finished records returned as delivered
+
+        Returns:
+            Records as dictionaries, as they were before being marked
+        """
+        with self._lock:
+            snapshot, _ = _deliver(list(self._records.get(session_id, [])), only_undelivered, mark)
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class SQLiteEvaluationStore:
+    """
+    Evaluation records in a SQLite file shared by every worker that opens it.
+
+    Same retention as ``MemoryEvaluationStore``. Delivery is one ``BEGIN
+    IMMEDIATE`` transaction, so two workers never hand out the same feedback.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS evaluations (
+            evaluation_id TEXT PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS evaluations_by_session ON evaluations (session_id);
+    """
+
+    # Records added between trims of the least recently active sessions
+    SWEEP_EVERY = 100
+
+    def __init__(self, history: int, max_sessions: int, db_path: Optional[str] = None):
+        """Open (and if needed create) the evaluation database from arguments or config defaults."""
+        self.history = history
+        self.max_sessions = max_sessions
+        self.db_path = db_path or config.EVALUATION_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._local = threading.local()
+        self._added = 0
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def add(self, record: EvaluationRecord):
+        """Keep a new record, dropping the session's records beyond ``history``."""
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT INTO evaluations (evaluation_id, session_id, data) VALUES (?, ?, ?)",
+                (record.evaluation_id, record.session_id, json.dumps(record.to_dict()))
+            )
+            connection.execute(
+                "DELETE FROM evaluations WHERE session_id = ? AND rowid NOT IN "
+                "(SELECT rowid FROM evaluations WHERE session_id = ? ORDER BY rowid DESC LIMIT ?)",
+                (record.session_id, record.session_id, self.history)
+            )
+            self._added += 1
+            if self._added % self.SWEEP_EVERY == 0:
+                connection.execute(
+                    "DELETE FROM evaluations WHERE session_id NOT IN "
+                    "(SELECT session_id FROM evaluations GROUP BY session_id ORDER BY MAX(rowid) DESC LIMIT ?)",
+                    (self.max_sessions,)
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def save(self, record: EvaluationRecord):
+        """Store a record's outcome."""
+        self._connect().execute(
+            "UPDATE evaluations SET data = ? WHERE evaluation_id = ?",
+            (json.dumps(record.to_dict()), record.evaluation_id)
+        )
+
+    def deliver(self, session_id: str, only_undelivered: bool, mark: bool = True) -> List[Dict[str, Any]]:
+        """A session's records, oldest first, marking finished ones delivered; see ``MemoryEvaluationStore.deliver``."""
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT data FROM evaluations WHERE session_id = ? ORDER BY rowid", (session_id,)
+            ).fetchall()
+            snapshot, marked = _deliver([EvaluationRecord(**json.loads(row[0])) for row in rows], only_undelivered, mark)
+            connection.executemany(
+                "UPDATE evaluations SET data = ? WHERE evaluation_id = ?",
+                [(json.dumps(record.to_dict()), record.evaluation_id) for record in marked]
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return snapshot
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(DISTINCT session_id) FROM evaluations").fetchone()[0]
+
+
+def create_evaluation_store(history: int, max_sessions: int, kind: Optional[str] = None):
+    """Create the ``memory`` or ``sqlite`` evaluation store named by ``EVALUATION_STORE``."""
+    kind = (kind or config.EVALUATION_STORE).lower()
+    if kind == "memory":
+        return MemoryEvaluationStore(history, max_sessions)
+    if kind == "sqlite":
+        return SQLiteEvaluationStore(history, max_sessions)
+    raise ValueError(f"Unknown evaluation store: {kind}")
+
+
+class EvaluationQueue:
+    """
+    Runs evaluator agents in the background and keeps their feedback per session.
+
+    Evaluations of one session run one at a time and in order, because they
+    share the session's evaluator agent; different sessions evaluate in
+    parallel on the worker. Each session keeps its last ``history`` records,
+    and only the ``max_sessions`` most recently active sessions are kept, in
+    the ``EVALUATION_STORE``.
+    """
+
+    def __init__(self,
+                 workers: Optional[int] = None,
+                 history: Optional[int] = None,
+                 max_sessions: Optional[int] = None,
+                 store: Any = None):
+        """Initialize the queue from arguments or config defaults."""
+        self.worker = BackgroundWorker(
+            "evaluator", max_workers=workers or config.EVALUATION_WORKERS, work_class="evaluation"
+        )
+        self.history = history or config.EVALUATION_HISTORY
+        self.max_sessions = max_sessions or config.EVALUATION_MAX_SESSIONS
+        self.store = store or create_evaluation_store(self.history, self.max_sessions)
+
+        self._session_locks: "OrderedDict[str, threading.Lock]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self,
+               session_id: str,
+               workflow: str,
+               agent_type: str,
+               system_prompt: str,
+               answer: str,
+               question: Optional[str] = None) -> EvaluationRecord:
+        """
+        Queue an evaluation of a candidate's answer.
+
+        Args:
+            session_id: Session the answer belongs to
+            workflow: Workflow name the evaluation is part of
+            agent_type: Evaluator agent type
+            system_prompt: Evaluator system prompt
+            answer: The candidate's answer
+            question: The question it answers, shown to the evaluator with the answer
+
+        Returns:
+            The pending evaluation record
+        """
+        record = EvaluationRecord(
+            evaluation_id=uuid.uuid4().hex[:12],
+            session_id=session_id,
+            workflow=workflow,
+            answer=answer,
+            question=question
+        )
+        self.store.add(record)
+        with self._lock:
+            session_lock = self._session_locks.setdefault(session_id, threading.Lock())
+            self._session_locks.move_to_end(session_id)
+            while len(self._session_locks) > self.max_sessions:
+                self._session_locks.popitem(last=False)
+
+        self.worker.submit(self._evaluate, record, agent_type, system_prompt, session_lock)
+        return record
+
+    def feedback(self, session_id: str, mark_delivered: bool = True) -> List[Dict[str, Any]]:
+        """
+        All evaluations kept for a session, oldest first.
+
+        Args:
+            session_id: Session to look up
+            mark_delivered: Mark completed evaluations as delivered
+
+        Returns:
+            Evaluation records as dictionaries
+        """
+        return self.store.deliver(session_id, only_undelivered=False, mark=mark_delivered)
+
+    def take_undelivered(self, session_id: str) -> List[Dict[str, Any]]:
+        """Finished evaluations not yet handed to the client; marks them delivered."""
+        return self.store.deliver(session_id, only_undelivered=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Worker counters and number of sessions with feedback."""
+        return {**self.worker.stats(), "sessions": len(self.store), "store": config.EVALUATION_STORE}
+
+    def shutdown(self):
+        """Stop the worker without waiting for queued evaluations."""
+        self.worker.shutdown(wait=False)
+
+    def _evaluate(self, record: EvaluationRecord, agent_type: str, system_prompt: str, session_lock: threading.Lock):
+        """Run the evaluator agent for one record; executes on the background worker."""
+        with session_lock:
+            started = time.perf_counter()
+            try:
+                agent = get_agent_factory().create_agent(
+                    agent_type=agent_type,
+                    system_prompt=system_prompt,
+                    session_id=record.session_id
+                )
+                prompt = answer_prompt(record.question, record.answer)
+                if config.STRUCTURED_OUTPUT_ENABLED:
+                    evaluation = structured_call(agent, AnswerEvaluation, prompt, record.session_id)
+                    record.result = evaluation.model_dump()
+                    record.feedback = evaluation_text(evaluation)
+                else:
+                    record.feedback = str(agent(prompt)).strip()
+                record.status = "completed"
+            except Exception as e:
+                logger.error(f"Evaluation {record.evaluation_id} for session {record.session_id} failed: {str(e)}")
+                record.error = str(e)
+                record.status = "failed"
+            record.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            record.completed_at = datetime.now().isoformat()
+            try:
+                self.store.save(record)
+            except Exception as e:
+                logger.error(f"Failed to store evaluation {record.evaluation_id} for session {record.session_id}: {str(e)}")
+            # The evaluator's history changed outside a request
+            get_session_service().end_turn(record.session_id)
+
+
+class BatchEvaluator:
+    """
+    Grades many recorded answers at once, directly with the evaluator agents.
+
+    Each item gets a fresh single-use evaluator agent, so items never see each
+    other's answers, and bypasses the orchestrator entirely. Items run
+    concurrently as async model calls on the event loop; ``max_concurrency``
+    caps evaluations across all batches in the process, and a batch may ask
+    for a lower limit for itself.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        """Initialize the evaluator from arguments or config defaults."""
+        self.max_concurrency = max_concurrency or config.EVALUATION_BATCH_CONCURRENCY
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {"batches": 0, "items": 0, "completed": 0, "failed": 0, "active": 0}
+
+    async def stream(self, items: List[EvaluationItem], concurrency: Optional[int] = None) -> AsyncIterator[EvaluationResult]:
+        """
+        Evaluate items concurrently, yielding each result as soon as it finishes.
+
+        Args:
+            items: Answers to grade
+            concurrency: Evaluations this batch may run at once, at most ``max_concurrency``
+
+        Yields:
+            One result per item, in completion order
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        batch_limit = asyncio.Semaphore(min(concurrency or self.max_concurrency, self.max_concurrency))
+        self._stats["batches"] += 1
+        self._stats["items"] += len(items)
+
+        async def run(index: int, item: EvaluationItem) -> EvaluationResult:
+            async with batch_limit, self._semaphore:
+                return await self._evaluate(index, item)
+
+        # Tasks copy the context they are created in, so their model calls are scheduled as batch work
+        with work_class("batch"):
+            tasks = [asyncio.create_task(run(index, item)) for index, item in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The client went away: stop evaluations that have not finished
+            for task in tasks:
+                task.cancel()
+
+    async def _evaluate(self, index: int, item: EvaluationItem) -> EvaluationResult:
+        """Grade one item."""
+        agent_type, system_prompt = EVALUATORS[item.type]
+        agent = get_agent_factory().create_ephemeral_agent(agent_type, system_prompt)
+        model_id = agent.model.get_config().get("model_id")
+        prompt = answer_prompt(item.question, item.answer, item.position)
+
+        self._stats["active"] += 1
+        started = time.perf_counter()
+        try:
+            structured = None
+            if config.STRUCTURED_OUTPUT_ENABLED:
+                structured = await structured_call_async(agent, AnswerEvaluation, prompt)
+                evaluation = evaluation_text(structured)
+            else:
+                evaluation = str(await agent.invoke_async(prompt)).strip()
+            self._stats["completed"] += 1
+            return EvaluationResult(
+                index=index, id=item.id, status="completed", evaluation=evaluation, result=structured, model=model_id,
+                duration_ms=round((time.perf_counter() - started) * 1000, 2)
+            )
+        except Exception as e:
+            logger.error(f"Batch evaluation of item {item.id or index} failed: {str(e)}")
+            self._stats["failed"] += 1
+            return EvaluationResult(
+                index=index, id=item.id, status="failed", error=str(e), model=model_id,
+                duration_ms=round((time.perf_counter() - started) * 1000, 2)
+            )
+        finally:
+            self._stats["active"] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch and item counters."""
+        return {**self._stats, "max_concurrency": self.max_concurrency}
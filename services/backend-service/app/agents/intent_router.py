@@ -0,0 +1,245 @@
+"""
+Local intent routing in front of the orchestrator LLM.
+
+Obvious turns (a greeting, "ask me a technical question", an answer to the
+question just asked) are dispatched straight to the matching specialized
+agent or workflow, saving the orchestrator's tool-selection round-trip.
+Anything the router is not confident about goes to the orchestrator as before.
+"""
+
+import json
+import math
+import re
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from strands import Agent
+
+from .runtime import get_session_service
+from .specialized_agents import introduction_assistant
+from .streaming import emit
+from .workflow_tools import run_workflow, workflow_reply
+from ..config import config
+
+# High-precision patterns checked before the classifier
+RULES: List[Tuple[str, "re.Pattern"]] = [
+    ("introduction", re.compile(r"^\W*(hi|hello|hey|good (morning|afternoon|evening))\W*$", re.IGNORECASE)),
+    ("introduction", re.compile(r"^\W*(let'?s |please |can we )?(start|begin)( the)?( mock)? interview\W*$", re.IGNORECASE)),
+    ("introduction", re.compile(r"^\W*(please )?introduce yourself\W*$", re.IGNORECASE)),
+    ("behavioral", re.compile(r"^\W*(please )?(ask|give) me (a|another|one more) (behaviou?ral|situational) question\W*$", re.IGNORECASE)),
+    ("technical", re.compile(r"^\W*(please )?(ask|give) me (a|another|one more) (technical|coding|system design) question\W*$", re.IGNORECASE)),
+]
+
+# Orchestrator tool each intent dispatches to; "answer" goes to the workflow the session is in
+INTENT_TOOLS = {
+    "introduction": "introduction_assistant",
+    "behavioral": "behavioral_workflow",
+    "technical": "technical_workflow"
+}
+WORKFLOW_TOOLS = {"behavioral_workflow": "behavioral", "technical_workflow": "technical"}
+
+
+def is_question_request(text: str) -> bool:
+    """Whether the text plainly asks for a new interview question, rather than answering one."""
+    return any(pattern.match(text) for intent, pattern in RULES if intent in WORKFLOW_TOOLS.values())
+
+
+def _features(text: str) -> List[str]:
+    """Unigrams, bigrams and a length bucket."""
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    length = "short" if len(words) <= 6 else "medium" if len(words) <= 20 else "long"
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])] + [f"__length_{length}__"]
+
+
+class NaiveBayesIntentClassifier:
+    """
+    Multinomial naive Bayes over word unigrams and bigrams, with uniform class priors.
+
+    Small and CPU-only: trains in milliseconds from the bundled examples, so it is
+    trained at startup rather than shipped as a model file.
+    """
+
+    def __init__(self, alpha: float = 1.0):
+        """Initialize an untrained classifier with Laplace smoothing ``alpha``."""
+        self.alpha = alpha
+        self._log_likelihoods: Dict[str, Dict[str, float]] = {}
+        self._unseen: Dict[str, float] = {}
+
+    def fit(self, examples: Dict[str, List[str]]) -> "NaiveBayesIntentClassifier":
+        """
+        Train on labelled examples.
+
+        Args:
+            examples: Intent name to example utterances
+
+        Returns:
+            The trained classifier
+        """
+        counts = {intent: Counter(f for text in texts for f in _features(text)) for intent, texts in examples.items()}
+        vocabulary = set().union(*counts.values())
+        for intent, counter in counts.items():
+            total = sum(counter.values()) + self.alpha * (len(vocabulary) + 1)
+            self._log_likelihoods[intent] = {f: math.log((n + self.alpha) / total) for f, n in counter.items()}
+            self._unseen[intent] = math.log(self.alpha / total)
+        return self
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Most likely intent for a text.
+
+        Returns:
+            (intent, posterior probability)
+        """
+        features = _features(text)
+        scores = {
+            intent: sum(likelihoods.get(f, self._unseen[intent]) for f in features)
+            for intent, likelihoods in self._log_likelihoods.items()
+        }
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / normalizer
+
+
+@dataclass
+class RoutingDecision:
+    """How a turn was routed; reported in the response metadata."""
+
+    route: str  # local | llm
+    intent: Optional[str]
+    confidence: float
+    method: str  # rule | classifier | disabled
+    target: Optional[str] = None
+    reason: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "confidence": round(self.confidence, 3)}
+
+
+class IntentRouter:
+    """
+    Routes turns with rules first, then the classifier, and falls back to the orchestrator LLM.
+
+    A turn is dispatched locally only when its intent has a clear target and the
+    confidence reaches ``threshold``. An answer is routed to the workflow the
+    session last used, found from the orchestrator's latest workflow tool call.
+    """
+
+    def __init__(self, examples_path: Optional[str] = None, threshold: Optional[float] = None):
+        """Initialize the router and train its classifier from arguments or config defaults."""
+        self.threshold = threshold if threshold is not None else config.INTENT_ROUTER_THRESHOLD
+        with open(examples_path or config.INTENT_ROUTER_EXAMPLES, encoding="utf-8") as f:
+            self.classifier = NaiveBayesIntentClassifier().fit(json.load(f))
+        self._stats = {"local": 0, "llm": 0, "local_failed": 0}
+
+    def classify(self, query: str) -> Tuple[str, float, str]:
+        """
+        Intent of a query.
+
+        Returns:
+            (intent, confidence, method)
+        """
+        for intent, pattern in RULES:
+            if pattern.match(query):
+                return intent, 1.0, "rule"
+        intent, confidence = self.classifier.predict(query)
+        return intent, confidence, "classifier"
+
+    def decide(self, query: str, agent: Agent) -> RoutingDecision:
+        """
+        Decide where a turn goes.
+
+        Args:
+            query: User input
+            agent: The session's orchestrator, used to find the active workflow
+
+        Returns:
+            The routing decision
+        """
+        if not config.INTENT_ROUTER_ENABLED:
+            return RoutingDecision("llm", None, 0.0, "disabled")
+
+        intent, confidence, method = self.classify(query)
+        target = active_workflow(agent) if intent == "answer" else INTENT_TOOLS.get(intent)
+        if target is None:
+            reason = "no active workflow" if intent == "answer" else "needs the orchestrator"
+            return RoutingDecision("llm", intent, confidence, method, reason=reason)
+        if confidence < self.threshold:
+            return RoutingDecision("llm", intent, confidence, method, target, reason="low confidence")
+        return RoutingDecision("local", intent, confidence, method, target)
+
+    def run_turn(self, session_id: str, agent: Agent, query: str, invoke_llm: Callable[[], str]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Run a turn locally if the router is confident, otherwise through the orchestrator.
+
+        Args:
+            session_id: Session the turn belongs to
+            agent: The session's orchestrator
+            query: User input
+            invoke_llm: Runs the turn through the orchestrator and returns its response
+
+        Returns:
+            (response, routing metadata)
+        """
+        decision = self.decide(query, agent)
+        if decision.route == "local":
+            response = self._dispatch(session_id, agent, query, decision.target)
+            if response is not None:
+                self._stats["local"] += 1
+                logger.info(f"Routed turn for session {session_id} to {decision.target} ({decision.method}, {decision.confidence:.2f})")
+                return response, decision.to_dict()
+            self._stats["local_failed"] += 1
+            decision.route, decision.reason = "llm", "local dispatch failed"
+
+        self._stats["llm"] += 1
+        return invoke_llm(), decision.to_dict()
+
+    def _dispatch(self, session_id: str, agent: Agent, query: str, tool_name: str) -> Optional[str]:
+        """Run the target tool directly and record the turn in the orchestrator's history as a tool call."""
+        tool_use_id = f"router_{uuid.uuid4().hex[:12]}"
+        tool_input = {"user_input": query, "session_id": session_id}
+        emit("tool", {"tool_use_id": tool_use_id, "name": tool_name})
+
+        if tool_name in WORKFLOW_TOOLS:
+            report = run_workflow(WORKFLOW_TOOLS[tool_name], query, session_id)
+            tool_output = json.dumps(report, default=str)
+            response = workflow_reply(report)
+        else:
+            response = introduction_assistant(**tool_input)
+            tool_output = response
+            if not response or response.startswith("Error in introduction assistant"):
+                response = None
+
+        status = "success" if response is not None else "error"
+        emit("tool_result", {"tool_use_id": tool_use_id, "name": tool_name, "status": status, "output": tool_output})
+        if response is None:
+            logger.warning(f"Local dispatch to {tool_name} failed for session {session_id}, falling back to the orchestrator")
+            return None
+
+        get_session_service().append_messages(session_id, agent, [
+            {"role": "user", "content": [{"text": query}]},
+            {"role": "assistant", "content": [{"toolUse": {"toolUseId": tool_use_id, "name": tool_name, "input": tool_input}}]},
+            {"role": "user", "content": [{"toolResult": {"toolUseId": tool_use_id, "status": status, "content": [{"text": tool_output}]}}]},
+            {"role": "assistant", "content": [{"text": response}]}
+        ])
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Turns routed locally and to the orchestrator."""
+        routed = self._stats["local"] + self._stats["llm"]
+        return {**self._stats, "local_ratio": round(self._stats["local"] / routed, 3) if routed else 0.0}
+
+
+def active_workflow(agent: Agent) -> Optional[str]:
+    """The workflow tool the orchestrator called most recently, if it is still in the history."""
+    for message in reversed(agent.messages):
+        for block in message.get("content", []):
+            name = block.get("toolUse", {}).get("name")
+            if name in WORKFLOW_TOOLS:
+                return name
+            if name is not None:
+                # A more recent non-workflow tool (e.g. the introduction) ends the workflow
+                return None
+    return None
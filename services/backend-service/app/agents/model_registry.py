@@ -0,0 +1,427 @@
+"""
+Process-wide Ollama model registry with a shared, pooled HTTP client.
+
+strands' ``OllamaModel`` opens a new ``ollama.AsyncClient`` (and so a new TCP
+connection) for every model call, and each agent call runs on its own
+short-lived event loop. ``OllamaConnectionPool`` instead keeps one keep-alive
+client per host on a long-lived I/O loop and bridges responses back to the
+calling loop, so nested tool agents and follow-up turns reuse warm connections.
+With several ``OLLAMA_HOSTS`` the pool also picks the host for every call
+through an ``OllamaHostBalancer``, admits calls by work class through a
+``ModelScheduler``, and guards every call with a circuit breaker, a retry
+budget and the request's deadline.
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import threading
+from fnmatch import fnmatchcase
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+import ollama
+from loguru import logger
+from strands.models.ollama import OllamaModel
+from strands.types.exceptions import ContextWindowOverflowException
+
+from .session_context import current_session_id
+from ..config import config
+from ..services.circuit_breaker import CircuitBreaker, RetryBudget
+from ..services.deadline import DeadlineExceeded, check_deadline, remaining
+from ..services.ollama_hosts import OllamaHostBalancer
+from ..services.scheduler import ModelScheduler
+
+_DONE = object()
+
+# Errors raised before a request reaches the server, so it is safe to send it to another host
+UNREACHABLE_ERRORS = (ConnectionError, httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def _is_backend_failure(error: BaseException) -> bool:
+    """
+    Whether an error means the backend is unwell, as opposed to rejecting this particular request.
+
+    Timeouts count only when they are the pool's own ``OLLAMA_REQUEST_TIMEOUT``
+    (an ``httpx`` timeout); a caller's deadline running out says nothing about
+    the backend.
+    """
+    if isinstance(error, ollama.ResponseError):
+        return error.status_code >= 500
+    return isinstance(error, (ConnectionError, httpx.TransportError))
+
+# Built-in generation settings per agent type (exact names or glob patterns), applied
+# before ``Config.AGENT_MODELS``. None by default: unset settings keep ``OllamaModel``'s
+# own defaults, and every agent uses ``OLLAMA_MODEL`` unless a profile sets ``model_id``.
+DEFAULT_AGENT_PROFILES: Dict[str, Dict[str, Any]] = {}
+
+# ``OllamaModel`` settings an agent profile may set
+PROFILE_KEYS = frozenset({"model_id", "temperature", "max_tokens", "top_p", "keep_alive", "stop_sequences", "options"})
+
+
+class OllamaConnectionPool:
+    """Keep-alive Ollama clients per host, owned by a dedicated I/O event loop."""
+
+    def __init__(self,
+                 balancer: Optional[OllamaHostBalancer] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 retry_budget: Optional[RetryBudget] = None,
+                 scheduler: Optional[ModelScheduler] = None,
+                 max_connections: Optional[int] = None,
+                 max_keepalive: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None,
+                 request_timeout: Optional[float] = None,
+                 connect_timeout: Optional[float] = None):
+        """Initialize pool limits, the host balancer and failure handling from arguments or config defaults."""
+        self.balancer = balancer or OllamaHostBalancer()
+        self.breaker = breaker or CircuitBreaker("Ollama")
+        self.retry_budget = retry_budget or RetryBudget()
+        self.scheduler = scheduler or ModelScheduler()
+        self.limits = httpx.Limits(
+            max_connections=max_connections or config.OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive or config.OLLAMA_MAX_KEEPALIVE,
+            keepalive_expiry=keepalive_expiry or config.OLLAMA_KEEPALIVE_EXPIRY
+        )
+        self.timeout = httpx.Timeout(
+            request_timeout or config.OLLAMA_REQUEST_TIMEOUT,
+            connect=connect_timeout or config.OLLAMA_CONNECT_TIMEOUT
+        )
+        self._clients: Dict[str, ollama.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "active": 0, "errors": 0, "failovers": 0, "retries": 0, "deadline_exceeded": 0}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the I/O loop thread on first use."""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name="ollama-io", daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def _client(self, host: str) -> ollama.AsyncClient:
+        """Get the keep-alive client for a host; only called on the I/O loop."""
+        client = self._clients.get(host)
+        if client is None:
+            client = ollama.AsyncClient(host, timeout=self.timeout, limits=self.limits)
+            self._clients[host] = client
+        return client
+
+    async def chat(self, request: Dict[str, Any], session_id: Optional[str] = None) -> AsyncIterator[Any]:
+        """
+        Run an Ollama chat request on a balanced host and yield its responses on the caller's loop.
+
+        Waits for a slot for the caller's work class first. Fails fast with
+        ``CircuitOpen`` while the backend keeps failing, and with
+        ``DeadlineExceeded`` once the request's deadline passes. A failure before
+        anything was received (unreachable host, 5xx, dropped connection) is
+        retried, on another host when there is one, as long as
+        ``OLLAMA_MAX_RETRIES``, the retry budget and the deadline allow.
+
+        Args:
+            request: Keyword arguments for ``AsyncClient.chat``
+            session_id: Session the request belongs to, so it stays on the session's host
+
+        Yields:
+            Streamed chunks, or the single response when ``stream`` is False
+        """
+        check_deadline("the model call")
+        self.breaker.acquire()
+        self.retry_budget.deposit()
+        try:
+            async with self.scheduler.slot():
+                async for item in self._chat_attempts(request, session_id):
+                    yield item
+        finally:
+            self.breaker.release()
+
+    async def _chat_attempts(self, request: Dict[str, Any], session_id: Optional[str]) -> AsyncIterator[Any]:
+        """Try a request on balanced hosts until it succeeds or may not be retried."""
+        tried: List[str] = []
+        for attempt in itertools.count():
+            host = self.balancer.acquire(session_id, exclude=tried)
+            # Host outcome: True once it replied, False on a backend failure, None if neither
+            success = None
+            received = False
+            try:
+                async for item in self._chat_on(host, request):
+                    success = received = True
+                    yield item
+                success = True
+                self.breaker.record(True)
+                return
+            except DeadlineExceeded:
+                # The caller ran out of time; the breaker slot is freed without an outcome
+                raise
+            except Exception as e:
+                if not _is_backend_failure(e):
+                    if isinstance(e, ollama.ResponseError):
+                        # The backend answered, it just refused this request (e.g. a 4xx)
+                        success = True
+                        self.breaker.record(True)
+                    raise
+                success = False
+                self.breaker.record(False)
+                tried.append(host)
+                delay = self._retry_delay(attempt, e, received, tried)
+                if delay is None:
+                    raise
+                logger.warning(f"Ollama call to {host} failed ({type(e).__name__}: {e}), retrying in {delay:.2f}s")
+            finally:
+                self.balancer.release(host, success)
+            if delay == 0:
+                # Only unreachable hosts with another host to try are retried without a pause
+                self._stats["failovers"] += 1
+                self.balancer.record_failover()
+            self._stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt: int, error: Exception, received: bool, tried: List[str]) -> Optional[float]:
+        """Seconds to wait before retrying a failed attempt, or None if it must not be retried."""
+        if received or attempt >= config.OLLAMA_MAX_RETRIES:
+            return None
+        if self.breaker.state == "open":
+            return None
+        # An unreachable host is skipped at once if another one is still in rotation
+        untried = set(self.balancer.healthy_hosts()) - set(tried)
+        if isinstance(error, UNREACHABLE_ERRORS) and untried:
+            delay = 0.0
+        else:
+            delay = config.OLLAMA_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.0)
+        left = remaining()
+        if left is not None and left <= delay:
+            return None
+        # Spent last, so a retry that was never going to happen costs nothing
+        return delay if self.retry_budget.try_spend() else None
+
+    async def _chat_on(self, host: str, request: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Run a chat request on one host's pooled client."""
+        caller_loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def put(item: Any):
+            caller_loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        async def produce():
+            try:
+                response = await self._client(host).chat(**request)
+                if request.get("stream"):
+                    async for chunk in response:
+                        put(chunk)
+                else:
+                    put(response)
+                put(_DONE)
+            except BaseException as e:
+                put(e)
+
+        self._stats["requests"] += 1
+        self._stats["active"] += 1
+        future = asyncio.run_coroutine_threadsafe(produce(), self._ensure_loop())
+        try:
+            while True:
+                left = remaining()
+                try:
+                    item = await (queue.get() if left is None else asyncio.wait_for(queue.get(), max(left, 0)))
+                except asyncio.TimeoutError:
+                    self._stats["deadline_exceeded"] += 1
+                    raise DeadlineExceeded("the model call") from None
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    self._stats["errors"] += 1
+                    raise item
+                yield item
+        finally:
+            self._stats["active"] -= 1
+            # Stops the upstream request if the consumer gave up early
+            future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counters, pool limits and per-host balancing."""
+        return {
+            **self._stats,
+            "circuit": self.breaker.stats(),
+            "retry_budget": self.retry_budget.stats(),
+            "balancer": self.balancer.stats(),
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections
+        }
+
+    def close(self):
+        """Stop health probes, close every client and stop the I/O loop."""
+        self.balancer.close()
+        if self._loop is None:
+            return
+
+        async def close_clients():
+            for client in self._clients.values():
+                await client.close()
+            self._clients.clear()
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_clients(), self._loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Error closing Ollama clients: {str(e)}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+class PooledOllamaModel(OllamaModel):
+    """``OllamaModel`` that sends requests through a shared ``OllamaConnectionPool``."""
+
+    def __init__(self, host: str, pool: OllamaConnectionPool, **model_config: Any):
+        """Initialize the model bound to a connection pool; the pool's balancer picks the host of each call."""
+        super().__init__(host, **model_config)
+        self.pool = pool
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, *, tool_choice=None, **kwargs):
+        """Stream a conversation turn; mirrors ``OllamaModel.stream`` over the pooled client."""
+        request = self.format_request(messages, tool_specs, system_prompt)
+        request["stream"] = True
+        tool_requested = False
+        started = False
+        event = None
+
+        try:
+            async for event in self.pool.chat(request, current_session_id()):
+                if not started:
+                    # Like OllamaModel, only start the message once the server has answered
+                    yield self.format_chunk({"chunk_type": "message_start"})
+                    yield self.format_chunk({"chunk_type": "content_start", "data_type": "text"})
+                    started = True
+
+                for tool_call in event.message.tool_calls or []:
+                    yield self.format_chunk({"chunk_type": "content_start", "data_type": "tool", "data": tool_call})
+                    yield self.format_chunk({"chunk_type": "content_delta", "data_type": "tool", "data": tool_call})
+                    yield self.format_chunk({"chunk_type": "content_stop", "data_type": "tool", "data": tool_call})
+                    tool_requested = True
+
+                yield self.format_chunk(
+                    {"chunk_type": "content_delta", "data_type": "text", "data": event.message.content}
+                )
+        except ollama.ResponseError as error:
+            self._raise_overflow(error)
+            raise
+
+        if not started:
+            yield self.format_chunk({"chunk_type": "message_start"})
+            yield self.format_chunk({"chunk_type": "content_start", "data_type": "text"})
+
+        stop_reason = "tool_use" if tool_requested else (event.done_reason if event else None)
+
+        yield self.format_chunk({"chunk_type": "content_stop", "data_type": "text"})
+        yield self.format_chunk({"chunk_type": "message_stop", "data": stop_reason})
+        if event is not None:
+            yield self.format_chunk({"chunk_type": "metadata", "data": event})
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        """Get schema-constrained output over the pooled client."""
+        request = self.format_request(messages=prompt, system_prompt=system_prompt)
+        request["format"] = output_model.model_json_schema()
+        request["stream"] = False
+
+        response = None
+        try:
+            async for response in self.pool.chat(request, current_session_id()):
+                pass
+        except ollama.ResponseError as error:
+            self._raise_overflow(error)
+            raise
+
+        try:
+            yield {"output": output_model.model_validate_json(response.message.content.strip())}
+        except Exception as e:
+            raise ValueError(f"Failed to parse or load content into model: {e}") from e
+
+    def _raise_overflow(self, error: ollama.ResponseError):
+        """Translate Ollama context-length errors into strands' overflow exception."""
+        if any(message in str(error).lower() for message in self.OVERFLOW_MESSAGES):
+            raise ContextWindowOverflowException(str(error)) from error
+
+
+class ModelRegistry:
+    """
+    Shares one connection pool and one model instance per distinct model configuration.
+
+    ``for_agent`` resolves an agent type's model profile, so each agent type can
+    run on its own model (e.g. a small one for orchestration, a larger one for
+    evaluations) with its own generation settings. Agent types with identical
+    profiles share a model instance.
+    """
+
+    def __init__(self, pool: Optional[OllamaConnectionPool] = None, profiles: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Initialize the registry; ``profiles`` defaults to ``Config.AGENT_MODELS``."""
+        self.pool = pool or OllamaConnectionPool()
+        self.profiles = profiles if profiles is not None else config.AGENT_MODELS
+        for pattern, profile in self.profiles.items():
+            unknown = set(profile) - PROFILE_KEYS
+            if unknown:
+                logger.warning(f"Ignoring unknown model settings {sorted(unknown)} in profile {pattern!r}")
+        self._models: Dict[str, PooledOllamaModel] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_id: Optional[str] = None, **model_config: Any) -> PooledOllamaModel:
+        """
+        Get the shared model for a configuration, creating it on first use.
+
+        Args:
+            model_id: Ollama model ID; defaults to ``Config.OLLAMA_MODEL``
+            **model_config: Additional ``OllamaModel`` config (temperature, max_tokens, ...)
+
+        Returns:
+            Pooled model instance
+        """
+        model_id = model_id or config.get_ollama_model()
+        key = json.dumps([model_id, model_config], sort_keys=True, default=str)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = PooledOllamaModel(
+                    config.get_ollama_host(),
+                    pool=self.pool,
+                    model_id=model_id,
+                    **model_config
+                )
+                self._models[key] = model
+            return model
+
+    def profile(self, agent_type: str) -> Dict[str, Any]:
+        """
+        Model settings for an agent type.
+
+        Built-in defaults are applied first, then ``Config.AGENT_MODELS``; within
+        each, glob patterns (``*_evaluator``) apply before the exact agent type.
+
+        Args:
+            agent_type: Agent type, e.g. ``orchestrator`` or ``technical_evaluator``
+
+        Returns:
+            ``OllamaModel`` settings, including ``model_id``
+        """
+        resolved: Dict[str, Any] = {"model_id": config.get_ollama_model()}
+        for profiles in (DEFAULT_AGENT_PROFILES, self.profiles):
+            matching = [pattern for pattern in profiles if fnmatchcase(agent_type, pattern)]
+            # Broader patterns first, so the exact agent type wins
+            for pattern in sorted(matching, key=lambda p: (p == agent_type, len(p))):
+                resolved.update((key, value) for key, value in profiles[pattern].items() if key in PROFILE_KEYS)
+        return resolved
+
+    def for_agent(self, agent_type: str) -> PooledOllamaModel:
+        """Get the shared model for an agent type's profile."""
+        return self.get(**self.profile(agent_type))
+
+    def stats(self) -> Dict[str, Any]:
+        """Distinct model configurations in use."""
+        with self._lock:
+            models = [model.get_config() for model in self._models.values()]
+        return {"models": len(models), "model_ids": sorted({model["model_id"] for model in models})}
+
+    def close(self):
+        """Release pooled connections."""
+        self.pool.close()
@@ -4,23 +4,15 @@ Main orchestrator agent for coordinating interview workflows.
 
 import os
 import uuid
+from typing import Any, Dict, Optional
 from strands import Agent
-from strands.models.ollama import OllamaModel
-from .session_manager import SessionService, AgentFactory
+from strands.models import Model
+from .agent_cache import AgentCache
+from .runtime import get_model_registry, get_session_service, shared_session_versions
+from .specialized_agents import introduction_assistant
 from .workflow_tools import behavioral_workflow, technical_workflow
-from .specialized_agents import introduction_assistant, behavioral_question_generator, technical_question_generator
 from ..config import config
 
-# Create an Ollama model instance using config
-ollama_model = OllamaModel(
-    host=config.get_ollama_host(),  # Ollama server address
-    model_id=config.get_ollama_model()  # Specify which model to use
-)
-
-# Initialize session service and agent factory
-session_service = SessionService()
-agent_factory = AgentFactory(ollama_model, session_service)
-
 # Define the orchestrator system prompt with clear tool selection guidance
 MAIN_SYSTEM_PROMPT = """
 You are an experienced interviewer that uses specialized agents and workflows to conduct comprehensive interviews:
@@ -30,17 +22,51 @@ You are an experienced interviewer that uses specialized agents and workflows to
 - For simple questions not requiring specialized knowledge → Answer directly
 
 When a user answers a question, provide thoughtful feedback and respond with another question that builds naturally from their answer. Always maintain conversation flow and context.
+If a workflow reports its evaluation as pending, the detailed evaluation is delivered to the candidate separately; just ask the next question.
+Pass follow_up=true to a workflow only to probe deeper into the candidate's last answer; new questions come from the question bank.
 
 Always select the most appropriate tool based on the user's query and interview progress.
 """
 
+# Agent state key holding the session's position profile; persisted with the orchestrator
+POSITION_PROFILE_KEY = "position_profile"
+
+
+def build_system_prompt(profile: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the orchestrator system prompt, with the position profile appended once if set.
+    
+    Args:
+        profile: Position profile with ``position_name`` and optional ``company`` and ``description``
+        
+    Returns:
+        System prompt text
+    """
+    if not profile:
+        return MAIN_SYSTEM_PROMPT
+    
+    lines = [f"Interview Position: {profile['position_name']}"]
+    if profile.get("company"):
+        lines.append(f"Company: {profile['company']}")
+    if profile.get("description"):
+        lines.append(f"Position Description: {profile['description']}")
+    
+    return (
+        MAIN_SYSTEM_PROMPT
+        + "\nThe candidate is interviewing for the position below. Tailor every question and "
+        + "piece of feedback to it, and pass the relevant details on when calling a tool.\n\n"
+        + "\n".join(lines)
+        + "\n"
+    )
+
 
-def create_orchestrator(session_id: str = None) -> Agent:
+def create_orchestrator(session_id: str = None, model: Optional[Model] = None) -> Agent:
     """
     Create an orchestrator agent with proper session management.
     
     Args:
         session_id: Optional session ID for conversation persistence
+        model: Model to use; defaults to the ``orchestrator`` model profile
         
     Returns:
         Configured Agent instance
@@ -48,21 +74,98 @@ def create_orchestrator(session_id: str = None) -> Agent:
     if session_id is None:
         session_id = f"session_{uuid.uuid4().hex[:8]}"
     
+    session_service = get_session_service()
     session_manager = session_service.get_session_manager(session_id)
-    conversation_manager = session_service.get_conversation_manager()
+    conversation_manager = session_service.get_conversation_manager(
+        summary_model=get_model_registry().for_agent("summarizer")
+    )
     
-    return Agent(
-        model=ollama_model,
+    agent = Agent(
+        model=model or get_model_registry().for_agent("orchestrator"),
         system_prompt=MAIN_SYSTEM_PROMPT,
         session_manager=session_manager,
         conversation_manager=conversation_manager,
         tools=[
             introduction_assistant, 
-            behavioral_question_generator, 
-            technical_question_generator
+            behavioral_workflow, 
+            technical_workflow
         ]
     )
+    
+    # State was restored from the session; the system prompt is not persisted, so rebuild it
+    profile = agent.state.get(POSITION_PROFILE_KEY)
+    if profile:
+        agent.system_prompt = build_system_prompt(profile)
+    
+    return agent
+
+
+# Live orchestrators keyed by session, so hot sessions skip construction and history reload
+orchestrator_pool = AgentCache(
+    max_entries=config.ORCHESTRATOR_POOL_SIZE,
+    max_bytes=config.ORCHESTRATOR_POOL_MAX_BYTES,
+    ttl_seconds=config.ORCHESTRATOR_POOL_TTL,
+    versions=shared_session_versions
+)
+
+
+def get_orchestrator(session_id: str) -> Agent:
+    """
+    Get the live orchestrator for a session, restoring it from storage only if it is not pooled.
+    
+    Args:
+        session_id: Session ID for conversation persistence
+        
+    Returns:
+        Orchestrator Agent bound to the session
+    """
+    return orchestrator_pool.get_or_create(
+        session_id,
+        lambda: create_orchestrator(session_id),
+        session_id=session_id
+    )
+
+
+def set_position_profile(session_id: str, profile: Dict[str, Any]) -> Agent:
+    """
+    Store a session's position profile and apply it to the orchestrator's system prompt.
+    
+    The profile is kept in the orchestrator's agent state, so it is persisted with the
+    session and restored along with the conversation history.
+    
+    Args:
+        session_id: Session ID for conversation persistence
+        profile: Position profile with ``position_name`` and optional ``company`` and ``description``
+        
+    Returns:
+        Orchestrator Agent bound to the session
+    """
+    agent = get_orchestrator(session_id)
+    agent.state.set(POSITION_PROFILE_KEY, profile)
+    agent.system_prompt = build_system_prompt(profile)
+    get_session_service().save_agent(session_id, agent)
+    return agent
+
+
+def get_position_profile(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a session's position profile.
+    
+    Args:
+        session_id: Session ID for conversation persistence
+        
+    Returns:
+        The stored profile, or None if the session has none
+    """
+    # Don't create an empty session just to find out it has no profile
+    if session_id not in orchestrator_pool and get_session_service().repository.read_session(session_id) is None:
+        return None
+    return get_orchestrator(session_id).state.get(POSITION_PROFILE_KEY)
 
 
-# Create default orchestrator for backward compatibility
-orchestrator = create_orchestrator()
\ No newline at end of file
+def __getattr__(name: str):
+    # Default orchestrator for backward compatibility, built on first access rather than at import
+    if name == "orchestrator":
+        globals()["orchestrator"] = create_orchestrator()
+        return globals()["orchestrator"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
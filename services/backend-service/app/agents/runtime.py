@@ -0,0 +1,144 @@
+"""
+Process-wide agent runtime: the shared model, session service and agent factory.
+
+Nothing is built at import time. Each component is created on first use (or
+eagerly from the FastAPI lifespan via ``warm_up()``), so importing the agents
+package stays cheap and forked workers never inherit half-started state.
+``preload()`` imports the heavy modules without building anything, for a
+pre-forking server to run in its master process.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Optional, TypeVar
+
+from .model_registry import ModelRegistry, PooledOllamaModel
+from .session_manager import AgentFactory, SessionService
+from ..config import config
+from ..services.response_cache import ResponseCache
+from ..services.session_versions import SessionVersions
+
+if TYPE_CHECKING:
+    from .evaluations import BatchEvaluator, EvaluationQueue
+    from .intent_router import IntentRouter
+    from ..services.question_bank import QuestionBank
+
+T = TypeVar("T")
+
+_components: Dict[str, object] = {}
+_lock = threading.RLock()
+
+
+def _get_or_build(name: str, build: Callable[[], T]) -> T:
+    """Build a component once, thread-safely."""
+    component = _components.get(name)
+    if component is None:
+        with _lock:
+            component = _components.get(name)
+            if component is None:
+                component = build()
+                _components[name] = component
+    return component
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry and its pooled Ollama client."""
+    return _get_or_build("model_registry", ModelRegistry)
+
+
+def get_model() -> PooledOllamaModel:
+    """Get the shared default Ollama model."""
+    return get_model_registry().get(config.get_ollama_model())
+
+
+def get_session_service() -> SessionService:
+    """Get the shared session service."""
+    return _get_or_build("session_service", lambda: SessionService(versions=shared_session_versions()))
+
+
+def get_session_versions() -> SessionVersions:
+    """Get the session version store shared with other workers."""
+    return _get_or_build("session_versions", SessionVersions)
+
+
+def shared_session_versions() -> Optional[SessionVersions]:
+    """The session version store when sessions are shared between workers (``SESSION_SHARED``), else None."""
+    return get_session_versions() if config.SESSION_SHARED else None
+
+
+def get_agent_factory() -> AgentFactory:
+    """Get the shared agent factory."""
+    return _get_or_build("agent_factory", lambda: AgentFactory(get_model_registry(), get_session_service()))
+
+
+def get_evaluation_queue() -> "EvaluationQueue":
+    """Get the background answer evaluation queue."""
+    # Imported here: evaluations depends on this module
+    from .evaluations import EvaluationQueue
+    return _get_or_build("evaluation_queue", EvaluationQueue)
+
+
+def get_batch_evaluator() -> "BatchEvaluator":
+    """Get the batch answer evaluator."""
+    # Imported here: evaluations depends on this module
+    from .evaluations import BatchEvaluator
+    return _get_or_build("batch_evaluator", BatchEvaluator)
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the cache for deterministic agent responses."""
+    return _get_or_build("response_cache", ResponseCache)
+
+
+def get_question_bank() -> "QuestionBank":
+    """Get the local question bank."""
+    # Imported here: the bank pulls in the shared position/question-type enums
+    from ..services.question_bank import QuestionBank
+    return _get_or_build("question_bank", QuestionBank)
+
+
+def get_intent_router() -> "IntentRouter":
+    """Get the local intent router, training its classifier on first use."""
+    # Imported here: the router depends on the agent modules, which depend on this one
+    from .intent_router import IntentRouter
+    return _get_or_build("intent_router", IntentRouter)
+
+
+def is_built(name: str) -> bool:
+    """Whether a component has been built yet (``model_registry``, ``session_service``, ``agent_factory``, ...)."""
+    return name in _components
+
+
+def preload():
+    """
+    Import the modules that components and workflows load lazily, without building anything.
+
+    Run in a pre-forking server's master process (see ``gunicorn.conf.py``) so
+    workers share the imported code instead of each importing it on first use.
+    """
+    # Imported here: these modules depend on this one
+    import strands.multiagent
+    from . import evaluations, intent_router, workflow_tools
+    from ..services import question_bank
+
+
+def warm_up():
+    """Build every component and compile the workflow graphs ahead of the first request."""
+    get_agent_factory()
+    if config.QUESTION_BANK_ENABLED:
+        # Opens (or builds) the index now rather than on the first question
+        get_question_bank().available
+    if config.INTENT_ROUTER_ENABLED:
+        get_intent_router()
+    # Imported here: workflow_tools depends on this module
+    from .workflow_tools import workflow_pool
+    workflow_pool.warm_up(evaluate=config.EVALUATION_MODE != "async")
+
+
+def shutdown():
+    """Stop background evaluation, flush session writes and release model connections for whatever was built."""
+    if is_built("evaluation_queue"):
+        get_evaluation_queue().shutdown()
+    if is_built("session_service"):
+        get_session_service().close()
+    if is_built("model_registry"):
+        get_model_registry().close()
@@ -0,0 +1,38 @@
+"""
+The session a turn belongs to, visible to tools and nested agents.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Set for the duration of a turn; strands copies context into tool threads,
+# so tools see the session without relying on the model to pass it along.
+_session_id: ContextVar[Optional[str]] = ContextVar("session_id", default=None)
+
+
+@contextmanager
+def bind_session(session_id: str) -> Iterator[None]:
+    """Mark the current turn as belonging to ``session_id``."""
+    token = _session_id.set(session_id)
+    try:
+        yield
+    finally:
+        _session_id.reset(token)
+
+
+def current_session_id() -> Optional[str]:
+    """The session of the running turn, if any."""
+    return _session_id.get()
+
+
+def resolve_session_id(session_id: Optional[str] = None) -> str:
+    """
+    Pick the session a tool call should use.
+
+    An explicit session ID from the model wins; the placeholder ``"default"``
+    (or nothing) falls back to the running turn's session.
+    """
+    if session_id and session_id != "default":
+        return session_id
+    return current_session_id() or "default"
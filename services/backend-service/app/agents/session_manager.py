@@ -3,45 +3,134 @@ Session management and conversation handling for PrepWise agents.
 """
 
 import os
-from typing import Optional
+import uuid
+from typing import Any, Dict, List, Optional
 from strands import Agent
-from strands.session.file_session_manager import FileSessionManager
-from strands.agent.conversation_manager import SlidingWindowConversationManager, SummarizingConversationManager
-from strands.models.ollama import OllamaModel
+from strands.hooks import MessageAddedEvent
+from strands.session.repository_session_manager import RepositorySessionManager
+from strands.models import Model
+from strands.types.content import Message
+from strands.types.session import SessionAgent
+from .agent_cache import AgentCache
+from .conversation import TokenBudgetConversationManager
+from .model_registry import ModelRegistry
+from .session_store import create_session_repository
+from .streaming import sub_agent_callback_handler
 from ..config import config
+from ..services.background_worker import BackgroundWorker
+from ..services.session_versions import SessionVersions
 
 
 class SessionService:
     """Manages session persistence and conversation context for agents."""
     
-    def __init__(self, storage_dir: Optional[str] = None):
-        """Initialize session service with storage directory."""
+    def __init__(self,
+                 storage_dir: Optional[str] = None,
+                 backend: Optional[str] = None,
+                 versions: Optional[SessionVersions] = None):
+        """
+        Initialize session service with storage directory and configured backend.
+
+        ``versions`` is given when other workers share the sessions: every turn is
+        then flushed and announced to them.
+        """
         self.storage_dir = storage_dir or config.get_session_storage_dir()
-        config.ensure_session_storage_dir()
+        self.backend = backend or config.SESSION_BACKEND
+        self.versions = versions
+        if self.backend == "file":
+            config.ensure_session_storage_dir()
         
-        # Create conversation manager with summarization for long conversations
-        self.conversation_manager = SummarizingConversationManager()
+        # One repository serves every session; managers are cheap per-session views onto it
+        self.repository = create_session_repository(self.backend, storage_dir=self.storage_dir)
+        
+        # Running summaries are computed here between turns, never on the request path
+        self.summary_worker = BackgroundWorker(
+            "summarizer", max_workers=config.SUMMARY_WORKERS, work_class="summarization"
+        )
     
-    def get_session_manager(self, session_id: str) -> FileSessionManager:
+    def get_session_manager(self, session_id: str) -> RepositorySessionManager:
         """Get or create a session manager for the given session ID."""
-        return FileSessionManager(
+        return RepositorySessionManager(
             session_id=session_id,
-            storage_dir=self.storage_dir
+            session_repository=self.repository
         )
     
-    def get_conversation_manager(self):
-        """Get the conversation manager instance."""
-        return self.conversation_manager
+    def get_conversation_manager(self, summary_model: Optional[Model] = None) -> TokenBudgetConversationManager:
+        """
+        Create a conversation manager for one agent; managers hold per-agent summary state.
+        
+        Args:
+            summary_model: Model that writes the running summary; defaults to the agent's own model
+        """
+        return TokenBudgetConversationManager(self.summary_worker, summary_model=summary_model)
+    
+    def end_turn(self, session_id: str):
+        """Make a finished turn durable according to the configured durability level, and announce it to other workers."""
+        if config.SESSION_DURABILITY == "turn" or self.versions is not None:
+            # Other workers reload the session from storage, so it must be there before they hear of it
+            self.flush(session_id)
+        if self.versions is not None:
+            self.versions.bump(session_id)
+    
+    def save_agent(self, session_id: str, agent: Agent):
+        """Persist an agent's state outside of a turn, e.g. after a profile change."""
+        self.repository.update_agent(session_id, SessionAgent.from_agent(agent))
+        self.end_turn(session_id)
+    
+    def append_messages(self, session_id: str, agent: Agent, messages: List[Message]):
+        """
+        Record messages of a turn that was answered without running the agent, e.g. from a cache.
+
+        The messages go through the agent's ``MessageAddedEvent`` hooks, so they are
+        persisted and seen by its conversation manager like a regular turn.
+        """
+        for message in messages:
+            # Same durable ID the agent loop gives the messages it adds
+            if not message.get("tracking_id"):
+                message["tracking_id"] = str(uuid.uuid4())
+            agent.messages.append(message)
+            agent.hooks.invoke_callbacks(MessageAddedEvent(agent=agent, message=message))
+        self.end_turn(session_id)
+    
+    def append_exchange(self, session_id: str, agent: Agent, prompt: str, response: str):
+        """Record a plain prompt/response turn; see ``append_messages``."""
+        self.append_messages(session_id, agent, [
+            {"role": "user", "content": [{"text": prompt}]},
+            {"role": "assistant", "content": [{"text": response}]}
+        ])
+    
+    def flush(self, session_id: Optional[str] = None):
+        """Persist any journaled session writes (no-op for write-through storage)."""
+        flush = getattr(self.repository, "flush", None)
+        if flush is not None:
+            flush(session_id)
+    
+    def journal_stats(self) -> Optional[Dict[str, Any]]:
+        """Write-behind journal counters, or None for write-through storage."""
+        stats = getattr(self.repository, "stats", None)
+        return stats() if stats is not None else None
+    
+    def close(self):
+        """Stop background summarization and flush pending writes durably; call on shutdown."""
+        self.summary_worker.shutdown(wait=False)
+        close = getattr(self.repository, "close", None)
+        if close is not None:
+            close()
 
 
 class AgentFactory:
     """Factory for creating specialized agents with consistent configuration."""
     
-    def __init__(self, model: OllamaModel, session_service: SessionService):
-        """Initialize agent factory with model and session service."""
-        self.model = model
+    def __init__(self, model_registry: ModelRegistry, session_service: SessionService):
+        """Initialize agent factory with the model registry and session service."""
+        self.model_registry = model_registry
         self.session_service = session_service
-        self._agents_cache = {}
+        self._agents_cache = AgentCache(
+            max_entries=config.AGENT_CACHE_SIZE,
+            max_bytes=config.AGENT_CACHE_MAX_BYTES,
+            ttl_seconds=config.AGENT_CACHE_TTL,
+            versions=lambda: session_service.versions
+        )
     
     def create_agent(self, 
                     agent_type: str, 
@@ -62,20 +151,62 @@ class AgentFactory:
         """
         cache_key = f"{agent_type}_{session_id}"
         
-        if cache_key not in self._agents_cache:
+        def build_agent() -> Agent:
             session_manager = self.session_service.get_session_manager(session_id)
-            conversation_manager = self.session_service.get_conversation_manager()
+            conversation_manager = self.session_service.get_conversation_manager(
+                summary_model=self.model_registry.for_agent("summarizer")
+            )
             
-            self._agents_cache[cache_key] = Agent(
-                model=self.model,
+            return Agent(
+                # Each agent type runs on its own model profile (model ID and generation settings)
+                model=self.model_registry.for_agent(agent_type),
                 system_prompt=system_prompt,
+                agent_id=agent_type,
                 session_manager=session_manager,
                 conversation_manager=conversation_manager,
-                tools=tools or []
+                tools=tools or [],
+                callback_handler=sub_agent_callback_handler(agent_type)
             )
         
-        return self._agents_cache[cache_key]
+        return self._agents_cache.get_or_create(cache_key, build_agent, session_id=session_id)
+    
+    def create_ephemeral_agent(self, agent_type: str, system_prompt: str) -> Agent:
+        """
+        Create a single-use agent with no session, history persistence or caching.
+        
+        For one-off calls such as batch evaluations, where unrelated inputs must not
+        share a conversation.
+        
+        Args:
+            agent_type: Type identifier for the agent, selects its model profile
+            system_prompt: System prompt for the agent
+            
+        Returns:
+            New Agent instance
+        """
+        return Agent(
+            model=self.model_registry.for_agent(agent_type),
+            system_prompt=system_prompt,
+            agent_id=agent_type,
+            callback_handler=None
+        )
+    
+    def clear_cache(self, session_id: Optional[str] = None) -> int:
+        """
+        Invalidate cached agents.
+        
+        Args:
+            session_id: Only drop agents belonging to this session; drops all when omitted
+            
+        Returns:
+            Number of agents dropped
+        """
+        if session_id is None:
+            dropped = len(self._agents_cache)
+            self._agents_cache.clear()
+            return dropped
+        return self._agents_cache.invalidate_session(session_id)
     
-    def clear_cache(self):
-        """Clear the agents cache."""
-        self._agents_cache.clear()
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get agent cache size and hit/miss/eviction counters."""
+        return self._agents_cache.stats()
@@ -0,0 +1,530 @@
+"""
+Pluggable session repositories for PrepWise agents.
+
+Two backends implement the strands ``SessionRepository`` interface:
+
+- ``file``: the strands file layout (one JSON file per session, agent and message)
+- ``sqlite``: a single embedded SQLite database in WAL mode with indexed lookups,
+  append-only message inserts and single-query history loads
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from strands.session.session_repository import SessionRepository
+from strands.types.exceptions import SessionException
+from strands.types.session import Session, SessionAgent, SessionMessage
+
+from ..config import config
+
+
+class FileSessionRepository(SessionRepository):
+    """
+    Session repository in the strands file layout, serving every session under ``storage_dir``.
+
+    The layout is the one ``FileSessionManager`` writes, so existing session
+    directories stay readable::
+
+        <storage_dir>/session_<session_id>/session.json
+        <storage_dir>/session_<session_id>/agents/agent_<agent_id>/agent.json
+        <storage_dir>/session_<session_id>/agents/agent_<agent_id>/messages/message_<n>.json
+        <storage_dir>/session_<session_id>/multi_agents/multi_agent_<id>/multi_agent.json
+
+    ``FileSessionManager`` itself is a manager bound to one session, so it is
+    not used here. Files are written atomically (temporary file and rename).
+    """
+
+    def __init__(self, storage_dir: str):
+        """Initialize the repository rooted at ``storage_dir``."""
+        self.storage_dir = storage_dir
+        os.makedirs(self.storage_dir, mode=0o700, exist_ok=True)
+
+    # Paths
+
+    @staticmethod
+    def _name(kind: str, identifier: str) -> str:
+        """Directory name for an ID, refusing IDs that would escape the storage directory."""
+        if not identifier or "/" in identifier or "\\" in identifier or identifier in (".", ".."):
+            raise ValueError(f"Invalid {kind} ID: {identifier!r}")
+        return f"{kind}_{identifier}"
+
+    def _session_path(self, session_id: str) -> str:
+        return os.path.join(self.storage_dir, self._name("session", session_id))
+
+    def _agent_path(self, session_id: str, agent_id: str) -> str:
+        return os.path.join(self._session_path(session_id), "agents", self._name("agent", agent_id))
+
+    def _message_path(self, session_id: str, agent_id: str, message_id: int) -> str:
+        if not isinstance(message_id, int):
+            raise ValueError(f"Message ID must be an integer: {message_id!r}")
+        return os.path.join(self._agent_path(session_id, agent_id), "messages", f"message_{message_id}.json")
+
+    def _multi_agent_file(self, session_id: str, multi_agent_id: str) -> str:
+        return os.path.join(
+            self._session_path(session_id), "multi_agents", self._name("multi_agent", multi_agent_id), "multi_agent.json"
+        )
+
+    # Files
+
+    @staticmethod
+    def _read_file(path: str) -> Optional[Dict[str, Any]]:
+        """Decode a JSON file; None if it does not exist."""
+        if os.path.islink(path):
+            raise SessionException(f"Refusing to read symlink at {path}")
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise SessionException(f"Invalid JSON in file {path}: {str(e)}") from e
+
+    @staticmethod
+    def _write_file(path: str, data: Dict[str, Any]):
+        """Write a JSON file atomically."""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if os.path.islink(path):
+            raise SessionException(f"Refusing to write to symlink at {path}")
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".session_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    # Sessions
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        """Create a new session."""
+        session_dir = self._session_path(session.session_id)
+        if os.path.exists(session_dir):
+            raise SessionException(f"Session {session.session_id} already exists")
+        for subdir in ("agents", "multi_agents"):
+            os.makedirs(os.path.join(session_dir, subdir), mode=0o700, exist_ok=True)
+        self._write_file(os.path.join(session_dir, "session.json"), session.to_dict())
+        return session
+
+    def read_session(self, session_id: str, **kwargs: Any) -> Optional[Session]:
+        """Read session data."""
+        data = self._read_file(os.path.join(self._session_path(session_id), "session.json"))
+        return Session.from_dict(data) if data else None
+
+    def delete_session(self, session_id: str, **kwargs: Any) -> None:
+        """Delete a session and everything stored under it."""
+        session_dir = self._session_path(session_id)
+        if not os.path.exists(session_dir):
+            raise SessionException(f"Session {session_id} does not exist")
+        shutil.rmtree(session_dir)
+
+    # Agents
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        """Create a new agent in the session."""
+        agent_dir = self._agent_path(session_id, session_agent.agent_id)
+        os.makedirs(os.path.join(agent_dir, "messages"), mode=0o700, exist_ok=True)
+        self._write_file(os.path.join(agent_dir, "agent.json"), session_agent.to_dict())
+
+    def read_agent(self, session_id: str, agent_id: str, **kwargs: Any) -> Optional[SessionAgent]:
+        """Read agent data."""
+        data = self._read_file(os.path.join(self._agent_path(session_id, agent_id), "agent.json"))
+        return SessionAgent.from_dict(data) if data else None
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        """Update agent data, preserving its creation timestamp."""
+        previous_agent = self.read_agent(session_id, session_agent.agent_id)
+        if previous_agent is None:
+            raise SessionException(f"Agent {session_agent.agent_id} in session {session_id} does not exist")
+
+        session_agent.created_at = previous_agent.created_at
+        self._write_file(os.path.join(self._agent_path(session_id, session_agent.agent_id), "agent.json"), session_agent.to_dict())
+
+    # Messages
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        """Append a message for the agent."""
+        self._write_file(self._message_path(session_id, agent_id, session_message.message_id), session_message.to_dict())
+
+    def read_message(self, session_id: str, agent_id: str, message_id: int, **kwargs: Any) -> Optional[SessionMessage]:
+        """Read message data."""
+        data = self._read_file(self._message_path(session_id, agent_id, message_id))
+        return SessionMessage.from_dict(data) if data else None
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        """Update a message (used for redaction), preserving its creation timestamp."""
+        previous_message = self.read_message(session_id, agent_id, session_message.message_id)
+        if previous_message is None:
+            raise SessionException(f"Message {session_message.message_id} does not exist")
+
+        session_message.created_at = previous_message.created_at
+        self._write_file(self._message_path(session_id, agent_id, session_message.message_id), session_message.to_dict())
+
+    def list_messages(
+        self, session_id: str, agent_id: str, limit: Optional[int] = None, offset: int = 0, **kwargs: Any
+    ) -> List[SessionMessage]:
+        """Load an agent's history in message order."""
+        messages_dir = os.path.join(self._agent_path(session_id, agent_id), "messages")
+        if not os.path.isdir(messages_dir):
+            raise SessionException(f"Messages directory missing from agent: {agent_id} in session {session_id}")
+
+        message_ids = sorted(
+            int(name[len("message_"):-len(".json")])
+            for name in os.listdir(messages_dir)
+            if name.startswith("message_") and name.endswith(".json")
+        )
+        message_ids = message_ids[offset:] if limit is None else message_ids[offset:offset + limit]
+        return [
+            SessionMessage.from_dict(self._read_file(os.path.join(messages_dir, f"message_{message_id}.json")))
+            for message_id in message_ids
+        ]
+
+    # Multi-agent state
+
+    def create_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        """Create a new multi-agent state in the session."""
+        self._write_file(self._multi_agent_file(session_id, multi_agent.id), multi_agent.serialize_state())
+
+    def read_multi_agent(self, session_id: str, multi_agent_id: str, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """Read multi-agent state."""
+        return self._read_file(self._multi_agent_file(session_id, multi_agent_id))
+
+    def update_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        """Update multi-agent state."""
+        if self.read_multi_agent(session_id, multi_agent.id) is None:
+            raise SessionException(f"MultiAgent state {multi_agent.id} in session {session_id} does not exist")
+        self.create_multi_agent(session_id, multi_agent)
+
+
+class SQLiteSessionRepository(SessionRepository):
+    """
+    Session repository backed by an embedded SQLite database in WAL mode.
+
+    Each thread gets its own connection; WAL lets readers proceed while a writer
+    commits, and ``synchronous=NORMAL`` makes a commit a single WAL append
+    instead of an fsync per file.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS agents (
+            session_id TEXT NOT NULL,
+            agent_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (session_id, agent_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS messages (
+            session_id TEXT NOT NULL,
+            agent_id TEXT NOT NULL,
+            message_id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (session_id, agent_id, message_id)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS multi_agents (
+            session_id TEXT NOT NULL,
+            multi_agent_id TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (session_id, multi_agent_id)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_path: str):
+        """Open (and if needed create) the session database."""
+        self.db_path = db_path
+        db_dir = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(db_dir, exist_ok=True)
+        self._local = threading.local()
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+        return connection
+
+    def batch(self) -> "_transaction":
+        """Group the calling thread's subsequent writes into one transaction."""
+        return _transaction(self._connect())
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Run a single statement in autocommit mode."""
+        return self._connect().execute(sql, params)
+
+    def _fetch_data(self, sql: str, params: tuple) -> Optional[Dict[str, Any]]:
+        """Fetch one JSON ``data`` column, decoded."""
+        row = self._execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        """Create a new session."""
+        try:
+            self._execute(
+                "INSERT INTO sessions (session_id, data) VALUES (?, ?)",
+                (session.session_id, json.dumps(session.to_dict()))
+            )
+        except sqlite3.IntegrityError as e:
+            raise SessionException(f"Session {session.session_id} already exists") from e
+        return session
+
+    def read_session(self, session_id: str, **kwargs: Any) -> Optional[Session]:
+        """Read session data."""
+        data = self._fetch_data("SELECT data FROM sessions WHERE session_id = ?", (session_id,))
+        return Session.from_dict(data) if data else None
+
+    def delete_session(self, session_id: str, **kwargs: Any) -> None:
+        """Delete a session and everything stored under it."""
+        connection = self._connect()
+        with _transaction(connection):
+            deleted = connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+            if not deleted:
+                raise SessionException(f"Session {session_id} does not exist")
+            for table in ("agents", "messages", "multi_agents"):
+                connection.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        """Create a new agent in the session."""
+        self._execute(
+            "INSERT OR REPLACE INTO agents (session_id, agent_id, data) VALUES (?, ?, ?)",
+            (session_id, session_agent.agent_id, json.dumps(session_agent.to_dict()))
+        )
+
+    def read_agent(self, session_id: str, agent_id: str, **kwargs: Any) -> Optional[SessionAgent]:
+        """Read agent data."""
+        data = self._fetch_data(
+            "SELECT data FROM agents WHERE session_id = ? AND agent_id = ?",
+            (session_id, agent_id)
+        )
+        return SessionAgent.from_dict(data) if data else None
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        """Update agent data, preserving its creation timestamp."""
+        previous_agent = self.read_agent(session_id, session_agent.agent_id)
+        if previous_agent is None:
+            raise SessionException(f"Agent {session_agent.agent_id} in session {session_id} does not exist")
+
+        session_agent.created_at = previous_agent.created_at
+        self._execute(
+            "UPDATE agents SET data = ? WHERE session_id = ? AND agent_id = ?",
+            (json.dumps(session_agent.to_dict()), session_id, session_agent.agent_id)
+        )
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        """Append a message for the agent."""
+        self._execute(
+            "INSERT OR REPLACE INTO messages (session_id, agent_id, message_id, data) VALUES (?, ?, ?, ?)",
+            (session_id, agent_id, session_message.message_id, json.dumps(session_message.to_dict()))
+        )
+
+    def read_message(self, session_id: str, agent_id: str, message_id: int, **kwargs: Any) -> Optional[SessionMessage]:
+        """Read message data."""
+        data = self._fetch_data(
+            "SELECT data FROM messages WHERE session_id = ? AND agent_id = ? AND message_id = ?",
+            (session_id, agent_id, message_id)
+        )
+        return SessionMessage.from_dict(data) if data else None
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        """Update a message (used for redaction), preserving its creation timestamp."""
+        previous_message = self.read_message(session_id, agent_id, session_message.message_id)
+        if previous_message is None:
+            raise SessionException(f"Message {session_message.message_id} does not exist")
+
+        session_message.created_at = previous_message.created_at
+        self._execute(
+            "UPDATE messages SET data = ? WHERE session_id = ? AND agent_id = ? AND message_id = ?",
+            (json.dumps(session_message.to_dict()), session_id, agent_id, session_message.message_id)
+        )
+
+    def list_messages(
+        self, session_id: str, agent_id: str, limit: Optional[int] = None, offset: int = 0, **kwargs: Any
+    ) -> List[SessionMessage]:
+        """Load an agent's history, in order, with one indexed range query."""
+        rows = self._execute(
+            "SELECT data FROM messages WHERE session_id = ? AND agent_id = ? "
+            "ORDER BY message_id LIMIT ? OFFSET ?",
+            (session_id, agent_id, -1 if limit is None else limit, offset)
+        ).fetchall()
+        return [SessionMessage.from_dict(json.loads(row[0])) for row in rows]
+
+    def create_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        """Create a new multi-agent state in the session."""
+        self._execute(
+            "INSERT OR REPLACE INTO multi_agents (session_id, multi_agent_id, data) VALUES (?, ?, ?)",
+            (session_id, multi_agent.id, json.dumps(multi_agent.serialize_state()))
+        )
+
+    def read_multi_agent(self, session_id: str, multi_agent_id: str, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """Read multi-agent state."""
+        return self._fetch_data(
+            "SELECT data FROM multi_agents WHERE session_id = ? AND multi_agent_id = ?",
+            (session_id, multi_agent_id)
+        )
+
+    def update_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        """Update multi-agent state."""
+        if self.read_multi_agent(session_id, multi_agent.id) is None:
+            raise SessionException(f"MultiAgent state {multi_agent.id} in session {session_id} does not exist")
+        self.create_multi_agent(session_id, multi_agent)
+
+    def import_session(self,
+                       session: Session,
+                       agents: List[SessionAgent],
+                       messages: Dict[str, List[SessionMessage]]) -> int:
+        """
+        Write a complete session in one transaction, replacing any existing copy.
+
+        Args:
+            session: Session record
+            agents: Agent records of the session
+            messages: Messages per agent ID
+
+        Returns:
+            Number of imported messages
+        """
+        connection = self._connect()
+        with _transaction(connection):
+            # Rows the new copy does not have (agents, trimmed messages) must not survive it
+            for table in ("sessions", "agents", "messages", "multi_agents"):
+                connection.execute(f"DELETE FROM {table} WHERE session_id = ?", (session.session_id,))
+            connection.execute(
+                "INSERT INTO sessions (session_id, data) VALUES (?, ?)",
+                (session.session_id, json.dumps(session.to_dict()))
+            )
+            for session_agent in agents:
+                connection.execute(
+                    "INSERT INTO agents (session_id, agent_id, data) VALUES (?, ?, ?)",
+                    (session.session_id, session_agent.agent_id, json.dumps(session_agent.to_dict()))
+                )
+            rows = [
+                (session.session_id, agent_id, message.message_id, json.dumps(message.to_dict()))
+                for agent_id, agent_messages in messages.items()
+                for message in agent_messages
+            ]
+            connection.executemany(
+                "INSERT INTO messages (session_id, agent_id, message_id, data) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+
+class _transaction:
+    """Explicit BEGIN/COMMIT for connections opened in autocommit mode."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, exc, tb):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def create_session_repository(backend: Optional[str] = None,
+                              storage_dir: Optional[str] = None,
+                              db_path: Optional[str] = None,
+                              durability: Optional[str] = None) -> SessionRepository:
+    """
+    Build the session repository selected by config.
+
+    Args:
+        backend: ``file`` or ``sqlite``; defaults to ``Config.SESSION_BACKEND``
+        storage_dir: Directory for the file backend
+        db_path: Database path for the SQLite backend
+        durability: ``strict`` writes through; ``turn`` and ``relaxed`` put a
+            write-behind journal in front of the backend. Defaults to
+            ``Config.SESSION_DURABILITY``
+
+    Returns:
+        Session repository instance
+    """
+    backend = (backend or config.SESSION_BACKEND).lower()
+    if backend == "sqlite":
+        repository = SQLiteSessionRepository(db_path or config.SESSION_DB_PATH)
+    elif backend == "file":
+        repository = FileSessionRepository(storage_dir or config.get_session_storage_dir())
+    else:
+        raise ValueError(f"Unknown session backend: {backend}")
+
+    durability = (durability or config.SESSION_DURABILITY).lower()
+    if durability == "strict":
+        return repository
+    if durability in ("turn", "relaxed"):
+        from .write_behind import WriteBehindSessionRepository
+        return WriteBehindSessionRepository(
+            repository,
+            flush_interval=config.SESSION_FLUSH_INTERVAL,
+            max_pending=config.SESSION_FLUSH_MAX_PENDING,
+            max_attempts=config.SESSION_FLUSH_MAX_ATTEMPTS,
+            dead_letter_path=config.SESSION_DEAD_LETTER_PATH
+        )
+    raise ValueError(f"Unknown session durability level: {durability}")
+
+
+def migrate_file_sessions(storage_dir: str, target: SQLiteSessionRepository) -> Dict[str, int]:
+    """
+    Import every session stored in the strands file layout into a SQLite repository.
+
+    Sessions are imported one transaction each, so re-running the migration is safe.
+
+    Args:
+        storage_dir: Root directory of the file sessions
+        target: Destination repository
+
+    Returns:
+        Counts of imported sessions, agents and messages, and skipped sessions
+    """
+    source = FileSessionRepository(storage_dir)
+    counts = {"sessions": 0, "agents": 0, "messages": 0, "skipped": 0}
+
+    for entry in sorted(os.listdir(storage_dir)):
+        if not entry.startswith("session_") or not os.path.isdir(os.path.join(storage_dir, entry)):
+            continue
+        session_id = entry[len("session_"):]
+
+        try:
+            session = source.read_session(session_id)
+            if session is None:
+                raise SessionException("missing session.json")
+
+            agents: List[SessionAgent] = []
+            messages: Dict[str, List[SessionMessage]] = {}
+            agents_dir = os.path.join(storage_dir, entry, "agents")
+            for agent_entry in sorted(os.listdir(agents_dir)) if os.path.isdir(agents_dir) else []:
+                if not agent_entry.startswith("agent_"):
+                    continue
+                agent_id = agent_entry[len("agent_"):]
+                session_agent = source.read_agent(session_id, agent_id)
+                if session_agent is None:
+                    continue
+                agents.append(session_agent)
+                messages[agent_id] = source.list_messages(session_id, agent_id)
+
+            counts["messages"] += target.import_session(session, agents, messages)
+            counts["agents"] += len(agents)
+            counts["sessions"] += 1
+        except Exception as e:
+            logger.warning(f"Skipping session {session_id}: {str(e)}")
+            counts["skipped"] += 1
+
+    return counts
@@ -2,27 +2,159 @@
 Specialized interview agents using the AgentFactory pattern.
 """
 
+import json
 import os
+from typing import Any, Optional
+from loguru import logger
 from strands import tool
-from strands.models.ollama import OllamaModel
-from .session_manager import AgentFactory, SessionService
+from .runtime import get_agent_factory, get_question_bank, get_response_cache, get_session_service
+from .session_context import resolve_session_id
+from .structured_output import compact, question_text, result_text, structured_call
 from ..config import config
+from ..models.response_models import AnswerEvaluation, InterviewResponse
 
+# Question types each generator draws from the question bank, in order of preference
+QUESTION_BANK_TYPES = {
+    "behavioral_generator": ("behavioral", "situational"),
+    "technical_generator": ("technical",)
+}
 
-# Create an Ollama model instance using config
-ollama_model = OllamaModel(
-    host=config.get_ollama_host(),  # Ollama server address
-    model_id=config.get_ollama_model()  # Specify which model to use
-)
+# Generator agent state key holding the IDs of bank questions already asked in the session
+ASKED_QUESTIONS_KEY = "asked_questions"
+
+# Generator agent state key holding the last question asked that the candidate has not answered yet
+PENDING_QUESTION_KEY = "pending_question"
+
+
+def bank_question(agent_type: str, system_prompt: str, session_id: str, user_input: str = "") -> Optional[str]:
+    """
+    Pick the session's next question from the local question bank instead of generating it.
+
+    The question is chosen for the session's position profile, ranked against its
+    job description, and never repeats within the session; the number already
+    asked sets the difficulty. Asked question IDs are kept in the generator
+    agent's state so they survive restarts, and the exchange is recorded in the
+    generator's history as if it had asked the question itself.
+
+    Args:
+        agent_type: Question generator agent type, a key of ``QUESTION_BANK_TYPES``
+        system_prompt: The generator's system prompt
+        session_id: Session ID for conversation persistence
+        user_input: The user's input the question answers, for the generator's history
+
+    Returns:
+        The question text, or None if the bank is disabled or has no question for the session
+    """
+    if not config.QUESTION_BANK_ENABLED:
+        return None
+    # Imported here: orchestrator imports this module
+    from .orchestrator import get_position_profile
+
+    profile = get_position_profile(session_id)
+    if not profile:
+        return None
+    agent = get_agent_factory().create_agent(
+        agent_type=agent_type,
+        system_prompt=system_prompt,
+        session_id=session_id
+    )
+    asked = agent.state.get(ASKED_QUESTIONS_KEY) or []
+    context = " ".join(filter(None, [profile.get("position_name"), profile.get("description")]))
+    question = get_question_bank().pick(profile.get("position_name"), QUESTION_BANK_TYPES[agent_type], context, asked)
+    if question is None:
+        return None
+
+    agent.state.set(ASKED_QUESTIONS_KEY, asked + [question.id])
+    agent.state.set(PENDING_QUESTION_KEY, question.question)
+    # Recording the exchange persists the state too
+    get_session_service().append_exchange(session_id, agent, user_input or "Ask me the next question.", bank_reply(agent_type, question.question))
+    logger.debug(f"Question bank served {question.question_type}/{question.difficulty} question {question.id} to session {session_id}")
+    return question.question
+
+
+def agent_reply(agent, user_input: str, session_id: str, output_model) -> str:
+    """
+    Run a specialized agent on the user's input.
+
+    Args:
+        agent: The session's specialized agent
+        user_input: The user's input or response
+        session_id: Session ID for conversation persistence
+        output_model: Reply schema used with ``STRUCTURED_OUTPUT_ENABLED``
+
+    Returns:
+        The reply as compact ``output_model`` JSON with structured output enabled, else the agent's text
+    """
+    if config.STRUCTURED_OUTPUT_ENABLED:
+        return compact(structured_call(agent, output_model, user_input, session_id))
+    return result_text(agent(user_input))
+
+
+def remember_question(agent_type: str, system_prompt: str, session_id: str, reply: Any):
+    """
+    Keep a question the generator just asked as the session's outstanding question.
+
+    Args:
+        agent_type: Question generator agent type
+        system_prompt: The generator's system prompt
+        session_id: Session ID for conversation persistence
+        reply: The generator's reply: question text, or an ``InterviewResponse`` as a dict or compact JSON
+    """
+    if isinstance(reply, str) and config.STRUCTURED_OUTPUT_ENABLED:
+        reply = json.loads(reply)
+    question = question_text(reply) if not isinstance(reply, str) else reply.strip()
+    if not question:
+        return
+    agent = get_agent_factory().create_agent(agent_type=agent_type, system_prompt=system_prompt, session_id=session_id)
+    agent.state.set(PENDING_QUESTION_KEY, question)
+    get_session_service().save_agent(session_id, agent)
+
+
+def take_pending_question(agent_type: str, system_prompt: str, session_id: str) -> Optional[str]:
+    """
+    Take the session's outstanding question, the one the user's next input answers.
+
+    Args:
+        agent_type: Question generator agent type
+        system_prompt: The generator's system prompt
+        session_id: Session ID for conversation persistence
+
+    Returns:
+        The question, now no longer outstanding; None if no question is waiting for an answer
+    """
+    agent = get_agent_factory().create_agent(agent_type=agent_type, system_prompt=system_prompt, session_id=session_id)
+    question = agent.state.get(PENDING_QUESTION_KEY)
+    if question:
+        agent.state.delete(PENDING_QUESTION_KEY)
+        get_session_service().save_agent(session_id, agent)
+    return question or None
+
+
+def bank_payload(agent_type: str, question: str) -> InterviewResponse:
+    """A question bank question as a structured ``InterviewResponse``."""
+    return InterviewResponse(
+        question_type=QUESTION_BANK_TYPES[agent_type][0], question=question, metadata={"source": "question_bank"}
+    )
+
+
+def bank_reply(agent_type: str, question: str) -> str:
+    """A question bank question as the generator's reply: plain text, or compact JSON with structured output enabled."""
+    return compact(bank_payload(agent_type, question)) if config.STRUCTURED_OUTPUT_ENABLED else question
 
-# Initialize session service and agent factory
-session_service = SessionService()
-agent_factory = AgentFactory(ollama_model, session_service)
 
 INTRODUCTION_ASSISTANT_PROMPT = """
 You are a specialized introduction assistant. You are responsible for starting the interview with a user for the given role and introducing yourself to the user.
 """
 
+def _introduction_cache_input(user_input: str, session_id: str) -> str:
+    """Cache input for an introduction: the session's whole position profile, plus the user's input."""
+    # Imported here: orchestrator imports this module
+    from .orchestrator import get_position_profile
+
+    profile = get_position_profile(session_id) or {}
+    return " | ".join([json.dumps(profile, sort_keys=True, default=str), user_input])
+
+
 @tool
 def introduction_assistant(user_input: str, session_id: str = "default") -> str:
     """
@@ -36,25 +168,29 @@ def introduction_assistant(user_input: str, session_id: str = "default") -> str:
         A detailed introduction response with conversation context
     """
     try:
-        agent = agent_factory.create_agent(
+        session_id = resolve_session_id(session_id)
+        agent = get_agent_factory().create_agent(
             agent_type="introduction",
             system_prompt=INTRODUCTION_ASSISTANT_PROMPT,
             session_id=session_id
         )
-        
-        result = agent(user_input)
-        
-        # Handle different result formats
-        if hasattr(result, 'message') and hasattr(result.message, 'content'):
-            return result.message.content
-        elif hasattr(result, 'content'):
-            return result.content
-        elif isinstance(result, dict) and 'content' in result:
-            return result['content']
-        elif isinstance(result, str):
-            return result
-        else:
-            return str(result)
+
+        # The opening introduction only depends on the role, company and input, so it is shared
+        # across sessions; later turns depend on the conversation and are always generated
+        cache_input = None
+        if config.RESPONSE_CACHE_ENABLED and not agent.messages:
+            cache_input = _introduction_cache_input(user_input, session_id)
+            model_id = agent.model.get_config().get("model_id", "")
+            cached = get_response_cache().get("introduction", INTRODUCTION_ASSISTANT_PROMPT, cache_input, model_id)
+            if cached is not None:
+                get_session_service().append_exchange(session_id, agent, user_input, cached)
+                return cached
+
+        response = result_text(agent(user_input))
+
+        if cache_input is not None and isinstance(response, str) and response.strip():
+            get_response_cache().put("introduction", INTRODUCTION_ASSISTANT_PROMPT, cache_input, model_id, response)
+        return response
     except Exception as e:
         return f"Error in introduction assistant: {str(e)}"
 
@@ -63,37 +199,35 @@ You are a specialized behavioral question assistant. You are responsible for gen
 """
 
 @tool
-def behavioral_question_generator(user_input: str, session_id: str = "default") -> str:
+def behavioral_question_generator(user_input: str, session_id: str = "default", follow_up: bool = False) -> str:
     """
     Process and respond to behavioral question queries using efficient agent management.
 
     Args:
         user_input: The user's input or response
         session_id: Session ID for conversation persistence
+        follow_up: Ask a follow-up on the user's last answer; follow-ups are always generated,
+            new questions come from the question bank when it has one
 
     Returns:
         A detailed behavioral question response with conversation context
     """
     try:
-        agent = agent_factory.create_agent(
+        session_id = resolve_session_id(session_id)
+        if not follow_up:
+            question = bank_question("behavioral_generator", BEHAVIORAL_QUESTION_GENERATOR_PROMPT, session_id, user_input)
+            if question:
+                return bank_reply("behavioral_generator", question)
+
+        agent = get_agent_factory().create_agent(
             agent_type="behavioral_generator",
             system_prompt=BEHAVIORAL_QUESTION_GENERATOR_PROMPT,
             session_id=session_id
         )
         
-        result = agent(user_input)
-        
-        # Handle different result formats
-        if hasattr(result, 'message') and hasattr(result.message, 'content'):
-            return result.message.content
-        elif hasattr(result, 'content'):
-            return result.content
-        elif isinstance(result, dict) and 'content' in result:
-            return result['content']
-        elif isinstance(result, str):
-            return result
-        else:
-            return str(result)
+        reply = agent_reply(agent, user_input, session_id, InterviewResponse)
+        remember_question("behavioral_generator", BEHAVIORAL_QUESTION_GENERATOR_PROMPT, session_id, reply)
+        return reply
     except Exception as e:
         return f"Error in behavioral question generator: {str(e)}"
 
@@ -114,25 +248,14 @@ def behavioral_question_evaluator(user_input: str, session_id: str = "default")
         A detailed evaluation response with conversation context
     """
     try:
-        agent = agent_factory.create_agent(
+        session_id = resolve_session_id(session_id)
+        agent = get_agent_factory().create_agent(
             agent_type="behavioral_evaluator",
             system_prompt=BEHAVIORAL_QUESTION_EVALUATOR_PROMPT,
             session_id=session_id
         )
         
-        result = agent(user_input)
-        
-        # Handle different result formats
-        if hasattr(result, 'message') and hasattr(result.message, 'content'):
-            return result.message.content
-        elif hasattr(result, 'content'):
-            return result.content
-        elif isinstance(result, dict) and 'content' in result:
-            return result['content']
-        elif isinstance(result, str):
-            return result
-        else:
-            return str(result)
+        return agent_reply(agent, user_input, session_id, AnswerEvaluation)
     except Exception as e:
         return f"Error in behavioral question evaluator: {str(e)}"
 
@@ -141,37 +264,35 @@ You are a specialized technical question assistant. You are responsible for gene
 """
 
 @tool
-def technical_question_generator(user_input: str, session_id: str = "default") -> str:
+def technical_question_generator(user_input: str, session_id: str = "default", follow_up: bool = False) -> str:
     """
     Process and respond to technical question queries using efficient agent management.
 
     Args:
         user_input: The user's input or response
         session_id: Session ID for conversation persistence
+        follow_up: Ask a follow-up on the user's last answer; follow-ups are always generated,
+            new questions come from the question bank when it has one
 
     Returns:
         A detailed technical question response with conversation context
     """
     try:
-        agent = agent_factory.create_agent(
+        session_id = resolve_session_id(session_id)
+        if not follow_up:
+            question = bank_question("technical_generator", TECHNICAL_QUESTION_GENERATOR_PROMPT, session_id, user_input)
+            if question:
+                return bank_reply("technical_generator", question)
+
+        agent = get_agent_factory().create_agent(
             agent_type="technical_generator",
             system_prompt=TECHNICAL_QUESTION_GENERATOR_PROMPT,
             session_id=session_id
         )
         
-        result = agent(user_input)
-        
-        # Handle different result formats
-        if hasattr(result, 'message') and hasattr(result.message, 'content'):
-            return result.message.content
-        elif hasattr(result, 'content'):
-            return result.content
-        elif isinstance(result, dict) and 'content' in result:
-            return result['content']
-        elif isinstance(result, str):
-            return result
-        else:
-            return str(result)
+        reply = agent_reply(agent, user_input, session_id, InterviewResponse)
+        remember_question("technical_generator", TECHNICAL_QUESTION_GENERATOR_PROMPT, session_id, reply)
+        return reply
     except Exception as e:
         return f"Error in technical question generator: {str(e)}"
 
@@ -192,24 +313,13 @@ def technical_question_evaluator(user_input: str, session_id: str = "default") -
         A detailed evaluation response with conversation context
     """
     try:
-        agent = agent_factory.create_agent(
+        session_id = resolve_session_id(session_id)
+        agent = get_agent_factory().create_agent(
             agent_type="technical_evaluator",
             system_prompt=TECHNICAL_QUESTION_EVALUATOR_PROMPT,
             session_id=session_id
         )
         
-        result = agent(user_input)
-        
-        # Handle different result formats
-        if hasattr(result, 'message') and hasattr(result.message, 'content'):
-            return result.message.content
-        elif hasattr(result, 'content'):
-            return result.content
-        elif isinstance(result, dict) and 'content' in result:
-            return result['content']
-        elif isinstance(result, str):
-            return result
-        else:
-            return str(result)
+        return agent_reply(agent, user_input, session_id, AnswerEvaluation)
     except Exception as e:
         return f"Error in technical question evaluator: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""
+Token streaming for agent turns, including tokens from nested tool agents.
+"""
+
+import asyncio
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from strands import Agent
+
+StreamSink = Callable[[str, Dict[str, Any]], None]
+
+# Set for the duration of a streaming turn; strands copies context into tool threads,
+# so nested agents created by the AgentFactory see the same sink.
+_stream_sink: ContextVar[Optional[StreamSink]] = ContextVar("stream_sink", default=None)
+
+
+def emit(event: str, payload: Dict[str, Any]):
+    """Send an event to the active stream, if the current turn is being streamed."""
+    sink = _stream_sink.get()
+    if sink is not None:
+        sink(event, payload)
+
+
+def sub_agent_callback_handler(agent_type: str) -> Callable[..., None]:
+    """
+    Build a strands callback handler that forwards a nested agent's tokens to the active stream.
+
+    Args:
+        agent_type: Agent type label attached to forwarded tokens
+
+    Returns:
+        Callback handler for ``Agent(callback_handler=...)``
+    """
+    def handler(**kwargs):
+        if "data" in kwargs and kwargs["data"]:
+            emit("token", {"agent": agent_type, "text": kwargs["data"]})
+    return handler
+
+
+@contextmanager
+def streaming_to(sink: StreamSink) -> Iterator[None]:
+    """Send events emitted in this context (and by nested agents) to ``sink``."""
+    token = _stream_sink.set(sink)
+    try:
+        yield
+    finally:
+        _stream_sink.reset(token)
+
+
+def format_sse(event: str, payload: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+def run_streaming_turn(agent: Agent, query: str, sink: StreamSink) -> str:
+    """
+    Run one agent turn, reporting tokens and tool activity to ``sink`` as they happen.
+
+    Blocking; meant to run on the agent executor. The agent's session manager
+    persists the finished turn exactly as for a non-streamed call.
+
+    Args:
+        agent: Agent to invoke
+        query: User input for the turn
+        sink: Callable receiving (event name, payload) pairs
+
+    Returns:
+        Final response text
+    """
+    with streaming_to(sink):
+        return asyncio.run(_consume_stream(agent, query))
+
+
+async def _consume_stream(agent: Agent, query: str) -> str:
+    """Translate strands stream events into stream sink events."""
+    announced_tools = {}
+    result = None
+
+    async for event in agent.stream_async(query):
+        if "data" in event:
+            if event["data"]:
+                emit("token", {"agent": "orchestrator", "text": event["data"]})
+        elif "current_tool_use" in event:
+            tool_use = event["current_tool_use"]
+            tool_use_id = tool_use.get("toolUseId")
+            if tool_use_id and tool_use.get("name") and tool_use_id not in announced_tools:
+                announced_tools[tool_use_id] = tool_use["name"]
+                emit("tool", {"tool_use_id": tool_use_id, "name": tool_use["name"]})
+        elif "message" in event:
+            for block in event["message"].get("content", []):
+                if "toolResult" not in block:
+                    continue
+                tool_result = block["toolResult"]
+                emit("tool_result", {
+                    "tool_use_id": tool_result.get("toolUseId"),
+                    "name": announced_tools.get(tool_result.get("toolUseId")),
+                    "status": tool_result.get("status"),
+                    "output": "".join(part.get("text", "") for part in tool_result.get("content", []))
+                })
+        elif "result" in event:
+            result = event["result"]
+
+    return str(result) if result is not None else ""
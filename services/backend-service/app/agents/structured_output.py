@@ -0,0 +1,110 @@
+"""
+Agent result text and schema-constrained agent output.
+
+With ``STRUCTURED_OUTPUT_ENABLED`` the question generators and answer
+evaluators reply with JSON constrained to a pydantic schema (Ollama's
+``format``) and validated into ``InterviewResponse`` or ``AnswerEvaluation``.
+Tools and workflows then hand compact JSON payloads to the orchestrator
+instead of prose it has to read back.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel
+from strands import Agent
+from strands.types.content import Message
+
+from .runtime import get_session_service
+from ..models.response_models import AnswerEvaluation, InterviewResponse
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def result_text(result: Any) -> str:
+    """Text of an agent result, whichever form the result takes."""
+    message = getattr(result, "message", None)
+    if hasattr(message, "content"):
+        return message.content
+    if hasattr(result, "content"):
+        return result.content
+    if isinstance(result, dict) and "content" in result:
+        return result["content"]
+    return result if isinstance(result, str) else str(result)
+
+
+def compact(payload: BaseModel) -> str:
+    """Payload as compact JSON, leaving out empty fields."""
+    return payload.model_dump_json(exclude_none=True)
+
+
+def evaluation_text(evaluation: Union[AnswerEvaluation, Dict[str, Any]]) -> str:
+    """Readable feedback for a structured evaluation."""
+    if isinstance(evaluation, dict):
+        evaluation = AnswerEvaluation.model_validate(evaluation)
+    lines = [evaluation.summary, "", f"Score: {evaluation.score}/10"]
+    if evaluation.strengths:
+        lines.append("Strengths: " + "; ".join(evaluation.strengths))
+    if evaluation.improvements:
+        lines.append("To improve: " + "; ".join(evaluation.improvements))
+    return "\n".join(lines).strip()
+
+
+def question_text(question: Union[InterviewResponse, Dict[str, Any]]) -> str:
+    """The question of a structured question payload."""
+    if isinstance(question, dict):
+        question = InterviewResponse.model_validate(question)
+    return question.question
+
+
+def _user_message(prompt: Any) -> Message:
+    """User message for a prompt given as text or content blocks (as graph nodes receive it)."""
+    content = [{"text": prompt}] if isinstance(prompt, str) else list(prompt or [])
+    return {"role": "user", "content": content}
+
+
+async def structured_call_async(agent: Agent,
+                                output_model: Type[T],
+                                prompt: Any,
+                                session_id: Optional[str] = None) -> T:
+    """
+    Run one agent turn whose reply is constrained to ``output_model``'s schema.
+
+    The agent's history and the prompt go to its model with the output schema.
+    For session agents the history is kept within budget as for a regular turn,
+    and the exchange is recorded with the compact JSON reply, so later turns
+    see it.
+
+    Args:
+        agent: Agent to answer with
+        output_model: Pydantic model the reply is validated into
+        prompt: The user's input, as text or content blocks
+        session_id: Session the agent belongs to; ephemeral agents record nothing
+
+    Returns:
+        The validated reply
+
+    Raises:
+        ValueError: If the model's reply does not match the schema
+    """
+    if session_id is not None:
+        agent.conversation_manager.reduce_context(agent)
+    message = _user_message(prompt)
+
+    output = None
+    async for event in agent.model.structured_output(output_model, agent.messages + [message], system_prompt=agent.system_prompt):
+        if "output" in event:
+            output = event["output"]
+    if output is None:
+        raise ValueError(f"{agent.agent_id} returned no {output_model.__name__}")
+
+    if session_id is not None:
+        reply: List[Message] = [message, {"role": "assistant", "content": [{"text": compact(output)}]}]
+        get_session_service().append_messages(session_id, agent, reply)
+        agent.conversation_manager.apply_management(agent)
+    return output
+
+
+def structured_call(agent: Agent, output_model: Type[T], prompt: Any, session_id: Optional[str] = None) -> T:
+    """Synchronous ``structured_call_async``, for tools and background workers (threads without an event loop)."""
+    return asyncio.run(structured_call_async(agent, output_model, prompt, session_id))
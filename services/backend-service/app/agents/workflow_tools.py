@@ -1,18 +1,368 @@
 """
 Workflow tools that wrap graph-based workflows for use as tools in the orchestrator.
+
+Workflow graphs are compiled once and reused. Nodes are not bound to a session:
+each node resolves the calling session's agent from the execution's
+``invocation_state``, so one compiled graph serves every session.
+
+With ``EVALUATION_MODE=async`` only the question step runs on the response
+path; when the session has a question waiting for an answer, the user's input
+is evaluated against it on the session's ``EvaluationQueue``.
+The question step takes new questions from the local question bank when it
+has one for the session's position, and only generates follow-ups.
+
+With ``STRUCTURED_OUTPUT_ENABLED`` the question step produces an
+``InterviewResponse`` and the evaluation step an ``AnswerEvaluation``; nodes
+pass them on as compact JSON and the report's ``outputs`` hold them as
+dictionaries rather than prose.
 """
 
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
 from strands import tool
-from strands.multiagent import GraphBuilder
+from .runtime import get_agent_factory, get_evaluation_queue
+from .session_context import resolve_session_id
 from .specialized_agents import (
-    behavioral_question_generator, 
-    behavioral_question_evaluator,
-    technical_question_generator, 
-    technical_question_evaluator
+    bank_payload,
+    bank_question,
+    remember_question,
+    take_pending_question,
+    BEHAVIORAL_QUESTION_GENERATOR_PROMPT,
+    BEHAVIORAL_QUESTION_EVALUATOR_PROMPT,
+    TECHNICAL_QUESTION_GENERATOR_PROMPT,
+    TECHNICAL_QUESTION_EVALUATOR_PROMPT
 )
+from .structured_output import compact, evaluation_text, question_text, structured_call_async
+from ..config import config
+from ..models.response_models import AnswerEvaluation, InterviewResponse
+from ..services.deadline import check_deadline, timeout_within
+
+# Workflow topology: ordered (node_id, agent_type, system_prompt); each node feeds the next.
+# The last step is the answer evaluation.
+WORKFLOWS: Dict[str, List[Tuple[str, str, str]]] = {
+    "behavioral": [
+        ("behavioral_question", "behavioral_generator", BEHAVIORAL_QUESTION_GENERATOR_PROMPT),
+        ("behavioral_evaluation", "behavioral_evaluator", BEHAVIORAL_QUESTION_EVALUATOR_PROMPT)
+    ],
+    "technical": [
+        ("technical_question", "technical_generator", TECHNICAL_QUESTION_GENERATOR_PROMPT),
+        ("technical_evaluation", "technical_evaluator", TECHNICAL_QUESTION_EVALUATOR_PROMPT)
+    ]
+}
+
+
+def _node_result(text: str, state: Optional[Dict[str, Any]] = None) -> Any:
+    """An ``AgentResult`` for a node answered without streaming the agent."""
+    # Loaded lazily with the rest of the graph machinery
+    from strands.agent import AgentResult
+    from strands.telemetry.metrics import EventLoopMetrics
+
+    return AgentResult(
+        stop_reason="end_turn",
+        message={"role": "assistant", "content": [{"text": text}]},
+        metrics=EventLoopMetrics(),
+        state=state or {}
+    )
+
+
+def _payload_result(payload: Any, **state: Any) -> Any:
+    """An ``AgentResult`` carrying a structured payload: compact JSON text, the payload in its state."""
+    return _node_result(compact(payload), {**state, "structured_output": payload.model_dump(exclude_none=True)})
+
+
+class SessionAgentNode:
+    """
+    Graph node executor that runs the calling session's specialized agent.
+
+    The agent is looked up from the ``AgentFactory`` cache on each execution
+    using ``invocation_state["session_id"]``, so the compiled graph holds no
+    session state of its own. With structured output enabled the agent's reply
+    is constrained to ``output_model``.
+    """
+
+    def __init__(self, agent_type: str, system_prompt: str, output_model: Any = None):
+        """Initialize the node for one specialized agent type."""
+        self.agent_type = agent_type
+        self.system_prompt = system_prompt
+        self.output_model = output_model
+
+    def _agent(self, invocation_state: Dict[str, Any]):
+        return get_agent_factory().create_agent(
+            agent_type=self.agent_type,
+            system_prompt=self.system_prompt,
+            session_id=invocation_state.get("session_id", "default")
+        )
+
+    async def stream_async(self, prompt: Any = None, **kwargs: Any) -> AsyncIterator[Any]:
+        """Stream the session agent's events, ending with its ``result`` event."""
+        invocation_state = kwargs.get("invocation_state") or {}
+        agent = self._agent(invocation_state)
+        if self.output_model is not None and config.STRUCTURED_OUTPUT_ENABLED:
+            session_id = invocation_state.get("session_id", "default")
+            output = await structured_call_async(agent, self.output_model, prompt, session_id)
+            yield {"result": _payload_result(output)}
+            return
+        async for event in agent.stream_async(prompt):
+            yield event
+
+    async def invoke_async(self, prompt: Any = None, **kwargs: Any) -> Any:
+        """Run the session agent and return its result."""
+        return await self._agent(kwargs.get("invocation_state") or {}).invoke_async(prompt)
+
+    def __call__(self, prompt: Any = None, **kwargs: Any) -> Any:
+        """Run the session agent synchronously."""
+        return self._agent(kwargs.get("invocation_state") or {})(prompt)
+
+
+class QuestionNode(SessionAgentNode):
+    """
+    Question step: serves a question from the question bank, generating one only for follow-ups or when the bank has none.
+
+    ``invocation_state["follow_up"]`` asks for a generated follow-up question.
+    Either way the question becomes the session's outstanding question.
+    """
+
+    async def stream_async(self, prompt: Any = None, **kwargs: Any) -> AsyncIterator[Any]:
+        """Yield a bank question as the node's ``result`` event, or stream the generator agent."""
+        invocation_state = kwargs.get("invocation_state") or {}
+        session_id = invocation_state.get("session_id", "default")
+        question = None
+        if not invocation_state.get("follow_up"):
+            user_input = prompt if isinstance(prompt, str) else ""
+            question = bank_question(self.agent_type, self.system_prompt, session_id, user_input)
+        if question is None:
+            result = None
+            async for event in super().stream_async(prompt, **kwargs):
+                if "result" in event:
+                    result = event["result"]
+                yield event
+            if result is not None:
+                remember_question(self.agent_type, self.system_prompt, session_id, _node_output(result))
+        elif config.STRUCTURED_OUTPUT_ENABLED:
+            yield {"result": _payload_result(bank_payload(self.agent_type, question), question_bank=True)}
+        else:
+            yield {"result": _node_result(question, {"question_bank": True})}
+
+
+def _from_question_bank(node_result: Any) -> bool:
+    """Whether a question node's result was served from the question bank."""
+    state = getattr(node_result, "state", None)
+    return isinstance(state, dict) and bool(state.get("question_bank"))
+
+
+def _node_output(node_result: Any) -> Any:
+    """A node's output for the report: its structured payload as a dictionary, else its text."""
+    state = getattr(node_result, "state", None)
+    if isinstance(state, dict) and "structured_output" in state:
+        return state["structured_output"]
+    return str(node_result).strip()
+
+
+def compile_workflow(name: str, evaluate: bool = True):
+    """
+    Build the graph for a workflow.
+
+    Args:
+        name: Workflow name, a key of ``WORKFLOWS``
+        evaluate: Include the evaluation step; without it the graph only produces the question
+
+    Returns:
+        Compiled strands ``Graph``
+    """
+    # Loaded lazily: strands.multiagent is heavy and only needed once a workflow is compiled
+    from strands.multiagent import GraphBuilder
+
+    builder = GraphBuilder()
+    steps = WORKFLOWS[name] if evaluate else WORKFLOWS[name][:-1]
+    for index, (node_id, agent_type, system_prompt) in enumerate(steps):
+        if index == 0:
+            node = QuestionNode(agent_type, system_prompt, InterviewResponse)
+        else:
+            node = SessionAgentNode(agent_type, system_prompt, AnswerEvaluation)
+        builder.add_node(node, node_id)
+    for (from_node, _, _), (to_node, _, _) in zip(steps, steps[1:]):
+        builder.add_edge(from_node, to_node)
+    builder.set_entry_point(steps[0][0])
+
+    # Execution limits; run_workflow lowers them to the request's remaining time on each run
+    builder.set_execution_timeout(config.WORKFLOW_TIMEOUT)
+    builder.set_node_timeout(config.WORKFLOW_TIMEOUT)
+    return builder.build()
+
+
+class WorkflowPool:
+    """
+    Reusable compiled workflow graphs.
+
+    A strands ``Graph`` keeps per-execution state, so one instance cannot run two
+    workflows at once. Each workflow variant (with or without the evaluation
+    step) keeps a list of idle compiled graphs; a
+    second concurrent execution compiles one more, and every graph is returned
+    to the pool afterwards. The pool therefore grows to the peak concurrency and
+    compilation stops once it is warm.
+    """
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        keys = [(name, evaluate) for name in WORKFLOWS for evaluate in (True, False)]
+        self._idle: Dict[Tuple[str, bool], List[Any]] = {key: [] for key in keys}
+        self._lock = threading.Lock()
+        self._stats = {key: {"compiled": 0, "compile_ms": 0.0, "executions": 0} for key in keys}
+
+    def warm_up(self, evaluate: bool = True):
+        """Compile one graph per workflow ahead of the first request."""
+        for name in WORKFLOWS:
+            key = (name, evaluate)
+            with self._lock:
+                warm = bool(self._idle[key])
+            if not warm:
+                graph = self._compile(key)
+                with self._lock:
+                    self._idle[key].append(graph)
+
+    @contextmanager
+    def acquire(self, name: str, evaluate: bool = True) -> Iterator[Any]:
+        """Borrow a compiled graph for one execution."""
+        key = (name, evaluate)
+        with self._lock:
+            graph = self._idle[key].pop() if self._idle[key] else None
+            self._stats[key]["executions"] += 1
+        if graph is None:
+            graph = self._compile(key)
+        try:
+            yield graph
+        finally:
+            with self._lock:
+                self._idle[key].append(graph)
+
+    def _compile(self, key: Tuple[str, bool]) -> Any:
+        """Compile a graph and record how long it took."""
+        started = time.perf_counter()
+        graph = compile_workflow(*key)
+        with self._lock:
+            self._stats[key]["compiled"] += 1
+            self._stats[key]["compile_ms"] += (time.perf_counter() - started) * 1000
+        return graph
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Compiled and idle graph counts per workflow variant."""
+        with self._lock:
+            return {
+                name if evaluate else f"{name}:question": {
+                    **stats,
+                    "compile_ms": round(stats["compile_ms"], 2),
+                    "idle": len(self._idle[(name, evaluate)])
+                }
+                for (name, evaluate), stats in self._stats.items()
+            }
+
+
+workflow_pool = WorkflowPool()
+
+
+def run_workflow(name: str,
+                 user_input: str,
+                 session_id: str = "default",
+                 evaluation_mode: Optional[str] = None,
+                 follow_up: bool = False) -> Dict[str, Any]:
+    """
+    Execute a workflow for a session and report per-node timings.
+
+    Args:
+        name: Workflow name, a key of ``WORKFLOWS``
+        user_input: The user's input or response to process
+        session_id: Session ID for conversation persistence
+        evaluation_mode: ``sync`` runs the evaluation step in the graph, ``async`` queues it
+            in the background, only if the session has an outstanding question; defaults to
+            ``Config.EVALUATION_MODE``
+        follow_up: Generate a follow-up question instead of taking the next one from the question bank
+
+    Returns:
+        Structured result with ``status``, ``execution_order``, per-node
+        ``node_timings_ms`` and ``outputs`` (text, or structured payloads with
+        structured output enabled), ``total_ms``, the framework
+        ``overhead_ms`` (total minus time spent inside nodes) and whether the
+        question came from the ``question_bank``. In async mode
+        ``evaluation`` holds the queued evaluation's ID and status, if one was queued.
+    """
+    # Imported here: intent_router imports this module
+    from .intent_router import is_question_request
+
+    evaluate = (evaluation_mode or config.EVALUATION_MODE) != "async"
+    evaluation = None
+    if not evaluate and not is_question_request(user_input):
+        # The input answers the question asked last, if there is one; a request for a new question skips it
+        _, generator_type, generator_prompt = WORKFLOWS[name][0]
+        question = take_pending_question(generator_type, generator_prompt, session_id)
+        if question:
+            # Queued first so the evaluation runs while the next question is generated
+            _, agent_type, system_prompt = WORKFLOWS[name][-1]
+            record = get_evaluation_queue().submit(session_id, name, agent_type, system_prompt, user_input, question)
+            evaluation = {"evaluation_id": record.evaluation_id, "status": record.status}
+
+    started = time.perf_counter()
+    try:
+        check_deadline(f"the {name} workflow")
+        with workflow_pool.acquire(name, evaluate) as graph:
+            # Graphs are pooled, so the limits are set per run
+            graph.execution_timeout = graph.node_timeout = timeout_within(config.WORKFLOW_TIMEOUT)
+            result = graph(user_input, invocation_state={"session_id": session_id, "follow_up": follow_up})
+    except Exception as e:
+        logger.error(f"Error in {name} workflow: {str(e)}")
+        report = {"workflow": name, "status": "failed", "error": str(e)}
+        if evaluation is not None:
+            report["evaluation"] = evaluation
+        return report
+    total_ms = (time.perf_counter() - started) * 1000
+
+    execution_order = [node.node_id for node in result.execution_order]
+    node_timings = {node_id: result.results[node_id].execution_time for node_id in execution_order}
+    report = {
+        "workflow": name,
+        "status": result.status.value,
+        "execution_order": execution_order,
+        "node_timings_ms": node_timings,
+        "total_ms": round(total_ms, 2),
+        "overhead_ms": round(max(0.0, total_ms - sum(node_timings.values())), 2),
+        "outputs": {node_id: _node_output(result.results[node_id].result) for node_id in execution_order},
+        "question_bank": bool(execution_order) and _from_question_bank(result.results[execution_order[0]].result)
+    }
+    if evaluation is not None:
+        report["evaluation"] = evaluation
+    logger.debug(f"{name} workflow timings: {node_timings} (overhead {report['overhead_ms']}ms)")
+    return report
+
+
+def workflow_reply(report: Dict[str, Any]) -> Optional[str]:
+    """
+    Reply text for a workflow run when it is answered without the orchestrator: any evaluation, then the question.
+
+    Args:
+        report: Result of ``run_workflow``
+
+    Returns:
+        The reply, or None if the workflow did not complete
+    """
+    order = report.get("execution_order") or []
+    if report.get("status") != "completed" or not order:
+        return None
+    question, *rest = order
+    outputs = report["outputs"]
+    # Structured payloads are rendered: evaluations as feedback, the question as its text
+    texts = [
+        evaluation_text(outputs[node_id]) if isinstance(outputs[node_id], dict) else outputs[node_id]
+        for node_id in rest
+    ]
+    texts.append(question_text(outputs[question]) if isinstance(outputs[question], dict) else outputs[question])
+    return "\n\n".join(texts).strip() or None
+
 
 @tool
-def behavioral_workflow(user_input: str, session_id: str = "default") -> str:
+def behavioral_workflow(user_input: str, session_id: str = "default", follow_up: bool = False) -> Dict[str, Any]:
     """
     Execute the complete behavioral interview workflow using a graph-based approach.
     This tool coordinates the behavioral question generation and evaluation process.
@@ -20,48 +370,16 @@ def behavioral_workflow(user_input: str, session_id: str = "default") -> str:
     Args:
         user_input: The user's input or response to process through the behavioral workflow
         session_id: Session ID for conversation persistence
+        follow_up: Ask a follow-up on the user's last answer instead of a new question
 
     Returns:
-        A comprehensive result from the behavioral interview workflow
+        The workflow's status, execution order, per-node timings, node outputs and any queued evaluation
     """
-    try:
-        # Build the behavioral workflow graph
-        builder = GraphBuilder()
-        
-        # Add nodes using agent factories with session context
-        builder.add_node(
-            lambda x: behavioral_question_generator(x, session_id), 
-            "behavioral_question"
-        )
-        builder.add_node(
-            lambda x: behavioral_question_evaluator(x, session_id), 
-            "behavioral_evaluation"
-        )
-        
-        # Add edges (dependencies)
-        builder.add_edge("behavioral_question", "behavioral_evaluation")
-        
-        # Set entry point
-        builder.set_entry_point("behavioral_question")
-        
-        # Configure execution limits for safety
-        builder.set_execution_timeout(600)  # 10 minute timeout
-        
-        # Build and execute the graph
-        graph = builder.build()
-        result = graph(user_input)
-        
-        # Format the result for the orchestrator
-        if hasattr(result, 'status') and hasattr(result, 'execution_order'):
-            return f"Behavioral Workflow Complete\nStatus: {result.status}\nExecution Order: {[node.node_id for node in result.execution_order]}\nResult: {str(result)}"
-        else:
-            return f"Behavioral Workflow Result: {str(result)}"
-            
-    except Exception as e:
-        return f"Error in behavioral workflow: {str(e)}"
+    return run_workflow("behavioral", user_input, resolve_session_id(session_id), follow_up=follow_up)
+
 
 @tool
-def technical_workflow(user_input: str, session_id: str = "default") -> str:
+def technical_workflow(user_input: str, session_id: str = "default", follow_up: bool = False) -> Dict[str, Any]:
     """
     Execute the complete technical interview workflow using a graph-based approach.
     This tool coordinates the technical question generation and evaluation process.
@@ -69,42 +387,9 @@ def technical_workflow(user_input: str, session_id: str = "default") -> str:
     Args:
         user_input: The user's input or response to process through the technical workflow
         session_id: Session ID for conversation persistence
+        follow_up: Ask a follow-up on the user's last answer instead of a new question
 
     Returns:
-        A comprehensive result from the technical interview workflow
+        The workflow's status, execution order, per-node timings, node outputs and any queued evaluation
     """
-    try:
-        # Build the technical workflow graph
-        builder = GraphBuilder()
-        
-        # Add nodes using agent factories with session context
-        builder.add_node(
-            lambda x: technical_question_generator(x, session_id), 
-            "technical_question"
-        )
-        builder.add_node(
-            lambda x: technical_question_evaluator(x, session_id), 
-            "technical_evaluation"
-        )
-        
-        # Add edges (dependencies)
-        builder.add_edge("technical_question", "technical_evaluation")
-        
-        # Set entry point
-        builder.set_entry_point("technical_question")
-        
-        # Configure execution limits for safety
-        builder.set_execution_timeout(600)  # 10 minute timeout
-        
-        # Build and execute the graph
-        graph = builder.build()
-        result = graph(user_input)
-        
-        # Format the result for the orchestrator
-        if hasattr(result, 'status') and hasattr(result, 'execution_order'):
-            return f"Technical Workflow Complete\nStatus: {result.status}\nExecution Order: {[node.node_id for node in result.execution_order]}\nResult: {str(result)}"
-        else:
-            return f"Technical Workflow Result: {str(result)}"
-            
-    except Exception as e:
-        return f"Error in technical workflow: {str(e)}"
+    return run_workflow("technical", user_input, resolve_session_id(session_id), follow_up=follow_up)
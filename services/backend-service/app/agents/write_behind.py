@@ -0,0 +1,272 @@
+"""
+Write-behind journaling in front of a session repository.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from strands.session.session_repository import SessionRepository
+from strands.types.session import Session, SessionAgent, SessionMessage
+
+
+class WriteBehindSessionRepository(SessionRepository):
+    """
+    Session repository wrapper that journals per-turn writes in memory and flushes them in batches.
+
+    Message appends, message updates and agent state updates are held in a
+    per-session journal where repeated writes to the same record coalesce into
+    one. A background thread flushes the journal every ``flush_interval``
+    seconds, or sooner once a session has ``max_pending`` records waiting.
+    Session and agent creation are written through so that existence checks and
+    file layouts stay valid.
+
+    Reads flush the affected session first, so callers always observe their own
+    writes. ``flush()`` and ``close()`` persist everything synchronously.
+
+    A flush that fails is logged and its records stay journaled for the next
+    one, without failing the read or turn that triggered it. A record that
+    still cannot be written after ``max_attempts`` flushes is dropped from the
+    journal and appended to the ``dead_letter_path`` JSON lines file, if set.
+    """
+
+    def __init__(self,
+                 inner: SessionRepository,
+                 flush_interval: float,
+                 max_pending: int,
+                 max_attempts: int = 5,
+                 dead_letter_path: Optional[str] = None):
+        """Initialize the journal in front of ``inner``."""
+        self.inner = inner
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max(1, max_attempts)
+        self.dead_letter_path = dead_letter_path
+
+        # session_id -> record key -> (operation, agent_id, record)
+        self._journal: Dict[str, "OrderedDict[Tuple, Tuple[str, Optional[str], Any]]"] = {}
+        # (session_id, record key) -> failed flushes of the record's current version
+        self._attempts: Dict[Tuple[str, Tuple], int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.RLock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats = {"journaled": 0, "coalesced": 0, "flushed": 0, "flushes": 0, "errors": 0, "dead_lettered": 0}
+
+    # Journaled writes
+
+    def create_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        """Journal a message append."""
+        self._record(session_id, ("message", agent_id, session_message.message_id), "create_message", agent_id, session_message)
+
+    def update_message(self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any) -> None:
+        """Journal a message update; folds into a still-pending append of the same message."""
+        key = ("message", agent_id, session_message.message_id)
+        with self._lock:
+            pending = self._journal.get(session_id, {}).get(key)
+        operation = "create_message" if pending and pending[0] == "create_message" else "update_message"
+        self._record(session_id, key, operation, agent_id, session_message)
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        """Journal an agent state update; only the latest state per agent is kept."""
+        self._record(session_id, ("agent", session_agent.agent_id), "update_agent", None, session_agent)
+
+    # Write-through operations
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        """Create a session immediately."""
+        return self.inner.create_session(session, **kwargs)
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        """Create an agent immediately."""
+        self.inner.create_agent(session_id, session_agent, **kwargs)
+
+    def create_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        """Create multi-agent state immediately."""
+        self.inner.create_multi_agent(session_id, multi_agent, **kwargs)
+
+    def update_multi_agent(self, session_id: str, multi_agent: Any, **kwargs: Any) -> None:
+        """Update multi-agent state immediately."""
+        self.inner.update_multi_agent(session_id, multi_agent, **kwargs)
+
+    # Reads observe pending writes by flushing the session first
+
+    def read_session(self, session_id: str, **kwargs: Any) -> Optional[Session]:
+        """Read session data."""
+        return self.inner.read_session(session_id, **kwargs)
+
+    def read_agent(self, session_id: str, agent_id: str, **kwargs: Any) -> Optional[SessionAgent]:
+        """Read agent data, including pending updates."""
+        self.flush(session_id)
+        return self.inner.read_agent(session_id, agent_id, **kwargs)
+
+    def read_message(self, session_id: str, agent_id: str, message_id: int, **kwargs: Any) -> Optional[SessionMessage]:
+        """Read message data, including pending writes."""
+        self.flush(session_id)
+        return self.inner.read_message(session_id, agent_id, message_id, **kwargs)
+
+    def list_messages(
+        self, session_id: str, agent_id: str, limit: Optional[int] = None, offset: int = 0, **kwargs: Any
+    ) -> List[SessionMessage]:
+        """List messages, including pending appends."""
+        self.flush(session_id)
+        return self.inner.list_messages(session_id, agent_id, limit=limit, offset=offset, **kwargs)
+
+    def read_multi_agent(self, session_id: str, multi_agent_id: str, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """Read multi-agent state."""
+        return self.inner.read_multi_agent(session_id, multi_agent_id, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Backend-specific extras (profiles, imports, ...) pass straight through
+        return getattr(self.inner, name)
+
+    # Flushing
+
+    def flush(self, session_id: Optional[str] = None) -> int:
+        """
+        Persist pending writes synchronously.
+
+        Args:
+            session_id: Only flush this session; flushes every session when omitted
+
+        Returns:
+            Number of records written; records that failed are kept for the next flush
+        """
+        with self._flush_lock:
+            with self._lock:
+                if session_id is None:
+                    batches = self._journal
+                    self._journal = {}
+                else:
+                    entries = self._journal.pop(session_id, None)
+                    batches = {session_id: entries} if entries else {}
+
+            written = 0
+            for batch_session_id, entries in batches.items():
+                written += self._write_batch(batch_session_id, entries)
+            return written
+
+    def close(self):
+        """Stop the background flusher and persist everything that is pending; what cannot be written is dead-lettered."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        with self._lock:
+            leftover, self._journal = self._journal, {}
+            self._attempts.clear()
+        for session_id, entries in leftover.items():
+            self._dead_letter(session_id, entries, "still failing at shutdown")
+
+    def stats(self) -> Dict[str, int]:
+        """Journal counters for metrics reporting."""
+        with self._lock:
+            pending = sum(len(entries) for entries in self._journal.values())
+        return {**self._stats, "pending": pending, "pending_sessions": len(self._journal)}
+
+    def _record(self, session_id: str, key: Tuple, operation: str, agent_id: Optional[str], record: Any):
+        """Add or coalesce a journal entry and wake the flusher if the session is over threshold."""
+        with self._lock:
+            entries = self._journal.setdefault(session_id, OrderedDict())
+            if key in entries:
+                self._stats["coalesced"] += 1
+            entries[key] = (operation, agent_id, record)
+            # A newer version of the record starts over
+            self._attempts.pop((session_id, key), None)
+            self._stats["journaled"] += 1
+            over_threshold = len(entries) >= self.max_pending
+        self._ensure_flusher()
+        if over_threshold:
+            self._wake.set()
+
+    def _write_batch(self, session_id: str, entries: "OrderedDict[Tuple, Tuple[str, Optional[str], Any]]") -> int:
+        """Write one session's journal, in a single transaction where the backend supports it."""
+        batch = getattr(self.inner, "batch", None)
+        try:
+            with batch() if batch else nullcontext():
+                for operation, agent_id, record in entries.values():
+                    if operation == "update_agent":
+                        self.inner.update_agent(session_id, record)
+                    else:
+                        getattr(self.inner, operation)(session_id, agent_id, record)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Failed to flush {len(entries)} session writes for {session_id}: {str(e)}")
+            self._requeue(session_id, entries, str(e))
+            return 0
+
+        with self._lock:
+            for key in entries:
+                self._attempts.pop((session_id, key), None)
+        self._stats["flushed"] += len(entries)
+        self._stats["flushes"] += 1
+        return len(entries)
+
+    def _requeue(self, session_id: str, entries: "OrderedDict[Tuple, Tuple[str, Optional[str], Any]]", error: str):
+        """Put back entries from a failed flush, without overriding newer writes; dead-letter those out of attempts."""
+        expired: "OrderedDict[Tuple, Tuple[str, Optional[str], Any]]" = OrderedDict()
+        with self._lock:
+            current = self._journal.get(session_id, OrderedDict())
+            merged = OrderedDict()
+            for key, entry in entries.items():
+                if key in current:
+                    # Superseded by a newer write while flushing; that one is retried instead
+                    continue
+                attempts = self._attempts.get((session_id, key), 0) + 1
+                if attempts >= self.max_attempts:
+                    self._attempts.pop((session_id, key), None)
+                    expired[key] = entry
+                else:
+                    self._attempts[(session_id, key)] = attempts
+                    merged[key] = entry
+            merged.update(current)
+            if merged:
+                self._journal[session_id] = merged
+        if expired:
+            self._dead_letter(session_id, expired, f"failed {self.max_attempts} flushes, last error: {error}")
+
+    def _dead_letter(self, session_id: str, entries: "OrderedDict[Tuple, Tuple[str, Optional[str], Any]]", reason: str):
+        """Give up on journal entries: log them and append them to the dead-letter file, if any."""
+        self._stats["dead_lettered"] += len(entries)
+        logger.error(f"Dropping {len(entries)} session writes for {session_id} ({reason})")
+        if not self.dead_letter_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.dead_letter_path)), exist_ok=True)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as journal:
+                for operation, agent_id, record in entries.values():
+                    journal.write(json.dumps({
+                        "time": time.time(),
+                        "session_id": session_id,
+                        "operation": operation,
+                        "agent_id": agent_id,
+                        "record": record.to_dict() if hasattr(record, "to_dict") else repr(record),
+                        "reason": reason
+                    }, default=str) + "\n")
+        except Exception as e:
+            logger.error(f"Failed to write dead-lettered session writes to {self.dead_letter_path}: {str(e)}")
+
+    def _ensure_flusher(self):
+        """Start the background flusher on first use (never at import, so forked workers get their own)."""
+        if self._thread is None and not self._closed:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="session-flusher", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        """Background loop: flush on the interval or when woken by a size threshold."""
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Session flusher error: {str(e)}")
@@ -2,6 +2,7 @@
 Configuration management for PrepWise backend service.
 """
 
+import json
 import os
 from typing import Optional
 
@@ -11,23 +12,193 @@ class Config:
     
     # Ollama configuration
     OLLAMA_HOST: str = os.getenv("OLLAMA_HOST", "http://host.docker.internal:11434")
+    # Comma-separated Ollama servers to spread generations across (defaults to OLLAMA_HOST alone)
+    OLLAMA_HOSTS: list = [host.strip() for host in os.getenv("OLLAMA_HOSTS", OLLAMA_HOST).split(",") if host.strip()]
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3.2")
+    OLLAMA_MAX_CONNECTIONS: int = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "20"))
+    OLLAMA_MAX_KEEPALIVE: int = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "10"))
+    OLLAMA_KEEPALIVE_EXPIRY: float = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "60"))
+    OLLAMA_REQUEST_TIMEOUT: float = float(os.getenv("OLLAMA_REQUEST_TIMEOUT", "120"))
+    OLLAMA_CONNECT_TIMEOUT: float = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "5"))
+    # Host health: probe interval, probe timeout, and consecutive failures before a host is ejected
+    OLLAMA_HEALTH_INTERVAL: float = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "10"))
+    OLLAMA_HEALTH_TIMEOUT: float = float(os.getenv("OLLAMA_HEALTH_TIMEOUT", "2"))
+    OLLAMA_FAILURE_THRESHOLD: int = int(os.getenv("OLLAMA_FAILURE_THRESHOLD", "2"))
+    # Extra outstanding requests a session's host may carry over the least-loaded host before the session moves
+    OLLAMA_AFFINITY_SLACK: int = int(os.getenv("OLLAMA_AFFINITY_SLACK", "2"))
+    OLLAMA_AFFINITY_SIZE: int = int(os.getenv("OLLAMA_AFFINITY_SIZE", "4096"))
+    # Retries of calls that failed before producing anything, capped at a fraction of calls (ratio) plus a burst
+    OLLAMA_MAX_RETRIES: int = int(os.getenv("OLLAMA_MAX_RETRIES", "2"))
+    OLLAMA_RETRY_BACKOFF: float = float(os.getenv("OLLAMA_RETRY_BACKOFF", "0.25"))
+    OLLAMA_RETRY_BUDGET_RATIO: float = float(os.getenv("OLLAMA_RETRY_BUDGET_RATIO", "0.1"))
+    OLLAMA_RETRY_BUDGET_BURST: float = float(os.getenv("OLLAMA_RETRY_BUDGET_BURST", "10"))
+    # Circuit breaker: consecutive failures that open it, and seconds before a trial call is let through
+    OLLAMA_BREAKER_THRESHOLD: int = int(os.getenv("OLLAMA_BREAKER_THRESHOLD", "5"))
+    OLLAMA_BREAKER_RESET: float = float(os.getenv("OLLAMA_BREAKER_RESET", "15"))
+    # Per-agent-type model profiles as JSON, keyed by agent type or glob pattern, e.g.
+    # {"orchestrator": {"model_id": "llama3.2:1b"}, "*_evaluator": {"model_id": "llama3.1:8b", "keep_alive": "30m"}}
+    AGENT_MODELS: dict = json.loads(os.getenv("AGENT_MODELS") or "{}")
     
     # Session management
     SESSION_STORAGE_DIR: str = os.getenv("SESSION_STORAGE_DIR", "./data/sessions")
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "file")  # file | sqlite
+    SESSION_DB_PATH: str = os.getenv("SESSION_DB_PATH", "./data/sessions.db")
+    # strict: write every message before responding
+    # turn: journal writes and flush once at the end of each request
+    # relaxed: flush only on the interval/size threshold (may lose the last few seconds on a crash)
+    SESSION_DURABILITY: str = os.getenv("SESSION_DURABILITY", "strict")
+    SESSION_FLUSH_INTERVAL: float = float(os.getenv("SESSION_FLUSH_INTERVAL", "2"))
+    SESSION_FLUSH_MAX_PENDING: int = int(os.getenv("SESSION_FLUSH_MAX_PENDING", "64"))
+    # Flushes a journaled write may fail before it is dropped into the dead-letter file (empty path: only logged)
+    SESSION_FLUSH_MAX_ATTEMPTS: int = int(os.getenv("SESSION_FLUSH_MAX_ATTEMPTS", "5"))
+    SESSION_DEAD_LETTER_PATH: str = os.getenv("SESSION_DEAD_LETTER_PATH", "./data/session_dead_letters.jsonl")
     
     # Conversation management
     MAX_CONVERSATION_MESSAGES: int = int(os.getenv("MAX_CONVERSATION_MESSAGES", "50"))
     SUMMARIZATION_THRESHOLD: int = int(os.getenv("SUMMARIZATION_THRESHOLD", "30"))
-    
+    # Hard cap on (estimated) history tokens sent per model call
+    CONVERSATION_TOKEN_BUDGET: int = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "6000"))
+    # Unsummarized history size that schedules a background summary
+    CONVERSATION_SUMMARY_TOKENS: int = int(os.getenv("CONVERSATION_SUMMARY_TOKENS", "3000"))
+    CONVERSATION_PRESERVE_RECENT: int = int(os.getenv("CONVERSATION_PRESERVE_RECENT", "6"))
+    SUMMARY_WORKERS: int = int(os.getenv("SUMMARY_WORKERS", "1"))
+
+    # Answer evaluation: "async" returns the next question right away and evaluates in the background
+    EVALUATION_MODE: str = os.getenv("EVALUATION_MODE", "async")  # async | sync
+    EVALUATION_WORKERS: int = int(os.getenv("EVALUATION_WORKERS", "2"))
+    EVALUATION_HISTORY: int = int(os.getenv("EVALUATION_HISTORY", "20"))
+    EVALUATION_MAX_SESSIONS: int = int(os.getenv("EVALUATION_MAX_SESSIONS", "1024"))
+    # /evaluate/batch: evaluations running at once across all batches, and items per request
+    EVALUATION_BATCH_CONCURRENCY: int = int(os.getenv("EVALUATION_BATCH_CONCURRENCY", "8"))
+    EVALUATION_BATCH_MAX_ITEMS: int = int(os.getenv("EVALUATION_BATCH_MAX_ITEMS", "200"))
+    # Question generators and answer evaluators reply with schema-constrained JSON instead of prose
+    STRUCTURED_OUTPUT_ENABLED: bool = os.getenv("STRUCTURED_OUTPUT_ENABLED", "false").lower() == "true"
+
+    # Local question bank: questions for known positions are retrieved from an index instead of generated
+    QUESTION_BANK_ENABLED: bool = os.getenv("QUESTION_BANK_ENABLED", "true").lower() == "true"
+    QUESTION_BANK_PATH: str = os.getenv("QUESTION_BANK_PATH", "./data/question_bank.db")
+    QUESTION_BANK_SEED: str = os.getenv(
+        "QUESTION_BANK_SEED", os.path.join(os.path.dirname(__file__), "data", "question_bank.json")
+    )
+    QUESTION_BANK_MMAP_SIZE: int = int(os.getenv("QUESTION_BANK_MMAP_SIZE", str(64 * 1024 * 1024)))
+    # Asked-question counts at which the bank moves on to medium and hard questions
+    QUESTION_BANK_DIFFICULTY_STEPS: list = [
+        int(step) for step in os.getenv("QUESTION_BANK_DIFFICULTY_STEPS", "2,5").split(",")
+    ]
+
+    # Cache for responses that depend only on their input (e.g. the first-turn introduction)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_PATH: str = os.getenv("RESPONSE_CACHE_PATH", "./data/response_cache.db")
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+    RESPONSE_CACHE_TTL: float = float(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))
+
+    # Local intent router: confident turns skip the orchestrator's tool-selection call
+    INTENT_ROUTER_ENABLED: bool = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+    INTENT_ROUTER_THRESHOLD: float = float(os.getenv("INTENT_ROUTER_THRESHOLD", "0.9"))
+    INTENT_ROUTER_EXAMPLES: str = os.getenv(
+        "INTENT_ROUTER_EXAMPLES", os.path.join(os.path.dirname(__file__), "data", "intent_examples.json")
+    )
+
+    # Model call scheduling: concurrent calls overall, slots only interactive turns may use,
+    # and per-work-class weights and concurrency limits as "class:value" lists
+    MODEL_SCHEDULER_CAPACITY: int = int(os.getenv("MODEL_SCHEDULER_CAPACITY", "8"))
+    MODEL_SCHEDULER_RESERVED: int = int(os.getenv("MODEL_SCHEDULER_RESERVED", "2"))
+    MODEL_SCHEDULER_WEIGHTS: dict = {
+        name: int(value) for name, value in (
+            item.split(":") for item in os.getenv(
+                "MODEL_SCHEDULER_WEIGHTS", "interactive:8,evaluation:2,summarization:1,batch:1"
+            ).split(",")
+        )
+    }
+    MODEL_SCHEDULER_LIMITS: dict = {
+        name: int(value) for name, value in (
+            item.split(":") for item in os.getenv(
+                "MODEL_SCHEDULER_LIMITS", "interactive:8,evaluation:3,summarization:1,batch:4"
+            ).split(",")
+        )
+    }
+
+    # End-to-end deadline for a chat turn, including queueing; clients may shorten it with X-Request-Timeout
+    REQUEST_TIMEOUT: float = float(os.getenv("REQUEST_TIMEOUT", "90"))
+    # Upper bound for one workflow graph execution (also capped by the request deadline)
+    WORKFLOW_TIMEOUT: float = float(os.getenv("WORKFLOW_TIMEOUT", "120"))
+
+    # Agent execution pool
+    AGENT_POOL_SIZE: int = int(os.getenv("AGENT_POOL_SIZE", "4"))
+    AGENT_QUEUE_SIZE: int = int(os.getenv("AGENT_QUEUE_SIZE", "8"))
+    AGENT_QUEUE_TIMEOUT: float = float(os.getenv("AGENT_QUEUE_TIMEOUT", "2"))
+
+    # Per-session turn serialization
+    # queue: wait for the session's running turn; reject: 409 while a turn runs;
+    # coalesce: identical queries share the pending turn's response, others queue
+    SESSION_TURN_POLICY: str = os.getenv("SESSION_TURN_POLICY", "coalesce")
+    SESSION_MAX_QUEUED_TURNS: int = int(os.getenv("SESSION_MAX_QUEUED_TURNS", "2"))
+
+    # Duplicate /chat requests (same session + query, or same Idempotency-Key) share a running
+    # turn; completed responses are replayed only to requests with an Idempotency-Key
+    CHAT_DEDUPE_TTL: float = float(os.getenv("CHAT_DEDUPE_TTL", "30"))
+    CHAT_DEDUPE_MAX_ENTRIES: int = int(os.getenv("CHAT_DEDUPE_MAX_ENTRIES", "1024"))
+
+    # Live orchestrator pool
+    ORCHESTRATOR_POOL_SIZE: int = int(os.getenv("ORCHESTRATOR_POOL_SIZE", "64"))
+    ORCHESTRATOR_POOL_MAX_BYTES: int = int(os.getenv("ORCHESTRATOR_POOL_MAX_BYTES", str(64 * 1024 * 1024)))
+    ORCHESTRATOR_POOL_TTL: float = float(os.getenv("ORCHESTRATOR_POOL_TTL", "1800"))
+
+    # Specialized agent cache (AgentFactory)
+    AGENT_CACHE_SIZE: int = int(os.getenv("AGENT_CACHE_SIZE", "256"))
+    AGENT_CACHE_MAX_BYTES: int = int(os.getenv("AGENT_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+    AGENT_CACHE_TTL: float = float(os.getenv("AGENT_CACHE_TTL", "1800"))
+
     # API configuration
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
     API_PORT: int = int(os.getenv("API_PORT", "8002"))
+    # Auto-reload on code changes when run directly (python main.py); development only
+    API_RELOAD: bool = os.getenv("API_RELOAD", "false").lower() == "true"
+    # Worker processes per container under gunicorn (which reads the same variable)
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # Sessions are shared with other workers or containers: every turn is flushed and its session's
+    # version bumped, and live agents are reloaded once another process has written their session
+    SESSION_SHARED: bool = os.getenv("SESSION_SHARED", str(WEB_CONCURRENCY > 1)).lower() == "true"
+    SESSION_VERSION_DB: str = os.getenv("SESSION_VERSION_DB", "./data/session_versions.db")
+    # Background evaluation results: "memory" per process, or "sqlite" in a file every worker reads
+    EVALUATION_STORE: str = os.getenv("EVALUATION_STORE", "sqlite" if SESSION_SHARED else "memory")
+    EVALUATION_DB_PATH: str = os.getenv("EVALUATION_DB_PATH", "./data/evaluations.db")
+
+    # Token-bucket rate limits per session (X-Session-Id), client IP and API key (X-API-Key); opt-in
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+    # Tokens per second and bucket size per scope; 0 disables a scope
+    RATE_LIMIT_RATES: dict = {
+        name: float(value) for name, value in (
+            item.rsplit(":", 1) for item in os.getenv("RATE_LIMIT_RATES", "session:2,ip:10,api_key:10").split(",")
+        )
+    }
+    RATE_LIMIT_BURSTS: dict = {
+        name: float(value) for name, value in (
+            item.rsplit(":", 1) for item in os.getenv("RATE_LIMIT_BURSTS", "session:60,ip:200,api_key:200").split(",")
+        )
+    }
+    # Tokens each request costs by path ("default" for the rest); 0 exempts a path
+    RATE_LIMIT_COSTS: dict = {
+        name: float(value) for name, value in (
+            item.rsplit(":", 1) for item in os.getenv(
+                "RATE_LIMIT_COSTS",
+                "/chat:5,/chat/stream:5,/scrape-job:5,/evaluate/batch:10,/health:0,default:1"
+            ).split(",")
+        )
+    }
+    # memory: per process; sqlite: one file shared by every worker that opens it
+    RATE_LIMIT_STORE: str = os.getenv("RATE_LIMIT_STORE", "memory")
+    RATE_LIMIT_DB_PATH: str = os.getenv("RATE_LIMIT_DB_PATH", "./data/rate_limits.db")
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    # Take the client IP from X-Forwarded-For (only behind a proxy that sets it)
+    RATE_LIMIT_TRUST_FORWARDED: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_ROTATION: str = os.getenv("LOG_ROTATION", "1 day")
     LOG_RETENTION: str = os.getenv("LOG_RETENTION", "7 days")
+    # One log file per worker process, opened after the fork (set by gunicorn.conf.py)
+    LOG_FILE_PER_WORKER: bool = os.getenv("LOG_FILE_PER_WORKER", "false").lower() == "true"
     
     # CORS settings
     CORS_ORIGINS: list = os.getenv("CORS_ORIGINS", "*").split(",")
@@ -35,7 +206,12 @@ class Config:
     @classmethod
     def get_ollama_host(cls) -> str:
         """Get Ollama host URL."""
-        return cls.OLLAMA_HOST
+        return cls.OLLAMA_HOSTS[0] if cls.OLLAMA_HOSTS else cls.OLLAMA_HOST
+
+    @classmethod
+    def get_ollama_hosts(cls) -> list:
+        """Get every Ollama host URL."""
+        return cls.OLLAMA_HOSTS or [cls.OLLAMA_HOST]
     
     @classmethod
     def get_ollama_model(cls) -> str:
@@ -1,18 +1,33 @@
 """FastAPI backend service for PrepWise agentic system."""
 
+import asyncio
+import json
 import os
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional
-from fastapi import FastAPI, HTTPException
+from typing import Optional, Tuple
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from loguru import logger
 
-from app.agents.orchestrator import create_orchestrator
+from app.agents import runtime
+from app.agents.orchestrator import get_orchestrator, get_position_profile, orchestrator_pool, set_position_profile
+from app.agents.session_context import bind_session
+from app.agents.streaming import format_sse, run_streaming_turn, streaming_to
+from app.agents.structured_output import result_text
+from app.agents.workflow_tools import workflow_pool
 from app.services.web_scraper import scrape_job_posting
-from app.models.response_models import ChatResponse, JobScrapeResponse, HealthResponse
+from app.services.agent_executor import AgentExecutor, AgentPoolSaturated
+from app.services.circuit_breaker import CircuitOpen
+from app.services.deadline import DeadlineExceeded, bind_deadline, check_deadline, deadline_after
+from app.services.rate_limiter import RateLimited, RateLimiter, api_key_identity
+from app.services.session_locks import SessionBusy, SessionLockManager
+from app.services.single_flight import SingleFlight
+from app.models.response_models import ChatResponse, JobScrapeResponse, HealthResponse, PositionProfile, SessionResponse, FeedbackResponse, BatchEvaluationRequest
 from app.config import config
 
 class ChatRequest(BaseModel):
@@ -22,17 +37,131 @@ class ChatRequest(BaseModel):
 class ScrapeRequest(BaseModel):
     url: str
 
+class SessionRequest(PositionProfile):
+    session_id: Optional[str] = None  # Existing session to update; a new one is created when omitted
+
 # Configure logging
-logger.remove()
-logger.add("logs/backend.log", rotation=config.LOG_ROTATION, retention=config.LOG_RETENTION, level=config.LOG_LEVEL)
-logger.add(lambda msg: print(msg, end=""), level=config.LOG_LEVEL)
+LOG_FILE = "logs/backend.log"
+
+def configure_logging(file_sink: bool = True):
+    """
+    Log to stdout and, with ``file_sink``, to a rotating ``LOG_FILE``.
+
+    With ``LOG_FILE_PER_WORKER`` each process writes ``logs/backend.{pid}.log``,
+    so forked workers never rotate one shared file under each other.
+    """
+    logger.remove()
+    if file_sink:
+        path = LOG_FILE
+        if config.LOG_FILE_PER_WORKER:
+            root, ext = os.path.splitext(LOG_FILE)
+            path = f"{root}.{os.getpid()}{ext}"
+        logger.add(path, rotation=config.LOG_ROTATION, retention=config.LOG_RETENTION, level=config.LOG_LEVEL)
+    logger.add(lambda msg: print(msg, end=""), level=config.LOG_LEVEL)
+
+# A preloading gunicorn master opens no file; each worker adds its own after the fork
+configure_logging(file_sink=not config.LOG_FILE_PER_WORKER)
+
+# Dedicated pool for blocking agent calls so the event loop stays responsive
+agent_executor = AgentExecutor()
+
+# One turn at a time per session; different sessions still run in parallel
+session_locks = SessionLockManager()
+
+# Single-flight deduplication of replayed /chat requests
+chat_dedupe = SingleFlight()
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-run
+_background_tasks = set()
+
+# Per-session, per-IP and per-API-key request budgets
+rate_limiter = RateLimiter()
+
+# Response header naming the session a response belongs to; clients send it back on later
+# requests, so a balancer in front of several workers can pin the session (hash or stick on it)
+SESSION_HEADER = "X-Session-Id"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown hooks."""
+    # Build the model, session store and agent factory before the first request,
+    # off the event loop so /health answers while this runs
+    await asyncio.get_running_loop().run_in_executor(None, runtime.warm_up)
+    yield
+    agent_executor.shutdown(wait=True)
+    # Persist any journaled session writes before the process exits
+    runtime.shutdown()
 
 app = FastAPI(
     title="PrepWise Backend Service",
     description="FastAPI backend for PrepWise AI interview practice platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Requests that may name their session in the JSON body rather than the header
+SESSION_BODY_PATHS = ("/chat", "/chat/stream", "/session")
+
+async def _body_session_id(request: Request) -> Optional[str]:
+    """The ``session_id`` of a JSON request body, if any (the body stays readable downstream)."""
+    if request.method != "POST" or request.url.path not in SESSION_BODY_PATHS:
+        return None
+    try:
+        body = json.loads(await request.body() or b"{}")
+    except ValueError:
+        return None
+    session_id = body.get("session_id") if isinstance(body, dict) else None
+    return session_id if isinstance(session_id, str) and session_id else None
+
+async def _client_identities(request: Request) -> dict:
+    """Who a request is charged to, per rate limit scope."""
+    ip = request.client.host if request.client else None
+    forwarded = request.headers.get("x-forwarded-for")
+    if config.RATE_LIMIT_TRUST_FORWARDED and forwarded:
+        ip = forwarded.split(",")[0].strip()
+    session_id = request.headers.get(SESSION_HEADER)
+    if session_id is None and request.url.path.startswith("/session/"):
+        session_id = request.url.path.split("/")[2]
+    if session_id is None:
+        session_id = await _body_session_id(request)
+    api_key = request.headers.get("x-api-key")
+    authorization = request.headers.get("authorization", "")
+    if api_key is None and authorization.lower().startswith("bearer "):
+        api_key = authorization[len("bearer "):].strip()
+    return {"session": session_id, "ip": ip, "api_key": api_key_identity(api_key)}
+
+# Registered before CORS so that rejections still carry CORS headers
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    """Reject requests over their rate limits with 429 and ``Retry-After``."""
+    if not config.RATE_LIMIT_ENABLED or request.method == "OPTIONS":
+        return await call_next(request)
+    identities = await _client_identities(request)
+    try:
+        if config.RATE_LIMIT_STORE == "memory":
+            rate_limiter.check(request.url.path, identities)
+        else:
+            # The shared store is a database write; keep it off the event loop
+            await asyncio.to_thread(rate_limiter.check, request.url.path, identities)
+    except RateLimited as e:
+        logger.warning(f"Rate limited {request.method} {request.url.path}: {str(e)}")
+        return JSONResponse(
+            status_code=429,
+            content={
+                "status": "error",
+                "service": "backend",
+                "error": str(e),
+                "metadata": {
+                    "error_type": type(e).__name__,
+                    "scope": e.scope,
+                    "retry_after": e.retry_after,
+                    "timestamp": datetime.now().isoformat()
+                }
+            },
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    return await call_next(request)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -66,31 +195,152 @@ async def health_check():
         version="1.0.0"
     )
 
+def _invoke_orchestrator(orchestrator_agent, query: str) -> str:
+    """Run the orchestrator LLM on a query and return its response text."""
+    return result_text(orchestrator_agent(query))
+
+def _request_deadline(timeout: Optional[float]) -> float:
+    """Deadline for a turn: ``REQUEST_TIMEOUT``, or the client's shorter ``X-Request-Timeout``."""
+    seconds = config.REQUEST_TIMEOUT if not timeout or timeout <= 0 else min(timeout, config.REQUEST_TIMEOUT)
+    return deadline_after(seconds)
+
+def _failure_cause(e: BaseException) -> BaseException:
+    """The deadline or circuit breaker error behind ``e`` (strands wraps model errors), else ``e`` itself."""
+    cause, seen = e, set()
+    while cause is not None and id(cause) not in seen:
+        if isinstance(cause, (DeadlineExceeded, CircuitOpen)):
+            return cause
+        seen.add(id(cause))
+        cause = cause.__cause__ or cause.__context__
+    return e
+
+def _run_chat_turn(session_id: str, query: str, deadline: Optional[float] = None) -> Tuple[str, dict]:
+    """Run one turn, locally routed or through the orchestrator; blocking, so it executes on the agent pool."""
+    # Tools and nested agents pick up the session and deadline from the bound context
+    with bind_session(session_id), bind_deadline(deadline):
+        # Time spent waiting for the session lock and a worker counts against the deadline
+        check_deadline("queueing")
+        # Reuse the session's live orchestrator; only evicted sessions are rebuilt from storage
+        orchestrator_agent = get_orchestrator(session_id)
+        response_content, routing = runtime.get_intent_router().run_turn(
+            session_id, orchestrator_agent, query, lambda: _invoke_orchestrator(orchestrator_agent, query)
+        )
+    runtime.get_session_service().end_turn(session_id)
+    return response_content, routing
+
+def _rejection_response(request: ChatRequest, e: Exception, status_code: int, retry_after: int, **details) -> JSONResponse:
+    """Fast error response telling the client why the turn was not run and when to retry."""
+    logger.warning(f"Chat request rejected: {str(e)}")
+    rejection = ChatResponse(
+        status="error",
+        query=request.query,
+        response="",
+        session_id=request.session_id,
+        error=str(e),
+        metadata={
+            "error_type": type(e).__name__,
+            **details,
+            "retry_after": retry_after,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+    return JSONResponse(
+        status_code=status_code,
+        content=rejection.model_dump(mode="json"),
+        headers={"Retry-After": str(retry_after)}
+    )
+
+def _saturated_response(request: ChatRequest, e: AgentPoolSaturated) -> JSONResponse:
+    """503 when the agent pool is full."""
+    return _rejection_response(request, e, 503, e.retry_after, queue_depth=e.queue_depth)
+
+def _session_busy_response(request: ChatRequest, e: SessionBusy) -> JSONResponse:
+    """409 when the session is already running a turn and may not take another."""
+    return _rejection_response(request, e, 409, e.retry_after, queued_turns=e.queued)
+
+def _circuit_open_response(request: ChatRequest, e: CircuitOpen) -> JSONResponse:
+    """503 while the model backend's circuit breaker is open."""
+    return _rejection_response(request, e, 503, e.retry_after)
+
+def _deadline_response(request: ChatRequest, e: DeadlineExceeded) -> JSONResponse:
+    """504 when the turn did not finish within its deadline."""
+    return _rejection_response(request, e, 504, 1, stage=e.stage)
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters for the agent pool and agent caches."""
+    return {
+        "service": "backend",
+        "timestamp": datetime.now().isoformat(),
+        "agent_pool": agent_executor.stats(),
+        "session_locks": session_locks.stats(),
+        "chat_dedupe": chat_dedupe.stats(),
+        "orchestrator_pool": orchestrator_pool.stats(),
+        "agent_cache": runtime.get_agent_factory().cache_stats(),
+        "session_journal": runtime.get_session_service().journal_stats(),
+        "summarizer": runtime.get_session_service().summary_worker.stats(),
+        "workflows": workflow_pool.stats(),
+        "evaluations": runtime.get_evaluation_queue().stats(),
+        "batch_evaluations": runtime.get_batch_evaluator().stats(),
+        "question_bank": runtime.get_question_bank().stats(),
+        "response_cache": runtime.get_response_cache().stats(),
+        "intent_router": runtime.get_intent_router().stats(),
+        "models": runtime.get_model_registry().stats(),
+        "ollama_client": runtime.get_model_registry().pool.stats(),
+        "model_scheduler": runtime.get_model_registry().pool.scheduler.stats(),
+        "rate_limiter": rate_limiter.stats(),
+        # Which worker process answered, and its view of the shared session versions
+        "worker": {
+            "pid": os.getpid(),
+            "session_versions": runtime.get_session_versions().stats() if config.SESSION_SHARED else None
+        }
+    }
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    """Chat endpoint with proper session management and structured responses."""
+async def chat(request: ChatRequest,
+               response: Response,
+               idempotency_key: Optional[str] = Header(None),
+               x_request_timeout: Optional[float] = Header(None)):
+    """
+    Chat endpoint with proper session management and structured responses.
+    
+    Identical requests (same session and query, or same ``Idempotency-Key`` header)
+    share one generation while it runs. Only requests with an ``Idempotency-Key``
+    get a successful response replayed for ``CHAT_DEDUPE_TTL`` seconds afterwards;
+    without one, the same answer sent again later ("I don't know") is a new turn.
+    
+    The turn must finish within ``REQUEST_TIMEOUT`` seconds (or the shorter
+    ``X-Request-Timeout`` header), queueing included; otherwise it returns 504.
+    While the model backend is down, turns fail fast with 503.
+    """
+    deadline = _request_deadline(x_request_timeout)
+    key = chat_dedupe.make_key(request.session_id, request.query, idempotency_key)
+    result, duplicate = await chat_dedupe.do(
+        key,
+        lambda: _chat(request, deadline),
+        cache_if=lambda result: (
+            idempotency_key is not None and isinstance(result, ChatResponse) and result.status == "success"
+        )
+    )
+    if isinstance(result, ChatResponse):
+        if duplicate:
+            result = result.model_copy(update={"metadata": {**(result.metadata or {}), "deduplicated": duplicate}})
+        if result.session_id:
+            response.headers[SESSION_HEADER] = result.session_id
+    return result
+
+async def _chat(request: ChatRequest, deadline: Optional[float] = None):
+    """Run a /chat request through the session lock and agent pool."""
     try:
         # Generate session ID if not provided
         session_id = request.session_id or f"session_{uuid.uuid4().hex[:8]}"
         
-        # Create orchestrator with session management
-        orchestrator_agent = create_orchestrator(session_id)
-        
-        # Process the query
-        result = orchestrator_agent(request.query)
-        
-        # Extract response content - handle different result formats
-        if hasattr(result, 'message') and hasattr(result.message, 'content'):
-            response_content = result.message.content
-        elif hasattr(result, 'content'):
-            response_content = result.content
-        elif isinstance(result, dict) and 'content' in result:
-            response_content = result['content']
-        elif isinstance(result, str):
-            response_content = result
-        else:
-            # Fallback: convert result to string
-            response_content = str(result)
+        # Turns for the same session run in order; a double-submit may share the pending turn's answer
+        response_content, routing = await session_locks.run(
+            session_id,
+            request.query,
+            lambda: agent_executor.run(_run_chat_turn, session_id, request.query, deadline)
+        )
         
         # Get conversation length for metadata (optional)
         conversation_length = None
@@ -102,12 +352,26 @@ async def chat(request: ChatRequest):
             session_id=session_id,
             conversation_length=conversation_length,
             metadata={
-                "model": config.get_ollama_model(),
+                "model": runtime.get_model_registry().profile("orchestrator")["model_id"],
+                # Whether the turn was dispatched by the local intent router or the orchestrator LLM
+                "routing": routing,
+                # Background evaluations of earlier answers that finished since the last response
+                "feedback": runtime.get_evaluation_queue().take_undelivered(session_id),
                 "timestamp": datetime.now().isoformat()
             }
         )
         
+    except AgentPoolSaturated as e:
+        return _saturated_response(request, e)
+    except SessionBusy as e:
+        return _session_busy_response(request, e)
     except Exception as e:
+        cause = _failure_cause(e)
+        if isinstance(cause, CircuitOpen):
+            return _circuit_open_response(request, cause)
+        if isinstance(cause, DeadlineExceeded):
+            logger.warning(f"Chat turn for session {request.session_id} exceeded its deadline during {cause.stage}")
+            return _deadline_response(request, cause)
         logger.error(f"Error in chat endpoint: {str(e)}")
         return ChatResponse(
             status="error",
@@ -120,14 +384,222 @@ async def chat(request: ChatRequest):
             }
         )
 
+def _run_streaming_chat_turn(session_id: str, query: str, sink, deadline: Optional[float] = None) -> Tuple[str, dict]:
+    """Run one turn on the agent pool, reporting progress to ``sink``."""
+    with bind_session(session_id), bind_deadline(deadline), streaming_to(sink):
+        check_deadline("queueing")
+        orchestrator_agent = get_orchestrator(session_id)
+        response_content, routing = runtime.get_intent_router().run_turn(
+            session_id, orchestrator_agent, query, lambda: run_streaming_turn(orchestrator_agent, query, sink)
+        )
+    runtime.get_session_service().end_turn(session_id)
+    return response_content, routing
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, x_request_timeout: Optional[float] = Header(None)):
+    """
+    Server-sent events variant of /chat.
+    
+    Emits ``token`` events as the model generates (tagged with the producing agent),
+    ``tool`` and ``tool_result`` events around tool calls, then a single ``final``
+    event carrying the complete response, or an ``error`` event. The turn has
+    the same deadline as /chat.
+    """
+    deadline = _request_deadline(x_request_timeout)
+    session_id = request.session_id or f"session_{uuid.uuid4().hex[:8]}"
+    
+    # Check the session and admit before streaming starts so rejections are still fast 409/503s.
+    # A duplicate that will share a pending turn's answer needs no worker slot.
+    admitted = False
+    try:
+        session_locks.check(session_id, request.query)
+        if not session_locks.will_coalesce(session_id, request.query):
+            await agent_executor.admit()
+            admitted = True
+    except SessionBusy as e:
+        return _session_busy_response(request, e)
+    except AgentPoolSaturated as e:
+        return _saturated_response(request, e)
+    
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def sink(event: str, payload: dict):
+        loop.call_soon_threadsafe(events.put_nowait, (event, payload))
+    
+    async def run_streaming_turn_admitted():
+        nonlocal admitted
+        if admitted:
+            admitted = False
+            return await agent_executor.run_admitted(_run_streaming_chat_turn, session_id, request.query, sink, deadline)
+        # The turn we meant to coalesce with finished first; run our own
+        return await agent_executor.run(_run_streaming_chat_turn, session_id, request.query, sink, deadline)
+    
+    async def run_turn():
+        try:
+            response_content, routing = await session_locks.run(session_id, request.query, run_streaming_turn_admitted)
+            sink("final", {
+                "status": "success",
+                "query": request.query,
+                "response": response_content,
+                "session_id": session_id,
+                "metadata": {
+                    "model": runtime.get_model_registry().profile("orchestrator")["model_id"],
+                    "routing": routing,
+                    "feedback": runtime.get_evaluation_queue().take_undelivered(session_id),
+                    "timestamp": datetime.now().isoformat()
+                }
+            })
+        except Exception as e:
+            cause = _failure_cause(e)
+            logger.error(f"Error in chat stream endpoint: {str(cause)}")
+            sink("error", {
+                "status": "error",
+                "session_id": session_id,
+                "error": str(cause),
+                "error_type": type(cause).__name__,
+                **({"retry_after": cause.retry_after} if isinstance(cause, CircuitOpen) else {})
+            })
+        finally:
+            if admitted:
+                # Coalesced onto another turn after all; the reserved slot was never used
+                agent_executor.release()
+    
+    # The turn keeps running (and persists) even if the client disconnects mid-stream
+    task = asyncio.create_task(run_turn())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    
+    async def event_stream():
+        yield format_sse("session", {"session_id": session_id})
+        while True:
+            event, payload = await events.get()
+            yield format_sse(event, payload)
+            if event in ("final", "error"):
+                break
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", SESSION_HEADER: session_id}
+    )
+
+@app.post("/session", response_model=SessionResponse)
+async def create_session(request: SessionRequest, response: Response):
+    """
+    Create a session, or update an existing one, with the position being interviewed for.
+    
+    The profile is stored with the session and added to the orchestrator's system prompt
+    once, so /chat requests only need to carry the candidate's message.
+    """
+    session_id = request.session_id or f"session_{uuid.uuid4().hex[:8]}"
+    response.headers[SESSION_HEADER] = session_id
+    profile = PositionProfile(**request.model_dump(exclude={"session_id"}))
+    try:
+        # Serialized with the session's turns so a running turn never sees its prompt change midway
+        await session_locks.run(
+            session_id,
+            None,
+            lambda: agent_executor.run(set_position_profile, session_id, profile.model_dump())
+        )
+        logger.info(f"Stored position profile for session {session_id}: {profile.position_name}")
+        return SessionResponse(status="success", session_id=session_id, profile=profile)
+    except Exception as e:
+        logger.error(f"Error in session endpoint: {str(e)}")
+        return SessionResponse(status="error", session_id=session_id, error=str(e))
+
+@app.get("/session/{session_id}", response_model=SessionResponse)
+async def get_session(session_id: str):
+    """Get the position profile stored for a session."""
+    try:
+        profile = await session_locks.run(
+            session_id,
+            None,
+            lambda: agent_executor.run(get_position_profile, session_id)
+        )
+        if profile is None:
+            return SessionResponse(status="error", session_id=session_id, error="No position profile stored for this session")
+        return SessionResponse(status="success", session_id=session_id, profile=PositionProfile(**profile))
+    except Exception as e:
+        logger.error(f"Error in session endpoint: {str(e)}")
+        return SessionResponse(status="error", session_id=session_id, error=str(e))
+
+@app.get("/session/{session_id}/feedback", response_model=FeedbackResponse)
+async def get_feedback(session_id: str):
+    """
+    Get the answer evaluations kept for a session, including ones still running.
+    
+    Finished evaluations returned here are not repeated in later /chat responses.
+    """
+    evaluations = runtime.get_evaluation_queue().feedback(session_id)
+    return FeedbackResponse(
+        status="success",
+        session_id=session_id,
+        evaluations=evaluations,
+        pending=sum(1 for evaluation in evaluations if evaluation["status"] == "pending")
+    )
+
+@app.post("/evaluate/batch")
+async def evaluate_batch(request: BatchEvaluationRequest):
+    """
+    Grade many recorded answers in one request.
+    
+    Items go straight to the evaluator agents, several at once (up to
+    ``EVALUATION_BATCH_CONCURRENCY`` across all batches), without the
+    orchestrator. Results stream back as newline-delimited JSON, one line per
+    item in completion order (``index`` ties it to the request), followed by a
+    ``summary`` line.
+    """
+    if len(request.items) > config.EVALUATION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"A batch may hold at most {config.EVALUATION_BATCH_MAX_ITEMS} items"
+        )
+    
+    async def result_lines():
+        started = datetime.now()
+        counts = {"completed": 0, "failed": 0}
+        async for result in runtime.get_batch_evaluator().stream(request.items, request.concurrency):
+            counts[result.status] += 1
+            yield result.model_dump_json() + "\n"
+        yield json.dumps({
+            "type": "summary",
+            "items": len(request.items),
+            **counts,
+            "duration_ms": round((datetime.now() - started).total_seconds() * 1000, 2)
+        }) + "\n"
+    
+    return StreamingResponse(
+        result_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/cache/responses")
+async def invalidate_response_cache(agent_type: Optional[str] = None):
+    """
+    Drop cached agent responses, e.g. after editing a prompt outside of a deploy.
+    
+    Responses made with another prompt or model are already never served; this
+    also frees them right away.
+    """
+    removed = runtime.get_response_cache().invalidate(agent_type)
+    return {
+        "status": "success",
+        "service": "backend",
+        "timestamp": datetime.now().isoformat(),
+        "agent_type": agent_type,
+        "removed": removed
+    }
+
 @app.post("/scrape-job", response_model=JobScrapeResponse)
 async def scrape_job(request: ScrapeRequest):
     """Scrape job information from a job posting URL."""
     try:
         logger.info(f"Scraping job posting from URL: {request.url}")
         
-        # Scrape the job posting
-        job_info = scrape_job_posting(request.url)
+        # Scrape the job posting; blocking HTTP, so it runs off the event loop
+        job_info = await asyncio.get_running_loop().run_in_executor(None, scrape_job_posting, request.url)
         
         if 'error' in job_info:
             return JobScrapeResponse(
@@ -159,6 +631,6 @@ if __name__ == "__main__":
         "main:app",
         host=config.API_HOST,
         port=config.API_PORT,
-        reload=True,
+        reload=config.API_RELOAD,
         log_level=config.LOG_LEVEL.lower()
     )
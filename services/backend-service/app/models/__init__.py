@@ -4,6 +4,7 @@ Response models for the PrepWise backend service.
 
 from .response_models import (
     InterviewResponse,
+    AnswerEvaluation,
     ChatResponse,
     JobScrapeResponse,
     HealthResponse
@@ -11,6 +12,7 @@ from .response_models import (
 
 __all__ = [
     "InterviewResponse",
+    "AnswerEvaluation",
     "ChatResponse", 
     "JobScrapeResponse",
     "HealthResponse"
@@ -3,7 +3,7 @@ Structured response models for consistent API responses.
 """
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field
 
 
@@ -17,6 +17,15 @@ class InterviewResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional metadata")
 
 
+class AnswerEvaluation(BaseModel):
+    """Structured evaluation of a candidate's answer."""
+    
+    score: int = Field(..., ge=1, le=10, description="Overall score from 1 (poor) to 10 (excellent)")
+    strengths: List[str] = Field(default_factory=list, description="What the answer did well")
+    improvements: List[str] = Field(default_factory=list, description="What the answer should improve")
+    summary: str = Field(..., description="One or two sentence assessment")
+
+
 class ChatResponse(BaseModel):
     """Standardized chat response model."""
     
@@ -31,6 +40,36 @@ class ChatResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = Field(None, description="Additional response metadata")
 
 
+class PositionProfile(BaseModel):
+    """Position a session is interviewing for."""
+    
+    position_name: str = Field(..., min_length=1, description="Position title")
+    company: Optional[str] = Field(None, description="Hiring company")
+    description: Optional[str] = Field(None, description="Position description")
+
+
+class SessionResponse(BaseModel):
+    """Response model for session profile operations."""
+    
+    status: str = Field(..., description="Response status (success, error)")
+    service: str = Field(default="backend", description="Service name")
+    timestamp: datetime = Field(default_factory=datetime.now, description="Response timestamp")
+    session_id: Optional[str] = Field(None, description="Session ID for conversation tracking")
+    profile: Optional[PositionProfile] = Field(None, description="Stored position profile")
+    error: Optional[str] = Field(None, description="Error message if status is error")
+
+
+class FeedbackResponse(BaseModel):
+    """Response model for a session's answer evaluations."""
+    
+    status: str = Field(..., description="Response status (success, error)")
+    service: str = Field(default="backend", description="Service name")
+    timestamp: datetime = Field(default_factory=datetime.now, description="Response timestamp")
+    session_id: str = Field(..., description="Session ID for conversation tracking")
+    evaluations: List[Dict[str, Any]] = Field(default_factory=list, description="Evaluations, oldest first")
+    pending: int = Field(0, description="Evaluations still running")
+
+
 class JobScrapeResponse(BaseModel):
     """Response model for job scraping operations."""
     
@@ -50,3 +89,34 @@ class HealthResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now, description="Check timestamp")
     version: Optional[str] = Field(None, description="Service version")
     dependencies: Optional[Dict[str, str]] = Field(None, description="Dependency status")
+
+
+class EvaluationItem(BaseModel):
+    """One recorded answer to grade."""
+    
+    id: Optional[str] = Field(None, description="Caller's identifier, echoed in the result")
+    question: str = Field(..., min_length=1, description="The interview question")
+    answer: str = Field(..., min_length=1, description="The candidate's answer")
+    type: Literal["behavioral", "technical", "situational"] = Field("behavioral", description="Question type")
+    position: Optional[str] = Field(None, description="Position the candidate interviewed for")
+
+
+class BatchEvaluationRequest(BaseModel):
+    """Answers to grade in one batch."""
+    
+    items: List[EvaluationItem] = Field(..., min_length=1, description="Answers to grade")
+    concurrency: Optional[int] = Field(None, ge=1, description="Evaluations run at once; capped by the server")
+
+
+class EvaluationResult(BaseModel):
+    """Outcome of one batch item, streamed as one NDJSON line."""
+    
+    type: str = Field(default="result", description="Line type (result)")
+    index: int = Field(..., description="Position of the item in the request")
+    id: Optional[str] = Field(None, description="Caller's identifier")
+    status: str = Field(..., description="completed or failed")
+    evaluation: Optional[str] = Field(None, description="Evaluator feedback")
+    result: Optional[AnswerEvaluation] = Field(None, description="Structured evaluation, with structured output enabled")
+    error: Optional[str] = Field(None, description="Error message if status is failed")
+    model: Optional[str] = Field(None, description="Model that graded the answer")
+    duration_ms: float = Field(..., description="Time spent grading this item")
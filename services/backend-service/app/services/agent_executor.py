@@ -0,0 +1,136 @@
+"""
+Bounded executor for running blocking agent calls off the event loop.
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+from ..config import config
+
+
+class AgentPoolSaturated(Exception):
+    """Raised when the agent pool cannot admit another request."""
+
+    def __init__(self, queue_depth: int, retry_after: int):
+        super().__init__(f"Agent pool is saturated ({queue_depth} requests queued)")
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+
+class AgentExecutor:
+    """
+    Runs blocking agent invocations on a dedicated thread pool.
+
+    Admission is bounded: at most ``max_workers`` calls run at once and at most
+    ``max_queue`` more wait for a worker. Callers that cannot be admitted
+    within ``queue_timeout`` seconds get an ``AgentPoolSaturated`` error
+    instead of piling up behind slow generations.
+    """
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 max_queue: Optional[int] = None,
+                 queue_timeout: Optional[float] = None):
+        """Initialize the executor from arguments or config defaults."""
+        self.max_workers = max_workers or config.AGENT_POOL_SIZE
+        self.max_queue = max_queue if max_queue is not None else config.AGENT_QUEUE_SIZE
+        self.queue_timeout = queue_timeout if queue_timeout is not None else config.AGENT_QUEUE_TIMEOUT
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="agent-worker"
+        )
+        self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+        self._in_flight = 0
+        self._rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of admitted calls waiting for a free worker."""
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on the pool and await its result.
+
+        Args:
+            fn: Blocking callable to execute
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            AgentPoolSaturated: If no slot frees up within the queue timeout
+        """
+        await self.admit()
+        return await self.run_admitted(fn, *args, **kwargs)
+
+    async def admit(self):
+        """
+        Reserve an execution slot without running anything yet.
+
+        Lets streaming endpoints reject before any response bytes are sent. Every
+        successful ``admit()`` must be followed by exactly one ``run_admitted()``.
+
+        Raises:
+            AgentPoolSaturated: If no slot frees up within the queue timeout
+        """
+        await self._admit()
+        self._in_flight += 1
+
+    async def run_admitted(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a callable in a slot reserved by ``admit()`` and release it afterwards."""
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            self.release()
+
+    def release(self):
+        """Give back a slot reserved by ``admit()`` that will not be used."""
+        self._in_flight -= 1
+        self._slots.release()
+
+    async def _admit(self):
+        """Acquire an execution slot or raise if the pool stays full."""
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+
+        if self.queue_timeout > 0:
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+                logger.debug(f"Agent call admitted after {time.monotonic() - started:.2f}s wait")
+                return
+            except asyncio.TimeoutError:
+                pass
+
+        self._rejected += 1
+        logger.warning(f"Rejecting agent call: pool saturated (queue depth {self.queue_depth})")
+        raise AgentPoolSaturated(self.queue_depth, self.retry_after())
+
+    def retry_after(self) -> int:
+        """Suggested client back-off in seconds, scaled by the queue depth."""
+        return max(1, int(self.queue_timeout) + self.queue_depth // self.max_workers)
+
+    def stats(self) -> Dict[str, int]:
+        """Current pool utilization for health and metrics reporting."""
+        return {
+            "pool_size": self.max_workers,
+            "queue_size": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "rejected": self._rejected
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and optionally wait for running calls."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
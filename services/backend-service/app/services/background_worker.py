@@ -0,0 +1,72 @@
+"""
+Small thread pool for deferred work that must stay off the request path.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+from .scheduler import work_class as bind_work_class
+
+
+class BackgroundWorker:
+    """
+    Runs deferred jobs (e.g. conversation summarization) on a few dedicated threads.
+
+    Threads are started on the first submitted job, never at import, so forked
+    workers each get their own. Failures are counted and logged here; callers
+    still see them on the returned future. Model calls made by jobs are
+    scheduled under the worker's ``work_class``.
+    """
+
+    def __init__(self, name: str, max_workers: int = 1, work_class: Optional[str] = None):
+        """Initialize the worker."""
+        self.name = name
+        self.max_workers = max_workers
+        self.work_class = work_class
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "pending": 0}
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Queue a job.
+
+        Args:
+            fn: Callable to run in the background
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            Future for the job's result
+        """
+        self._stats["submitted"] += 1
+        self._stats["pending"] += 1
+        future = self._executor.submit(self._run, fn, *args, **kwargs)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def stats(self) -> Dict[str, int]:
+        """Job counters for metrics reporting."""
+        return {**self._stats, "workers": self.max_workers}
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker; pending jobs are dropped unless ``wait`` is set."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if self.work_class is None:
+            return fn(*args, **kwargs)
+        with bind_work_class(self.work_class):
+            return fn(*args, **kwargs)
+
+    def _on_done(self, future: Future):
+        self._stats["pending"] -= 1
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self._stats["completed"] += 1
+        else:
+            self._stats["failed"] += 1
+            logger.warning(f"Background job on {self.name} failed: {str(error)}")
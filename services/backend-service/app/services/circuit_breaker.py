@@ -0,0 +1,142 @@
+"""
+Failure containment for calls to the model backend.
+
+``CircuitBreaker`` fails calls fast while the backend keeps failing, and
+``RetryBudget`` caps retries at a fraction of regular traffic so they cannot
+multiply the load on a backend that is already struggling.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from ..config import config
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a backend whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open); retry in {retry_after:.0f}s")
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker.
+
+    The circuit opens after ``failure_threshold`` consecutive failures. While
+    open, ``acquire`` raises ``CircuitOpen`` without touching the backend.
+    After ``reset_timeout`` seconds it turns half-open and lets a single trial
+    call through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        """Initialize a closed circuit from arguments or config defaults."""
+        self.name = name
+        self.failure_threshold = failure_threshold or config.OLLAMA_BREAKER_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None else config.OLLAMA_BREAKER_RESET
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self._stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        """``closed``, ``open`` or ``half_open``."""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def acquire(self):
+        """
+        Admit one call; pair with ``record`` and ``release``.
+
+        Raises:
+            CircuitOpen: While the circuit is open, or half-open with a trial call already running
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                logger.info(f"{self.name} circuit half-open, sending a trial call")
+                return
+            self._stats["rejected"] += 1
+            retry_after = self.reset_timeout - (time.monotonic() - self._opened_at)
+        raise CircuitOpen(self.name, retry_after)
+
+    def record(self, success: bool):
+        """Record the outcome of a call that reached (or failed to reach) the backend."""
+        with self._lock:
+            was_trial, self._trial = self._trial, False
+            if success:
+                if self._opened_at is not None:
+                    logger.info(f"{self.name} circuit closed")
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if was_trial or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._stats["opened"] += 1
+                logger.warning(f"{self.name} circuit opened after {self._failures} consecutive failures")
+
+    def release(self):
+        """End an admitted call that recorded no outcome (e.g. it was cancelled), freeing the trial slot."""
+        with self._lock:
+            self._trial = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Circuit state and counters."""
+        with self._lock:
+            return {**self._stats, "state": self._state(), "consecutive_failures": self._failures}
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of calls.
+
+    Every call deposits ``ratio`` tokens and every retry spends one, up to
+    ``burst`` tokens banked, so sustained retries stay below ``ratio`` of the
+    traffic while isolated failures can still be retried right away.
+    """
+
+    def __init__(self, ratio: Optional[float] = None, burst: Optional[float] = None):
+        """Initialize a full bucket from arguments or config defaults."""
+        self.ratio = ratio if ratio is not None else config.OLLAMA_RETRY_BUDGET_RATIO
+        self.burst = burst if burst is not None else config.OLLAMA_RETRY_BUDGET_BURST
+        self._tokens = self.burst
+        self._lock = threading.Lock()
+        self._stats = {"retries": 0, "exhausted": 0}
+
+    def deposit(self):
+        """Credit the budget for one call."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False if it is used up."""
+        with self._lock:
+            if self._tokens < 1:
+                self._stats["exhausted"] += 1
+                return False
+            self._tokens -= 1
+            self._stats["retries"] += 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Retries granted and refused, and tokens left."""
+        with self._lock:
+            return {**self._stats, "tokens": round(self._tokens, 2)}
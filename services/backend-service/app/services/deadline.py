@@ -0,0 +1,74 @@
+"""
+End-to-end request deadlines.
+
+The HTTP layer gives every turn a deadline; it is kept in a context variable,
+which strands copies into tool threads and nested agent calls, so workflows
+and each model call made for the turn know how much time is left.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Absolute ``time.monotonic()`` deadline of the running request, if it has one
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs out of time."""
+
+    def __init__(self, stage: str = "the request"):
+        super().__init__(f"Deadline exceeded during {stage}")
+        self.stage = stage
+
+
+def deadline_after(seconds: float) -> float:
+    """Absolute deadline ``seconds`` from now, for ``bind_deadline``."""
+    return time.monotonic() + seconds
+
+
+@contextmanager
+def bind_deadline(deadline: Optional[float]) -> Iterator[None]:
+    """
+    Run the enclosed code under an absolute deadline.
+
+    An earlier deadline already in effect still applies; ``None`` leaves the
+    current deadline unchanged.
+
+    Args:
+        deadline: ``time.monotonic()`` value, e.g. from ``deadline_after``
+    """
+    current = _deadline.get()
+    if deadline is None or (current is not None and current <= deadline):
+        yield
+        return
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (may be negative), or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check_deadline(stage: str = "the request"):
+    """
+    Fail if the current deadline has passed.
+
+    Raises:
+        DeadlineExceeded: If no time is left
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(stage)
+
+
+def timeout_within(default: float) -> float:
+    """``default`` seconds, shortened to the time left before the current deadline."""
+    left = remaining()
+    return default if left is None else max(0.0, min(default, left))
@@ -0,0 +1,226 @@
+"""
+Load balancing across Ollama hosts.
+
+``OllamaHostBalancer`` picks the host for each model call: a session stays on
+the host it was first sent to, so the server's prompt (KV) cache for that
+conversation stays warm, unless that host is unhealthy or clearly busier than
+the others. Everything else goes to the host with the fewest outstanding
+requests. Hosts that fail are ejected and probed in the background until
+they answer again.
+"""
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+from loguru import logger
+
+from ..config import config
+
+
+class HostState:
+    """Load and health of one Ollama host."""
+
+    def __init__(self, url: str):
+        """Initialize a healthy, idle host."""
+        self.url = url
+        self.healthy = True
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.last_used = 0
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.last_probe: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+            "last_probe": self.last_probe
+        }
+
+
+class OllamaHostBalancer:
+    """
+    Least-outstanding-requests balancing with session affinity and health checks.
+
+    A host is ejected after ``failure_threshold`` consecutive failed calls or
+    probes, and re-admitted by the first probe that succeeds. Probes run on a
+    daemon thread started with the first request (never at import, so forked
+    workers each get their own) and only when there is more than one host. If
+    every host is ejected, requests still go to the least-loaded one rather
+    than failing outright, and a call that succeeds there re-admits it.
+    """
+
+    def __init__(self,
+                 hosts: Optional[Iterable[str]] = None,
+                 probe_interval: Optional[float] = None,
+                 probe_timeout: Optional[float] = None,
+                 failure_threshold: Optional[int] = None,
+                 affinity_slack: Optional[int] = None,
+                 affinity_size: Optional[int] = None):
+        """Initialize the balancer from arguments or config defaults."""
+        urls = list(dict.fromkeys(hosts if hosts is not None else config.get_ollama_hosts()))
+        if not urls:
+            raise ValueError("At least one Ollama host is required")
+        self.hosts: Dict[str, HostState] = {url: HostState(url) for url in urls}
+        self.probe_interval = probe_interval if probe_interval is not None else config.OLLAMA_HEALTH_INTERVAL
+        self.probe_timeout = probe_timeout if probe_timeout is not None else config.OLLAMA_HEALTH_TIMEOUT
+        self.failure_threshold = failure_threshold or config.OLLAMA_FAILURE_THRESHOLD
+        self.affinity_slack = affinity_slack if affinity_slack is not None else config.OLLAMA_AFFINITY_SLACK
+        self.affinity_size = affinity_size or config.OLLAMA_AFFINITY_SIZE
+
+        self._affinity: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ticks = itertools.count(1)
+        self._stop = threading.Event()
+        self._prober: Optional[threading.Thread] = None
+        self._stats = {"pinned": 0, "rebalanced": 0, "failovers": 0}
+
+    def acquire(self, session_id: Optional[str] = None, exclude: Iterable[str] = ()) -> str:
+        """
+        Pick a host for one call and count it as outstanding; pair with ``release``.
+
+        Args:
+            session_id: Session the call belongs to, for affinity; calls without one are only load-balanced
+            exclude: Hosts already tried for this call
+
+        Returns:
+            Host URL
+        """
+        self._ensure_prober()
+        with self._lock:
+            candidates = [state for url, state in self.hosts.items() if url not in exclude] or list(self.hosts.values())
+            healthy = [state for state in candidates if state.healthy]
+            if not healthy:
+                logger.warning("No healthy Ollama host, sending the request to the least-loaded one")
+            candidates = healthy or candidates
+            least = min(candidates, key=lambda state: (state.outstanding, state.last_used))
+
+            chosen = least
+            pinned = self.hosts.get(self._affinity.get(session_id)) if session_id else None
+            if pinned is not None and pinned in candidates:
+                if pinned.outstanding <= least.outstanding + self.affinity_slack:
+                    chosen = pinned
+                    self._stats["pinned"] += 1
+                else:
+                    self._stats["rebalanced"] += 1
+            if session_id:
+                self._affinity[session_id] = chosen.url
+                self._affinity.move_to_end(session_id)
+                while len(self._affinity) > self.affinity_size:
+                    self._affinity.popitem(last=False)
+
+            chosen.outstanding += 1
+            chosen.requests += 1
+            chosen.last_used = next(self._ticks)
+            return chosen.url
+
+    def release(self, host: str, success: Optional[bool] = None):
+        """
+        Finish a call started with ``acquire``.
+
+        Args:
+            host: Host the call went to
+            success: True if the host replied (even with a 4xx), False if it failed
+                (unreachable, 5xx, timed out or broke off the call), None if the call
+                ended without an outcome (cancelled, or out of the caller's time)
+        """
+        with self._lock:
+            state = self.hosts[host]
+            state.outstanding -= 1
+            if success is None:
+                return
+            if not success:
+                self._record_failure(state, "request failed")
+                return
+            state.consecutive_failures = 0
+            if not state.healthy:
+                # Reached while ejected (every host was down); no need to wait for a probe
+                state.healthy = True
+                logger.info(f"Re-admitted Ollama host {state.url} after a successful call")
+
+    def record_failover(self):
+        """Count a call that moved to another host after its first one was unreachable."""
+        with self._lock:
+            self._stats["failovers"] += 1
+
+    def _record_failure(self, state: HostState, reason: str):
+        """Count a failure and eject the host at the threshold; caller holds the lock."""
+        state.failures += 1
+        state.consecutive_failures += 1
+        if state.healthy and state.consecutive_failures >= self.failure_threshold:
+            state.healthy = False
+            state.ejections += 1
+            # Its sessions re-pin on their next call
+            for session_id in [s for s, url in self._affinity.items() if url == state.url]:
+                del self._affinity[session_id]
+            logger.warning(f"Ejected Ollama host {state.url} after {state.consecutive_failures} failures ({reason})")
+
+    def _ensure_prober(self):
+        """Start the health probe thread on first use."""
+        if self._prober is not None or len(self.hosts) < 2 or self.probe_interval <= 0:
+            return
+        with self._lock:
+            if self._prober is None:
+                self._prober = threading.Thread(target=self._probe_loop, name="ollama-health", daemon=True)
+                self._prober.start()
+
+    def _probe_loop(self):
+        with httpx.Client(timeout=self.probe_timeout) as client:
+            while not self._stop.wait(self.probe_interval):
+                self.probe(client)
+
+    def probe(self, client: Optional[httpx.Client] = None):
+        """
+        Check every host once, ejecting failing hosts and re-admitting recovered ones.
+
+        Args:
+            client: HTTP client to probe with; a short-lived one is used if omitted
+        """
+        if client is None:
+            with httpx.Client(timeout=self.probe_timeout) as client:
+                return self.probe(client)
+
+        for state in list(self.hosts.values()):
+            try:
+                client.get(f"{state.url.rstrip('/')}/api/version").raise_for_status()
+                ok, reason = True, None
+            except httpx.HTTPError as e:
+                ok, reason = False, f"probe: {type(e).__name__}"
+            with self._lock:
+                state.last_probe = time.time()
+                if not ok:
+                    self._record_failure(state, reason)
+                    continue
+                state.consecutive_failures = 0
+                if not state.healthy:
+                    state.healthy = True
+                    logger.info(f"Re-admitted Ollama host {state.url}")
+
+    def healthy_hosts(self) -> List[str]:
+        """Hosts currently in rotation."""
+        with self._lock:
+            return [url for url, state in self.hosts.items() if state.healthy]
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-host load and health, and affinity counters."""
+        with self._lock:
+            return {
+                **self._stats,
+                "sessions": len(self._affinity),
+                "hosts": {url: state.to_dict() for url, state in self.hosts.items()}
+            }
+
+    def close(self):
+        """Stop the probe thread."""
+        self._stop.set()
+        if self._prober is not None:
+            self._prober.join(timeout=self.probe_timeout + 1)
@@ -0,0 +1,317 @@
+"""
+Local interview question bank with full-text retrieval.
+
+The corpus (``app/data/question_bank.json``) holds questions per
+``InterviewPosition`` x ``QuestionType`` x difficulty, plus ``general``
+questions that fit any position. ``build_question_bank`` compiles it offline
+into a SQLite FTS5 index; at runtime ``QuestionBank`` opens that file
+read-only and memory-mapped and ranks candidates against the job description
+with BM25, so picking a question takes milliseconds instead of a model call.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from loguru import logger
+from shared import InterviewPosition, QuestionType
+
+from ..config import config
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Corpus section whose questions apply to every position
+GENERAL_POSITION = "general"
+
+# Phrases in a free-text position name, checked in order; more specific roles first
+POSITION_ALIASES = [
+    (InterviewPosition.DESIGNER, ("designer", "design", "ux", "ui")),
+    (InterviewPosition.MARKETING_MANAGER, ("marketing", "growth", "brand", "seo", "content")),
+    (InterviewPosition.DATA_SCIENTIST, ("data scientist", "data science", "machine learning", "ml", "analyst", "analytics")),
+    (InterviewPosition.PRODUCT_MANAGER, ("product manager", "product owner", "pm", "product")),
+    (InterviewPosition.SOFTWARE_ENGINEER, ("software", "engineer", "developer", "programmer", "backend", "frontend", "full stack", "devops", "sre")),
+]
+
+# Words too common in job descriptions to say anything about relevance
+STOPWORDS = frozenset("""
+a about ability able and any are as at be will with within who you your our we us they their this that these
+for from has have in into is it its of on or such the to using work working team teams role strong experience
+years year plus skills skill including new join looking across help build an by can do more what well also
+""".split())
+
+MAX_QUERY_TERMS = 32
+
+SCHEMA = """
+CREATE TABLE questions (
+    id INTEGER PRIMARY KEY,
+    position TEXT NOT NULL,
+    question_type TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    question TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE INDEX idx_questions_cell ON questions (question_type, difficulty, position);
+CREATE VIRTUAL TABLE questions_fts USING fts5(
+    question, tags, content='questions', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+@dataclass
+class BankQuestion:
+    """One question from the bank."""
+
+    id: int
+    position: str
+    question_type: str
+    difficulty: str
+    question: str
+
+
+def resolve_position(name: Optional[str]) -> Optional[InterviewPosition]:
+    """
+    Map a free-text position name (e.g. "Senior Backend Developer") to an ``InterviewPosition``.
+
+    Args:
+        name: Position name as entered by the user
+
+    Returns:
+        The matching position, or None if the name matches no known role
+    """
+    if not name:
+        return None
+    normalized = " ".join(re.findall(r"[a-z0-9]+", name.lower()))
+    for position in InterviewPosition:
+        if normalized == position.value.replace("_", " "):
+            return position
+    padded = f" {normalized} "
+    for position, aliases in POSITION_ALIASES:
+        if any(f" {alias} " in padded for alias in aliases):
+            return position
+    return None
+
+
+def difficulty_for(asked: int) -> str:
+    """Difficulty of the next question after ``asked`` bank questions, per ``QUESTION_BANK_DIFFICULTY_STEPS``."""
+    level = sum(1 for step in config.QUESTION_BANK_DIFFICULTY_STEPS if asked >= step)
+    return DIFFICULTIES[min(level, len(DIFFICULTIES) - 1)]
+
+
+def _query_terms(text: Optional[str]) -> List[str]:
+    """Distinct content words of a text, as quoted FTS5 terms."""
+    terms: List[str] = []
+    for word in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        if len(word) < 2 or word in STOPWORDS or f'"{word}"' in terms:
+            continue
+        terms.append(f'"{word}"')
+        if len(terms) >= MAX_QUERY_TERMS:
+            break
+    return terms
+
+
+def build_question_bank(seed_path: Optional[str] = None, db_path: Optional[str] = None) -> int:
+    """
+    Compile the seed corpus into the SQLite index.
+
+    The index is written to a temporary file and moved into place, so running
+    processes keep reading the previous index until they reopen it.
+
+    Args:
+        seed_path: Corpus JSON, ``{position: {question_type: {difficulty: [{question, tags}]}}}``
+        db_path: Index file to write
+
+    Returns:
+        Number of questions indexed
+
+    Raises:
+        ValueError: If the corpus uses an unknown position, question type or difficulty
+    """
+    seed_path = seed_path or config.QUESTION_BANK_SEED
+    db_path = db_path or config.QUESTION_BANK_PATH
+    with open(seed_path, encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    positions = {position.value for position in InterviewPosition} | {GENERAL_POSITION}
+    question_types = {question_type.value for question_type in QuestionType}
+    rows = []
+    for position, by_type in corpus.items():
+        if position not in positions:
+            raise ValueError(f"Unknown position in question bank: {position}")
+        for question_type, by_difficulty in by_type.items():
+            if question_type not in question_types:
+                raise ValueError(f"Unknown question type in question bank: {question_type}")
+            for difficulty, entries in by_difficulty.items():
+                if difficulty not in DIFFICULTIES:
+                    raise ValueError(f"Unknown difficulty in question bank: {difficulty}")
+                for entry in entries:
+                    rows.append((position, question_type, difficulty, entry["question"], " ".join(entry.get("tags", []))))
+
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            "INSERT INTO questions (position, question_type, difficulty, question, tags) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        connection.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+        connection.execute("INSERT INTO questions_fts (questions_fts) VALUES ('optimize')")
+        connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ("built_at", datetime.now().isoformat()),
+            ("questions", str(len(rows))),
+            ("seed", os.path.abspath(seed_path)),
+        ])
+        connection.commit()
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    os.replace(tmp_path, db_path)
+    logger.info(f"Built question bank {db_path} with {len(rows)} questions")
+    return len(rows)
+
+
+class QuestionBank:
+    """
+    Read-only, memory-mapped access to the question index.
+
+    Each thread gets its own connection, opened ``immutable`` so reads take no
+    locks. If the index file is missing it is built from the seed corpus on
+    first use; if that fails too, the bank reports itself unavailable and
+    callers fall back to generating questions.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, mmap_size: Optional[int] = None):
+        """Initialize the bank from arguments or config defaults."""
+        self.db_path = db_path or config.QUESTION_BANK_PATH
+        self.mmap_size = mmap_size if mmap_size is not None else config.QUESTION_BANK_MMAP_SIZE
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._available: Optional[bool] = None
+        self._meta: Dict[str, str] = {}
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0}
+
+    @property
+    def available(self) -> bool:
+        """Whether the index exists (building it from the seed corpus if needed)."""
+        if self._available is None:
+            with self._lock:
+                if self._available is None:
+                    self._available = self._open()
+        return self._available
+
+    def _open(self) -> bool:
+        try:
+            if not os.path.exists(self.db_path):
+                logger.info(f"No question bank at {self.db_path}, building it from the seed corpus")
+                build_question_bank(db_path=self.db_path)
+            self._meta = dict(self._connect().execute("SELECT key, value FROM meta").fetchall())
+        except Exception as e:
+            logger.error(f"Question bank unavailable, questions will be generated: {str(e)}")
+            return False
+        logger.info(f"Question bank loaded: {self._meta.get('questions')} questions built {self._meta.get('built_at')}")
+        return True
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            uri = f"file:{os.path.abspath(self.db_path)}?mode=ro&immutable=1"
+            connection = sqlite3.connect(uri, uri=True)
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.connection = connection
+        return connection
+
+    def search(self,
+               position: InterviewPosition,
+               question_type: QuestionType,
+               difficulty: str,
+               text: Optional[str] = None,
+               exclude: Iterable[int] = (),
+               limit: int = 1) -> List[BankQuestion]:
+        """
+        Questions for one position, type and difficulty, most relevant first.
+
+        Args:
+            position: Interview position; ``general`` questions are included
+            question_type: Question type
+            difficulty: One of ``DIFFICULTIES``
+            text: Job description or other context to rank by; unranked if empty
+            exclude: Question IDs already asked
+            limit: Maximum number of questions
+
+        Returns:
+            Matching questions; ranked by BM25 when ``text`` matches anything, otherwise
+            position-specific questions come before general ones
+        """
+        params: List[Any] = [question_type.value, difficulty, position.value, GENERAL_POSITION, json.dumps(list(exclude))]
+        where = (
+            "q.question_type = ? AND q.difficulty = ? AND q.position IN (?, ?) "
+            "AND q.id NOT IN (SELECT value FROM json_each(?))"
+        )
+        columns = "q.id, q.position, q.question_type, q.difficulty, q.question"
+
+        rows = []
+        terms = _query_terms(text)
+        if terms:
+            rows = self._connect().execute(
+                f"SELECT {columns} FROM questions_fts JOIN questions q ON q.id = questions_fts.rowid "
+                f"WHERE questions_fts MATCH ? AND {where} ORDER BY bm25(questions_fts, 1.0, 2.0) LIMIT ?",
+                [" OR ".join(terms), *params, limit]
+            ).fetchall()
+        if not rows:
+            rows = self._connect().execute(
+                f"SELECT {columns} FROM questions q WHERE {where} ORDER BY q.position = ?, q.id LIMIT ?",
+                [*params, GENERAL_POSITION, limit]
+            ).fetchall()
+        return [BankQuestion(*row) for row in rows]
+
+    def pick(self,
+             position_name: Optional[str],
+             question_types: Sequence[str],
+             text: Optional[str] = None,
+             asked: Sequence[int] = ()) -> Optional[BankQuestion]:
+        """
+        The best unasked question for a position, relaxing the difficulty and then the question type if a cell is used up.
+
+        Args:
+            position_name: Free-text position name, resolved with ``resolve_position``
+            question_types: Acceptable ``QuestionType`` values, in order of preference
+            text: Job description or other context to rank by
+            asked: IDs of bank questions already asked in the session; their count sets the difficulty
+
+        Returns:
+            A question, or None if the position is unknown or the bank has nothing left for it
+        """
+        position = resolve_position(position_name)
+        if position is None or not self.available:
+            return None
+        preferred = DIFFICULTIES.index(difficulty_for(len(asked)))
+        difficulties = sorted(DIFFICULTIES, key=lambda d: (abs(DIFFICULTIES.index(d) - preferred), -DIFFICULTIES.index(d)))
+
+        self._stats["lookups"] += 1
+        for question_type in question_types:
+            for difficulty in difficulties:
+                questions = self.search(position, QuestionType(question_type), difficulty, text, asked)
+                if questions:
+                    self._stats["hits"] += 1
+                    return questions[0]
+        self._stats["misses"] += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters and index metadata."""
+        return {
+            **self._stats,
+            "available": self._available,
+            "questions": int(self._meta.get("questions", 0)),
+            "built_at": self._meta.get("built_at")
+        }
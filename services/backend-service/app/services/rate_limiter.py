@@ -0,0 +1,244 @@
+"""
+Token-bucket rate limiting per session, client IP and API key.
+
+Every request costs a number of tokens depending on its endpoint (a chat turn
+far more than a health check) and is charged to one bucket per scope it can
+be attributed to. Buckets refill at a steady rate up to a burst size, so a
+client gets short bursts but cannot sustain more than the rate. Buckets live
+in process memory, or in a SQLite file so that every worker sharing it
+enforces the same limits.
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import config
+
+SCOPES = ("session", "ip", "api_key")
+
+# A bucket key and its (rate, burst) limit
+Bucket = Tuple[str, float, float]
+
+
+class RateLimited(Exception):
+    """Raised when a request exceeds one of its rate limits."""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for this {scope.replace('_', ' ')}; retry in {retry_after:.0f}s")
+        self.scope = scope
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+    """Tokens in a bucket at ``now``, refilled since ``updated``."""
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """Token buckets in process memory, least recently used dropped beyond ``max_keys``."""
+
+    def __init__(self, max_keys: Optional[int] = None):
+        """Initialize an empty store from arguments or config defaults."""
+        self.max_keys = max_keys or config.RATE_LIMIT_MAX_KEYS
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, buckets: List[Bucket], cost: float) -> List[float]:
+        """
+        Charge ``cost`` to every bucket, or to none if any of them is short.
+
+        Args:
+            buckets: Bucket keys with their rate and burst
+            cost: Tokens to take from each bucket
+
+        Returns:
+            Seconds each bucket needs until it could pay; all zero if the request was charged
+        """
+        now = time.time()
+        with self._lock:
+            levels = [
+                _refill(*self._buckets.get(key, (burst, now)), now, rate, burst)
+                for key, rate, burst in buckets
+            ]
+            waits = [max(0.0, (cost - level) / rate) for level, (_, rate, _) in zip(levels, buckets)]
+            if any(waits):
+                return waits
+            for level, (key, _, _) in zip(levels, buckets):
+                self._buckets[key] = (level - cost, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return waits
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a SQLite file shared by every worker that opens it.
+
+    Each charge is one ``BEGIN IMMEDIATE`` transaction, so concurrent workers
+    never both spend the same tokens. Buckets idle long enough to have
+    refilled are deleted now and then.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS buckets (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    # Charges between sweeps of idle buckets, and how long a bucket must be idle to be swept
+    SWEEP_EVERY = 1000
+    IDLE_SECONDS = 3600
+
+    def __init__(self, db_path: Optional[str] = None):
+        """Open (and if needed create) the bucket database from arguments or config defaults."""
+        self.db_path = db_path or config.RATE_LIMIT_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._local = threading.local()
+        self._charges = 0
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def take(self, buckets: List[Bucket], cost: float) -> List[float]:
+        """Charge ``cost`` to every bucket, or to none if any of them is short; see ``MemoryBucketStore.take``."""
+        connection = self._connect()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            levels = []
+            for key, rate, burst in buckets:
+                row = connection.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                levels.append(_refill(*(row or (burst, now)), now, rate, burst))
+            waits = [max(0.0, (cost - level) / rate) for level, (_, rate, _) in zip(levels, buckets)]
+            if not any(waits):
+                connection.executemany(
+                    "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    [(key, level - cost, now) for level, (key, _, _) in zip(levels, buckets)]
+                )
+                self._charges += 1
+                if self._charges % self.SWEEP_EVERY == 0:
+                    connection.execute("DELETE FROM buckets WHERE updated < ?", (now - self.IDLE_SECONDS,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return waits
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+
+def create_bucket_store(kind: Optional[str] = None):
+    """Create the ``memory`` or ``sqlite`` bucket store named by ``RATE_LIMIT_STORE``."""
+    kind = (kind or config.RATE_LIMIT_STORE).lower()
+    if kind == "memory":
+        return MemoryBucketStore()
+    if kind == "sqlite":
+        return SQLiteBucketStore()
+    raise ValueError(f"Unknown rate limit store: {kind}")
+
+
+class RateLimiter:
+    """
+    Weighted token-bucket limits per session, client IP and API key.
+
+    A request is charged its endpoint's cost (``costs``, keyed by path, with
+    ``default`` for the rest; 0 exempts a path) in every scope it carries an
+    identity for, each scope with its own rate (tokens per second) and burst.
+    It is admitted only if every bucket can pay, and then all are charged.
+    """
+
+    def __init__(self,
+                 rates: Optional[Dict[str, float]] = None,
+                 bursts: Optional[Dict[str, float]] = None,
+                 costs: Optional[Dict[str, float]] = None,
+                 store: Any = None):
+        """Initialize the limiter from arguments or config defaults; the store is created on first use."""
+        self.rates = {**config.RATE_LIMIT_RATES, **(rates or {})}
+        self.bursts = {**config.RATE_LIMIT_BURSTS, **(bursts or {})}
+        self.costs = {**config.RATE_LIMIT_COSTS, **(costs or {})}
+        unknown = (set(self.rates) | set(self.bursts)) - set(SCOPES)
+        if unknown:
+            raise ValueError(f"Unknown rate limit scopes: {sorted(unknown)}")
+        self._store = store
+        self._lock = threading.Lock()
+        self._stats = {"allowed": 0, "limited": {scope: 0 for scope in SCOPES}}
+
+    @property
+    def store(self):
+        """The bucket store, created on first use (after any fork)."""
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    self._store = create_bucket_store()
+        return self._store
+
+    def cost(self, path: str) -> float:
+        """Tokens a request to ``path`` costs."""
+        return self.costs.get(path, self.costs.get("default", 1))
+
+    def check(self, path: str, identities: Dict[str, Optional[str]]):
+        """
+        Admit a request or raise.
+
+        Args:
+            path: Request path, for its cost
+            identities: Caller identity per scope (``session``, ``ip``, ``api_key``); missing ones are skipped
+
+        Raises:
+            RateLimited: With the scope that ran out and when enough tokens will be back
+        """
+        cost = self.cost(path)
+        buckets = [
+            (scope, f"{scope}:{identity}", self.rates[scope], self.bursts[scope])
+            for scope, identity in identities.items()
+            if identity and self.rates.get(scope, 0) > 0 and self.bursts.get(scope, 0) > 0
+        ]
+        if cost <= 0 or not buckets:
+            return
+        # A cost above a bucket's burst could never be paid; it takes the full bucket instead
+        cost = min([cost] + [burst for _, _, _, burst in buckets])
+        waits = self.store.take([(key, rate, burst) for _, key, rate, burst in buckets], cost)
+
+        with self._lock:
+            if not any(waits):
+                self._stats["allowed"] += 1
+                return
+            wait, scope = max(zip(waits, (scope for scope, _, _, _ in buckets)))
+            self._stats["limited"][scope] += 1
+        raise RateLimited(scope, wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Admitted and limited requests, per limiting scope."""
+        with self._lock:
+            return {
+                "allowed": self._stats["allowed"],
+                "limited": dict(self._stats["limited"]),
+                "store": config.RATE_LIMIT_STORE
+            }
+
+
+def api_key_identity(api_key: Optional[str]) -> Optional[str]:
+    """Bucket identity for an API key: a digest, so keys are never stored."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16] if api_key else None
@@ -0,0 +1,203 @@
+"""
+Two-tier cache for deterministic agent responses.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from loguru import logger
+
+from .single_flight import normalize_query
+from ..config import config
+
+
+def prompt_hash(system_prompt: str) -> str:
+    """Short stable hash identifying a system prompt version."""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class ResponseCache:
+    """
+    Caches responses of agents whose output depends only on their input.
+
+    Entries are keyed on (agent type, system prompt hash, normalized input,
+    model ID), so changing a prompt or ``OLLAMA_MODEL`` never serves an old
+    response. Lookups go to an in-process LRU first and then to a SQLite
+    store shared by every worker and kept across restarts; disk hits are
+    promoted into memory. Entries expire after ``ttl_seconds``.
+
+    The first lookup for an agent type under a new prompt or model also
+    deletes that agent type's outdated entries from disk, and ``invalidate``
+    drops entries explicitly. Invalidation bumps a generation counter in the
+    database, and every process clears its memory tier on its next lookup
+    once it sees the new generation.
+    """
+
+    def __init__(self,
+                 db_path: Optional[str] = None,
+                 max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        """Initialize the cache from arguments or config defaults."""
+        self.db_path = db_path or config.RESPONSE_CACHE_PATH
+        self.max_entries = max_entries if max_entries is not None else config.RESPONSE_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.RESPONSE_CACHE_TTL
+
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._checked: Set[Tuple[str, str, str]] = set()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "invalidated": 0}
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._connect().executescript(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, agent_type TEXT NOT NULL, prompt_hash TEXT NOT NULL, "
+            "model_id TEXT NOT NULL, response TEXT NOT NULL, created_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS generation (id INTEGER PRIMARY KEY CHECK (id = 0), value INTEGER NOT NULL);"
+            "INSERT OR IGNORE INTO generation (id, value) VALUES (0, 0);"
+        )
+        self._generation = self._current_generation()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def make_key(agent_type: str, system_prompt: str, text: str, model_id: str) -> str:
+        """Cache key for one agent input."""
+        payload = json.dumps([agent_type, prompt_hash(system_prompt), normalize_query(text), model_id])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, agent_type: str, system_prompt: str, text: str, model_id: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            agent_type: Agent type the response belongs to
+            system_prompt: The agent's system prompt
+            text: The agent's input
+            model_id: Model that generated the response
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        self._drop_outdated(agent_type, prompt_hash(system_prompt), model_id)
+        key = self.make_key(agent_type, system_prompt, text, model_id)
+        now = time.time()
+        generation = self._current_generation()
+
+        with self._lock:
+            if generation != self._generation:
+                # Another process invalidated the cache
+                self._memory.clear()
+                self._generation = generation
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+        row = self._connect().execute(
+            "SELECT response, created_at FROM responses WHERE key = ? AND created_at > ?",
+            (key, now - self.ttl_seconds)
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, row[1], row[0])
+        return row[0]
+
+    def put(self, agent_type: str, system_prompt: str, text: str, model_id: str, response: str):
+        """Store a response in both tiers."""
+        key = self.make_key(agent_type, system_prompt, text, model_id)
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO responses (key, agent_type, prompt_hash, model_id, response, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, agent_type, prompt_hash(system_prompt), model_id, response, now)
+        )
+        with self._lock:
+            self._stats["stores"] += 1
+            self._remember(key, now, response)
+
+    def invalidate(self, agent_type: Optional[str] = None) -> int:
+        """
+        Drop cached responses.
+
+        Args:
+            agent_type: Only drop this agent type's responses; drops everything when omitted
+
+        Returns:
+            Number of entries removed from disk
+        """
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if agent_type is None:
+                removed = connection.execute("DELETE FROM responses").rowcount
+            else:
+                removed = connection.execute("DELETE FROM responses WHERE agent_type = ?", (agent_type,)).rowcount
+            generation = connection.execute("UPDATE generation SET value = value + 1 RETURNING value").fetchone()[0]
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        with self._lock:
+            # Memory keys are hashes, so a partial invalidation clears the whole tier
+            self._memory.clear()
+            self._generation = generation
+            self._stats["invalidated"] += removed
+        logger.info(f"Invalidated {removed} cached responses{f' for {agent_type}' if agent_type else ''}")
+        return removed
+
+    def _current_generation(self) -> int:
+        """The cache generation, bumped by every invalidation in any process."""
+        return self._connect().execute("SELECT value FROM generation WHERE id = 0").fetchone()[0]
+
+    def _drop_outdated(self, agent_type: str, current_prompt: str, model_id: str):
+        """Delete an agent type's entries made with another prompt or model, once per process and version."""
+        version = (agent_type, current_prompt, model_id)
+        if version in self._checked:
+            return
+        removed = self._connect().execute(
+            "DELETE FROM responses WHERE agent_type = ? AND (prompt_hash != ? OR model_id != ? OR created_at <= ?)",
+            (agent_type, current_prompt, model_id, time.time() - self.ttl_seconds)
+        ).rowcount
+        with self._lock:
+            self._checked.add(version)
+            self._stats["invalidated"] += removed
+        if removed:
+            logger.info(f"Dropped {removed} outdated cached {agent_type} responses (prompt or model changed, or expired)")
+
+    def _remember(self, key: str, created_at: float, response: str):
+        """Put an entry in the memory tier; caller holds the lock."""
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and store counters with the overall hit ratio."""
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory)
+            }
@@ -0,0 +1,215 @@
+"""
+Priority scheduling of model calls by work class.
+
+Chat turns, background answer evaluations, conversation summaries and batch
+evaluations all share the same Ollama capacity. Each model call runs under a
+work class, carried in a context variable like the request deadline, and
+``ModelScheduler`` admits calls from per-class queues: weighted so every
+class makes progress, with per-class concurrency limits, and with a few
+slots reserved for interactive work so background jobs only use leftover
+capacity.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+
+from loguru import logger
+
+from .deadline import DeadlineExceeded, remaining
+from ..config import config
+
+INTERACTIVE = "interactive"
+WORK_CLASSES = (INTERACTIVE, "evaluation", "summarization", "batch")
+
+# Recent admissions per class kept for wait-time percentiles
+WAIT_SAMPLES = 1024
+
+_work_class: ContextVar[str] = ContextVar("work_class", default=INTERACTIVE)
+
+
+@contextmanager
+def work_class(name: str) -> Iterator[None]:
+    """Run the enclosed model calls under work class ``name`` (one of ``WORK_CLASSES``)."""
+    if name not in WORK_CLASSES:
+        raise ValueError(f"Unknown work class: {name}")
+    token = _work_class.set(name)
+    try:
+        yield
+    finally:
+        _work_class.reset(token)
+
+
+def current_work_class() -> str:
+    """Work class of the running code; ``interactive`` unless set otherwise."""
+    return _work_class.get()
+
+
+class _Waiter:
+    """A queued call, woken on its own event loop when admitted."""
+
+    __slots__ = ("loop", "future", "queued_at", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.queued_at = time.perf_counter()
+        self.granted = False
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ModelScheduler:
+    """
+    Weighted admission of model calls from per-class queues.
+
+    At most ``capacity`` calls run at once, and each class at most its limit.
+    When a slot frees up, the next call is picked by smooth weighted
+    round-robin among classes that have waiters and are under their limit, so
+    with the default weights interactive turns get most slots without starving
+    the rest. The last ``reserved`` slots only go to interactive calls.
+
+    Callers run on many event loops (every agent call has its own), so
+    waiters are woken with ``call_soon_threadsafe`` on their own loop. A call
+    that runs out of request deadline while queued fails with
+    ``DeadlineExceeded``.
+    """
+
+    def __init__(self,
+                 capacity: Optional[int] = None,
+                 reserved: Optional[int] = None,
+                 weights: Optional[Dict[str, int]] = None,
+                 limits: Optional[Dict[str, int]] = None):
+        """Initialize the scheduler from arguments or config defaults."""
+        self.capacity = capacity or config.MODEL_SCHEDULER_CAPACITY
+        self.reserved = min(reserved if reserved is not None else config.MODEL_SCHEDULER_RESERVED, self.capacity - 1)
+        weights = {**config.MODEL_SCHEDULER_WEIGHTS, **(weights or {})}
+        limits = {**config.MODEL_SCHEDULER_LIMITS, **(limits or {})}
+        unknown = (set(weights) | set(limits)) - set(WORK_CLASSES)
+        if unknown:
+            logger.warning(f"Ignoring scheduler settings for unknown work classes {sorted(unknown)}")
+        self.weights = {name: max(1, weights.get(name, 1)) for name in WORK_CLASSES}
+        self.limits = {name: min(limits.get(name, self.capacity), self.capacity) for name in WORK_CLASSES}
+
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_Waiter]] = {name: deque() for name in WORK_CLASSES}
+        self._running = {name: 0 for name in WORK_CLASSES}
+        self._credit = {name: 0 for name in WORK_CLASSES}
+        self._waits: Dict[str, Deque[float]] = {name: deque(maxlen=WAIT_SAMPLES) for name in WORK_CLASSES}
+        self._counts = {name: {"admitted": 0, "expired": 0} for name in WORK_CLASSES}
+
+    @asynccontextmanager
+    async def slot(self, name: Optional[str] = None) -> AsyncIterator[None]:
+        """
+        Hold a model call slot for the enclosed block.
+
+        Args:
+            name: Work class; defaults to ``current_work_class()``
+
+        Raises:
+            DeadlineExceeded: If the request's deadline passes while queued
+        """
+        name = name or current_work_class()
+        await self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    async def acquire(self, name: str):
+        """Wait for a slot for work class ``name``; pair with ``release``."""
+        waiter = _Waiter(asyncio.get_running_loop())
+        with self._lock:
+            self._queues[name].append(waiter)
+            self._dispatch()
+            if waiter.granted:
+                return
+
+        left = remaining()
+        try:
+            if left is None:
+                await waiter.future
+            else:
+                await asyncio.wait_for(waiter.future, max(left, 0))
+        except BaseException as e:
+            with self._lock:
+                if waiter.granted:
+                    # Admitted just as we gave up: hand the slot on
+                    self._running[name] -= 1
+                    self._dispatch()
+                else:
+                    self._queues[name].remove(waiter)
+                if isinstance(e, asyncio.TimeoutError):
+                    self._counts[name]["expired"] += 1
+            if isinstance(e, asyncio.TimeoutError):
+                raise DeadlineExceeded(f"waiting for a model slot ({name})") from None
+            raise
+
+    def release(self, name: str):
+        """Give back a slot taken with ``acquire``."""
+        with self._lock:
+            self._running[name] -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        """Admit waiters while capacity allows; caller holds the lock."""
+        while True:
+            running = sum(self._running.values())
+            if running >= self.capacity:
+                return
+            background_open = running < self.capacity - self.reserved
+            eligible = [
+                name for name in WORK_CLASSES
+                if self._queues[name]
+                and self._running[name] < self.limits[name]
+                and (name == INTERACTIVE or background_open)
+            ]
+            if not eligible:
+                return
+
+            total = sum(self.weights[name] for name in eligible)
+            for name in eligible:
+                self._credit[name] += self.weights[name]
+            chosen = max(eligible, key=lambda name: self._credit[name])
+            self._credit[chosen] -= total
+
+            waiter = self._queues[chosen].popleft()
+            waiter.granted = True
+            self._running[chosen] += 1
+            self._counts[chosen]["admitted"] += 1
+            self._waits[chosen].append((time.perf_counter() - waiter.queued_at) * 1000)
+            try:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+            except RuntimeError:
+                # The waiter's loop is already closed; nobody will use the slot
+                self._running[chosen] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-class queue depth, running calls and wait times (ms) over recent admissions."""
+        with self._lock:
+            classes = {}
+            for name in WORK_CLASSES:
+                waits = sorted(self._waits[name])
+                classes[name] = {
+                    "queued": len(self._queues[name]),
+                    "running": self._running[name],
+                    "limit": self.limits[name],
+                    "weight": self.weights[name],
+                    **self._counts[name],
+                    "wait_ms_p50": round(waits[len(waits) // 2], 2) if waits else 0.0,
+                    "wait_ms_p99": round(waits[min(len(waits) - 1, int(len(waits) * 0.99))], 2) if waits else 0.0,
+                    "wait_ms_max": round(waits[-1], 2) if waits else 0.0
+                }
+            return {
+                "capacity": self.capacity,
+                "reserved_interactive": self.reserved,
+                "running": sum(self._running.values()),
+                "classes": classes
+            }
@@ -0,0 +1,151 @@
+"""
+Per-session turn serialization for agent calls.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+from ..config import config
+
+TURN_POLICIES = ("queue", "reject", "coalesce")
+
+
+class SessionBusy(Exception):
+    """Raised when a session cannot take another turn under the configured policy."""
+
+    def __init__(self, session_id: str, queued: int, retry_after: int):
+        super().__init__(f"Session {session_id} already has a turn in progress ({queued} queued)")
+        self.session_id = session_id
+        self.queued = queued
+        self.retry_after = retry_after
+
+
+@dataclass
+class _SessionSlot:
+    """Lock-table entry for one session."""
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # Turns holding or waiting for the lock; the entry is dropped when this reaches zero
+    users: int = 0
+    # Query text -> result future of the running or queued turn, used for coalescing
+    pending: Dict[str, asyncio.Future] = field(default_factory=dict)
+
+
+class SessionLockManager:
+    """
+    Serializes turns within a session while different sessions run in parallel.
+
+    Each session gets its own ``asyncio.Lock``, so turns for one session run one
+    at a time in arrival order and never touch the same session files
+    concurrently. Entries exist only while a turn holds or waits for them, so
+    the lock table stays as small as the number of active sessions.
+
+    When a turn arrives for a busy session, ``policy`` decides what happens:
+    ``queue`` waits behind the running turn, ``reject`` raises ``SessionBusy``
+    and ``coalesce`` hands an identical query (a double-submit) the result of
+    the turn already pending for it, queueing anything else. At most
+    ``max_queued`` turns may wait per session before further ones are rejected.
+    """
+
+    def __init__(self, policy: Optional[str] = None, max_queued: Optional[int] = None):
+        """Initialize the manager from arguments or config defaults."""
+        self.policy = (policy or config.SESSION_TURN_POLICY).lower()
+        if self.policy not in TURN_POLICIES:
+            raise ValueError(f"Unknown session turn policy: {self.policy}")
+        self.max_queued = max_queued if max_queued is not None else config.SESSION_MAX_QUEUED_TURNS
+
+        self._slots: Dict[str, _SessionSlot] = {}
+        self._stats = {"turns": 0, "queued": 0, "rejected": 0, "coalesced": 0}
+
+    def check(self, session_id: str, query: Optional[str]):
+        """
+        Raise early if a turn would be rejected, without reserving anything.
+
+        Lets streaming endpoints answer 409 before any response bytes are sent.
+
+        Raises:
+            SessionBusy: If the session cannot take this turn
+        """
+        slot = self._slots.get(session_id)
+        if slot is not None and not self._can_coalesce(slot, query):
+            self._check_capacity(session_id, slot)
+
+    def will_coalesce(self, session_id: str, query: Optional[str]) -> bool:
+        """Whether a turn for this query would share an already pending turn's result."""
+        slot = self._slots.get(session_id)
+        return slot is not None and self._can_coalesce(slot, query)
+
+    async def run(self, session_id: str, query: Optional[str], fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run one turn for a session once the session is free.
+
+        Args:
+            session_id: Session the turn belongs to
+            query: User query, used to detect duplicate submissions; None for work that never coalesces
+            fn: Zero-argument coroutine function that runs the turn
+
+        Returns:
+            The turn's result, or the pending identical turn's result when coalesced
+
+        Raises:
+            SessionBusy: If the session cannot take this turn
+        """
+        slot = self._slots.get(session_id)
+        if slot is not None and self._can_coalesce(slot, query):
+            self._stats["coalesced"] += 1
+            logger.info(f"Coalescing duplicate turn for session {session_id}")
+            # Shield so a disconnecting duplicate does not cancel the original turn
+            return await asyncio.shield(slot.pending[query])
+
+        if slot is None:
+            slot = self._slots[session_id] = _SessionSlot()
+        else:
+            self._check_capacity(session_id, slot)
+            self._stats["queued"] += 1
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the future's exception as retrieved even if no duplicate ever awaits it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        if self.policy == "coalesce" and query is not None:
+            slot.pending.setdefault(query, future)
+        slot.users += 1
+        try:
+            async with slot.lock:
+                self._stats["turns"] += 1
+                try:
+                    result = await fn()
+                except BaseException as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    raise
+                future.set_result(result)
+                return result
+        finally:
+            if slot.pending.get(query) is future:
+                del slot.pending[query]
+            slot.users -= 1
+            if slot.users == 0:
+                self._slots.pop(session_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Lock-table size and turn counters."""
+        return {
+            **self._stats,
+            "policy": self.policy,
+            "active_sessions": len(self._slots),
+            "waiting": sum(max(0, slot.users - 1) for slot in self._slots.values())
+        }
+
+    def _can_coalesce(self, slot: _SessionSlot, query: Optional[str]) -> bool:
+        return self.policy == "coalesce" and query is not None and query in slot.pending
+
+    def _check_capacity(self, session_id: str, slot: _SessionSlot):
+        """Raise if the session is busy and may not queue another turn."""
+        waiting = slot.users - 1
+        if self.policy == "reject" or waiting >= self.max_queued:
+            self._stats["rejected"] += 1
+            logger.warning(f"Rejecting turn for session {session_id}: turn in progress ({waiting} queued)")
+            raise SessionBusy(session_id, waiting, retry_after=max(1, waiting + 1))
@@ -0,0 +1,100 @@
+"""
+Session change counters shared across worker processes.
+
+When several workers (or containers on one volume) serve the same sessions,
+each keeps live agents in memory. Workers bump a session's version in a shared
+SQLite file after writing to it, and check the version before reusing a
+cached agent, so an agent that another worker has since moved on is reloaded
+from storage instead of answering from a stale history.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from ..config import config
+
+# Sessions whose last write by this process is remembered
+WRITTEN_SIZE = 4096
+
+
+class SessionVersions:
+    """
+    Per-session version counters in a SQLite database in WAL mode.
+
+    Each thread gets its own connection, opened on first use (never before the
+    workers fork). Versions this process wrote itself are remembered, so its
+    own writes do not invalidate its own cache.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS session_versions (
+            session_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """Open (and if needed create) the version database from arguments or config defaults."""
+        self.db_path = db_path or config.SESSION_VERSION_DB
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._local = threading.local()
+        self._written: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"bumps": 0, "checks": 0}
+        self._connect().executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._local.connection = connection
+        return connection
+
+    def current(self, session_id: str) -> int:
+        """A session's shared version; 0 if it was never written."""
+        with self._lock:
+            self._stats["checks"] += 1
+        row = self._connect().execute(
+            "SELECT version FROM session_versions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, session_id: str) -> int:
+        """
+        Record a write to a session.
+
+        Args:
+            session_id: Session that was written
+
+        Returns:
+            The session's new version
+        """
+        version = self._connect().execute(
+            "INSERT INTO session_versions (session_id, version) VALUES (?, 1) "
+            "ON CONFLICT (session_id) DO UPDATE SET version = version + 1 RETURNING version",
+            (session_id,)
+        ).fetchone()[0]
+        with self._lock:
+            self._stats["bumps"] += 1
+            self._written[session_id] = version
+            self._written.move_to_end(session_id)
+            while len(self._written) > WRITTEN_SIZE:
+                self._written.popitem(last=False)
+        return version
+
+    def written_here(self, session_id: str, version: int) -> bool:
+        """Whether ``version`` of a session was written by this process."""
+        with self._lock:
+            return self._written.get(session_id) == version
+
+    def stats(self) -> Dict[str, Any]:
+        """Version bumps and checks made by this process."""
+        with self._lock:
+            return {**self._stats, "db_path": self.db_path}
@@ -0,0 +1,124 @@
+"""
+Single-flight deduplication of identical chat requests.
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from ..config import config
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for duplicate detection: case-folded, whitespace collapsed."""
+    return _WHITESPACE.sub(" ", query).strip().casefold()
+
+
+class SingleFlight:
+    """
+    Runs each distinct request once and shares its result with duplicates.
+
+    A duplicate that arrives while the original is still running awaits the
+    same task. A duplicate that arrives within ``ttl_seconds`` after it
+    finished gets the stored result without running anything. Only results
+    accepted by ``cache_if`` are kept after completion; failures are shared
+    with in-flight duplicates but never replayed.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        """Initialize from arguments or config defaults."""
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.CHAT_DEDUPE_TTL
+        self.max_entries = max_entries if max_entries is not None else config.CHAT_DEDUPE_MAX_ENTRIES
+
+        self._in_flight: Dict[Tuple, asyncio.Task] = {}
+        self._results: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._stats = {"executed": 0, "in_flight_hits": 0, "cache_hits": 0}
+
+    @staticmethod
+    def make_key(session_id: Optional[str], query: str, idempotency_key: Optional[str] = None) -> Optional[Tuple]:
+        """
+        Build the deduplication key for a chat request.
+
+        Args:
+            session_id: Client-supplied session ID
+            query: User query
+            idempotency_key: Optional ``Idempotency-Key`` header value
+
+        Returns:
+            Key tuple, or None when the request cannot be a duplicate (no session and no idempotency key)
+        """
+        if not session_id and not idempotency_key:
+            return None
+        return (session_id or "", normalize_query(query), idempotency_key or "")
+
+    async def do(self,
+                 key: Optional[Tuple],
+                 fn: Callable[[], Awaitable[Any]],
+                 cache_if: Callable[[Any], bool] = lambda result: True) -> Tuple[Any, Optional[str]]:
+        """
+        Run ``fn`` unless an identical request is running or recently finished.
+
+        Args:
+            key: Key from ``make_key``; None always runs ``fn``
+            fn: Zero-argument coroutine function producing the result
+            cache_if: Whether a finished result may be replayed to later duplicates
+
+        Returns:
+            Tuple of (result, source) where source is None when ``fn`` ran for
+            this caller, ``"in_flight"`` or ``"cached"`` for a duplicate
+        """
+        if key is None:
+            return await fn(), None
+
+        cached = self._get_cached(key)
+        if cached is not None:
+            self._stats["cache_hits"] += 1
+            logger.info(f"Serving duplicate request from cache (session {key[0] or '-'})")
+            return cached, "cached"
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._stats["in_flight_hits"] += 1
+            logger.info(f"Joining in-flight duplicate request (session {key[0] or '-'})")
+            # Shield so a caller going away does not cancel the shared task
+            return await asyncio.shield(task), "in_flight"
+
+        task = asyncio.ensure_future(fn())
+        self._in_flight[key] = task
+        self._stats["executed"] += 1
+        task.add_done_callback(lambda done: self._complete(key, done, cache_if))
+        return await asyncio.shield(task), None
+
+    def stats(self) -> Dict[str, int]:
+        """Deduplication counters."""
+        return {**self._stats, "in_flight": len(self._in_flight), "cached": len(self._results)}
+
+    def _complete(self, key: Tuple, task: asyncio.Task, cache_if: Callable[[Any], bool]):
+        """Move a finished task's result into the replay cache."""
+        self._in_flight.pop(key, None)
+        if self.ttl_seconds <= 0 or task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        if not cache_if(result):
+            return
+        self._results[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def _get_cached(self, key: Tuple) -> Optional[Any]:
+        """Return a still-fresh stored result, dropping expired ones on the way."""
+        now = time.monotonic()
+        while self._results:
+            oldest_key, (expires_at, _) = next(iter(self._results.items()))
+            if expires_at > now:
+                break
+            del self._results[oldest_key]
+        entry = self._results.get(key)
+        return entry[1] if entry else None
@@ -0,0 +1,44 @@
+"""
+Gunicorn settings for running the backend with several worker processes.
+
+Usage (from the service directory, or /app in the image):
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master process, along with the modules it
+loads lazily, and workers fork from it and share that memory. Nothing else is
+built before the fork: each worker opens its own model connections, session
+store and caches on startup. With more than one worker, sessions are shared
+through storage (``SESSION_SHARED``); see the README's deployment section.
+"""
+
+import os
+
+# Workers open their own log files after the fork (see post_fork); set before the app is imported
+os.environ.setdefault("LOG_FILE_PER_WORKER", "true")
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8002')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app in the master so workers fork after the heavy imports
+preload_app = True
+
+# Turns are bounded by REQUEST_TIMEOUT; leave room for the 504 to be written
+timeout = int(float(os.getenv("REQUEST_TIMEOUT", "90"))) + 30
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    """Import the lazily loaded modules too, before the first worker forks."""
+    from app.agents import runtime
+
+    runtime.preload()
+    server.log.info(f"Preloaded the backend, starting {workers} workers")
+
+
+def post_fork(server, worker):
+    """Give each worker its own log file, rotated by that worker alone."""
+    from app.main import configure_logging
+
+    configure_logging()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Measure backend cold-start time.
+
+Each run starts a fresh interpreter and records:
+- import: time to import ``app.main``
+- warm_up: time for the FastAPI lifespan startup (model, session store, agent factory)
+- first_request: time to answer the first HTTP request (``GET /health``
+  through the full middleware stack) once started
+
+Usage:
+    python scripts/benchmark_startup.py [--runs 5] [--max-seconds 3.0] [--importtime]
+
+With ``--max-seconds`` the script exits non-zero when the median total exceeds
+the budget, so it can gate CI and keep restarts and scale-out fast.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The backend imports the ``shared`` package from the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(BACKEND_DIR))
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+import app.main as main
+from fastapi.testclient import TestClient
+imported = time.perf_counter()
+
+# Entering the client runs the lifespan startup
+with TestClient(main.app) as client:
+    warmed = time.perf_counter()
+    client.get("/health").raise_for_status()
+    answered = time.perf_counter()
+
+print(json.dumps({
+    "import": imported - started,
+    "warm_up": warmed - imported,
+    "first_request": answered - warmed,
+    "total": answered - started,
+}))
+"""
+
+
+def run_once(importtime: bool) -> dict:
+    """Start a fresh interpreter and return its timings."""
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD]
+    python_path = [BACKEND_DIR, REPO_ROOT] + [p for p in os.environ.get("PYTHONPATH", "").split(os.pathsep) if p]
+    env = {**os.environ, "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"), "PYTHONPATH": os.pathsep.join(python_path)}
+    completed = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    if importtime:
+        timings["imports"] = _slowest_imports(completed.stderr)
+    return timings
+
+
+def _slowest_imports(importtime_output: str, top: int = 10) -> list:
+    """Parse ``-X importtime`` output into the modules with the highest cumulative import time."""
+    rows = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Benchmark backend cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh-process runs")
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="Fail if the median total startup time exceeds this budget")
+    parser.add_argument("--importtime", action="store_true",
+                        help="Also report the slowest imports of the first run")
+    args = parser.parse_args()
+
+    results = [run_once(args.importtime and i == 0) for i in range(args.runs)]
+
+    for phase in ("import", "warm_up", "first_request", "total"):
+        values = sorted(result[phase] for result in results)
+        print(f"{phase:>13}: median {statistics.median(values) * 1000:8.1f} ms   max {values[-1] * 1000:8.1f} ms")
+
+    if args.importtime:
+        print("\nSlowest modules to import (cumulative, first run):")
+        for microseconds, name in results[0]["imports"]:
+            print(f"  {microseconds / 1000:8.1f} ms  {name}")
+
+    median_total = statistics.median(result["total"] for result in results)
+    if args.max_seconds is not None and median_total > args.max_seconds:
+        print(f"\nStartup budget exceeded: {median_total:.2f}s > {args.max_seconds:.2f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
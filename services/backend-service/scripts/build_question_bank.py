@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Build the local question bank index from its seed corpus.
+
+Usage:
+    python scripts/build_question_bank.py [--seed app/data/question_bank.json] [--db ./data/question_bank.db]
+
+Run again after editing the corpus; running backends pick up the new index on restart.
+"""
+
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Make the backend's ``app`` package and the repository's ``shared`` package importable
+# when run from any directory (in the image both live under /app)
+sys.path.insert(0, os.path.dirname(os.path.dirname(BACKEND_DIR)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.config import config
+from app.services.question_bank import build_question_bank
+
+
+def main():
+    """Build the index."""
+    parser = argparse.ArgumentParser(description="Build the question bank index")
+    parser.add_argument("--seed", default=config.QUESTION_BANK_SEED,
+                        help="Question corpus JSON")
+    parser.add_argument("--db", default=config.QUESTION_BANK_PATH,
+                        help="Index file to write")
+    args = parser.parse_args()
+
+    try:
+        count = build_question_bank(args.seed, args.db)
+    except (OSError, ValueError) as e:
+        print(f"Could not build the question bank: {e}")
+        return 1
+    print(f"Indexed {count} questions into {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Import file-based agent sessions into the SQLite session store.
+
+Usage:
+    python scripts/migrate_sessions.py [--storage-dir ./data/sessions] [--db ./data/sessions.db]
+
+Then set SESSION_BACKEND=sqlite (and SESSION_DB_PATH if not using the default).
+"""
+
+import argparse
+import os
+import sys
+
+# Make the backend's ``app`` package importable when run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.agents.session_store import SQLiteSessionRepository, migrate_file_sessions
+from app.config import config
+
+
+def main():
+    """Run the migration."""
+    parser = argparse.ArgumentParser(description="Migrate file sessions to SQLite")
+    parser.add_argument("--storage-dir", default=config.get_session_storage_dir(),
+                        help="Root directory of the file sessions")
+    parser.add_argument("--db", default=config.SESSION_DB_PATH,
+                        help="Destination SQLite database")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.storage_dir):
+        print(f"No session directory at {args.storage_dir}")
+        return 1
+
+    counts = migrate_file_sessions(args.storage_dir, SQLiteSessionRepository(args.db))
+    print(
+        f"Imported {counts['sessions']} sessions, {counts['agents']} agents and "
+        f"{counts['messages']} messages into {args.db} ({counts['skipped']} skipped)"
+    )
+    return 0 if counts["skipped"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
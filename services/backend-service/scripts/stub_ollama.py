@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Minimal stand-in for Ollama servers, for trying the backend without a GPU.
+
+Usage:
+    python scripts/stub_ollama.py [--port 11501 --port 11502 ...] [--delay 0.01]
+
+Each port serves ``/api/version``, ``/api/tags`` and ``/api/chat``. Chat replies
+echo the model and the end of the prompt, prefixed with the port that served
+them, so it is easy to see how requests are spread across hosts, e.g.:
+
+    OLLAMA_HOSTS=http://localhost:11501,http://localhost:11502 uvicorn app.main:app
+
+Stop a port's process (or start it later) to watch the backend eject and
+re-admit it.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STRUCTURED_REPLY = {
+    "question": "Tell me about a time you had to meet a tight deadline.",
+    "question_type": "behavioral",
+    "evaluation_criteria": ["clarity", "impact"],
+    "score": 7,
+    "strengths": ["clear structure"],
+    "improvements": ["quantify the result"],
+    "summary": "Solid answer."
+}
+
+
+def make_handler(name: str, delay: float):
+    """Request handler for one stub server."""
+
+    class StubOllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/api/version":
+                self._send_json({"version": "stub"})
+            else:
+                self._send_json({"models": []})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            messages = request.get("messages", [])
+            prompt = str(messages[-1]["content"]) if messages else ""
+            done = {
+                "model": request["model"],
+                "created_at": "2024-01-01T00:00:00Z",
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": 1000,
+                "prompt_eval_count": len(prompt.split()),
+            }
+
+            if request.get("format"):
+                time.sleep(delay)
+                self._send_json({**done, "message": {"role": "assistant", "content": json.dumps(STRUCTURED_REPLY)}, "eval_count": 1})
+                return
+
+            words = f"[{name}] {request['model']} reply to: {prompt[-40:]}".split()
+            if request.get("stream", True) is False:
+                time.sleep(delay * len(words))
+                self._send_json({**done, "message": {"role": "assistant", "content": " ".join(words)}, "eval_count": len(words)})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            chunks = [
+                {**done, "done": False, "message": {"role": "assistant", "content": f"{word} "}} for word in words
+            ] + [{**done, "message": {"role": "assistant", "content": ""}, "eval_count": len(words)}]
+            for chunk in chunks:
+                data = (json.dumps(chunk) + "\n").encode()
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+                time.sleep(delay)
+            self.wfile.write(b"0\r\n\r\n")
+
+    return StubOllamaHandler
+
+
+def main():
+    """Serve every requested port until interrupted."""
+    parser = argparse.ArgumentParser(description="Run stub Ollama servers")
+    parser.add_argument("--port", type=int, action="append",
+                        help="Port to serve on; repeat for several hosts (default: 11434)")
+    parser.add_argument("--delay", type=float, default=0.01,
+                        help="Seconds per streamed chunk")
+    args = parser.parse_args()
+
+    servers = [
+        ThreadingHTTPServer(("127.0.0.1", port), make_handler(str(port), args.delay))
+        for port in args.port or [11434]
+    ]
+    for server in servers[1:]:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Stub Ollama serving on ports {', '.join(str(server.server_port) for server in servers)}")
+    try:
+        servers[0].serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
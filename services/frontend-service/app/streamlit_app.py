@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 from streamlit_mic_recorder import mic_recorder
 import io
 
@@ -10,7 +11,9 @@ st.set_page_config(page_title="Chat + Transcribe", page_icon="🎧", layout="cen
 # ----------------------------
 TRANSCRIBE_API_URL = "http://transcription-service:9000/asr"
 LLM_API_URL = "http://backend-service:8002/chat"
+LLM_STREAM_API_URL = "http://backend-service:8002/chat/stream"
 SCRAPE_API_URL = "http://backend-service:8002/scrape-job"
+SESSION_API_URL = "http://backend-service:8002/session"
 
 # ----------------------------
 # APP TITLE
@@ -40,6 +43,8 @@ if "position_company" not in st.session_state:
     st.session_state.position_company = None
 if "session_id" not in st.session_state:
     st.session_state.session_id = None
+if "profile_synced" not in st.session_state:
+    st.session_state.profile_synced = False
 
 # ----------------------------
 # POSITION SELECTION MODAL
@@ -145,6 +150,10 @@ def show_position_modal():
                         st.session_state.position_description = position_description.strip()
                         st.session_state.show_position_modal = False
                         
+                        # Store the position with the backend session once instead of sending it every turn
+                        st.session_state.profile_synced = False
+                        save_position_profile()
+                        
                         # Add welcome message to start the interview
                         welcome_message = f"Hello! I'm your AI interviewer for the {position_name} position. I'm here to help you practice and prepare for your interview. Let's start with an introduction - could you tell me a bit about yourself and why you're interested in this role?"
                         st.session_state.messages.append({"role": "assistant", "content": welcome_message})
@@ -182,7 +191,7 @@ def scrape_job_posting(url: str):
     """Scrape job information from a URL"""
     try:
         payload = {"url": url}
-        res = requests.post(SCRAPE_API_URL, json=payload, timeout=30)
+        res = requests.post(SCRAPE_API_URL, json=payload, headers=backend_headers(), timeout=30)
         
         if res.status_code == 200:
             data = res.json()
@@ -195,6 +204,54 @@ def scrape_job_posting(url: str):
     except Exception as e:
         return {"error": f"Connection error: {str(e)}"}
 
+def session_headers() -> dict:
+    """Send the session ID as a header too, so a load balancer can keep the session on one backend worker"""
+    return {"X-Session-Id": st.session_state.session_id} if st.session_state.session_id else {}
+
+def backend_headers() -> dict:
+    """Session headers plus the end user's IP, so the backend rate-limits each user rather than this app"""
+    headers = session_headers()
+    if st.context.ip_address:
+        headers["X-Forwarded-For"] = st.context.ip_address
+    return headers
+
+def save_position_profile():
+    """Store the current position with the backend session; returns True on success"""
+    payload = {
+        "position_name": st.session_state.position_name,
+        "company": st.session_state.position_company,
+        "description": st.session_state.position_description
+    }
+    if st.session_state.session_id:
+        payload["session_id"] = st.session_state.session_id
+    try:
+        res = requests.post(SESSION_API_URL, json=payload, headers=backend_headers(), timeout=30)
+        data = res.json() if res.status_code == 200 else {}
+        if data.get("status") == "success":
+            st.session_state.session_id = data["session_id"]
+            st.session_state.profile_synced = True
+    except Exception:
+        pass
+    return st.session_state.profile_synced
+
+def stream_from_llm(payload: dict):
+    """Yield (event, data) pairs from the backend's server-sent event stream"""
+    with requests.post(LLM_STREAM_API_URL, json=payload, headers=backend_headers(), stream=True, timeout=120) as res:
+        if res.status_code != 200:
+            try:
+                error = res.json().get("error") or res.text
+            except ValueError:
+                error = res.text
+            yield "error", {"error": f"{res.status_code}: {error}"}
+            return
+
+        event = None
+        for line in res.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line[len("data:"):])
+
 def send_to_llm(message_text: str):
     """Send a message or transcription to the LLM backend with session management"""
     if not message_text or st.session_state.processing_message:
@@ -207,47 +264,61 @@ def send_to_llm(message_text: str):
     st.session_state.messages.append({"role": "user", "content": message_text})
     
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            try:
-                # Build conversation context with position information
-                position_context = ""
-                if st.session_state.position_name:
-                    position_context = f"Interview Position: {st.session_state.position_name}"
-                    if st.session_state.position_company:
-                        position_context += f"\nCompany: {st.session_state.position_company}"
-                    if st.session_state.position_description:
-                        position_context += f"\nPosition Description: {st.session_state.position_description}"
-                    position_context += "\n\n"
-
-                contextual_query = f"{position_context}{message_text}"
-
-                # Prepare payload with session management
-                payload = {
-                    "query": contextual_query
-                }
-                # Only include session_id if it exists
-                if st.session_state.session_id:
-                    payload["session_id"] = st.session_state.session_id
-                
-                res = requests.post(LLM_API_URL, json=payload, timeout=120)
-
-                if res.status_code == 200:
-                    data = res.json()
-                    if data.get("status") == "success":
-                        reply = data.get("response", "No response received")
-                        # Store session ID for future requests
-                        if data.get("session_id"):
-                            st.session_state.session_id = data["session_id"]
-                    else:
-                        reply = f"Error: {data.get('error', 'Unknown error')}"
-                else:
-                    reply = f"Error {res.status_code}: {res.text}"
+        status = st.empty()
+        placeholder = st.empty()
+        status.caption("Thinking...")
+        streamed = ""
+        try:
+            # The backend holds the position profile for the session; only resend it
+            # with the message if it could not be stored
+            position_context = ""
+            if st.session_state.position_name and not (st.session_state.profile_synced or save_position_profile()):
+                position_context = f"Interview Position: {st.session_state.position_name}"
+                if st.session_state.position_company:
+                    position_context += f"\nCompany: {st.session_state.position_company}"
+                if st.session_state.position_description:
+                    position_context += f"\nPosition Description: {st.session_state.position_description}"
+                position_context += "\n\n"
+
+            contextual_query = f"{position_context}{message_text}"
+
+            # Prepare payload with session management
+            payload = {
+                "query": contextual_query
+            }
+            # Only include session_id if it exists
+            if st.session_state.session_id:
+                payload["session_id"] = st.session_state.session_id
+
+            reply = "No response received"
+            feedback = []
+            for event, data in stream_from_llm(payload):
+                if event == "session" and data.get("session_id"):
+                    # Store session ID for future requests
+                    st.session_state.session_id = data["session_id"]
+                elif event == "tool":
+                    status.caption(f"Using {data.get('name', 'tool')}...")
+                elif event == "token":
+                    streamed += data.get("text", "")
+                    placeholder.markdown(streamed + "▌")
+                elif event == "final":
+                    reply = data.get("response") or reply
+                    feedback = (data.get("metadata") or {}).get("feedback") or []
+                elif event == "error":
+                    reply = f"Error: {data.get('error', 'Unknown error')}"
 
-            except Exception as e:
-                reply = f"Connection error: {e}"
+        except Exception as e:
+            reply = f"Connection error: {e}"
 
-            st.markdown(reply)
-            st.session_state.messages.append({"role": "assistant", "content": reply})
+        status.empty()
+        # Evaluations of earlier answers finish in the background and arrive with a later reply
+        for evaluation in feedback:
+            if evaluation.get("status") == "completed":
+                feedback_text = f"**Feedback on your answer:**\n\n{evaluation['feedback']}"
+                st.info(feedback_text)
+                st.session_state.messages.append({"role": "assistant", "content": feedback_text})
+        placeholder.markdown(reply)
+        st.session_state.messages.append({"role": "assistant", "content": reply})
     
     # Reset processing flag
     st.session_state.processing_message = False